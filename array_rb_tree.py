@@ -0,0 +1,658 @@
+import math
+from array import array
+from typing import Optional, Tuple, Dict, List, Iterable
+
+RED = 1
+BLACK = 0
+
+# Slot 0 is the nil sentinel shared by every leaf and the root's parent
+NIL = 0
+
+# update_many rebuilds the whole tree when batch size * REBUILD_RATIO >= tree size
+REBUILD_RATIO = 4
+
+class ArrayRBTreeLeaderboard:
+    """
+    Order-statistic red-black tree stored as a struct of arrays.
+
+    Instead of one RBNode object per user, every field lives in its own
+    array.array column and a node is an integer index into all of them.
+    A node costs 33 bytes of column storage (8 + 8 for user_id and score,
+    1 for color, 4 each for left, right, parent and size) instead of a
+    Python object with seven attribute slots and boxed ints.
+
+    Freed slots are chained through the right column and reused by insert.
+    Rank semantics match RBTreeLeaderboard: search returns the 0-based
+    in-order index by (score, user_id).
+    """
+
+    def __init__(self):
+        self.user_id = array('q', [0])
+        self.score = array('q', [0])
+        self.color = array('b', [BLACK])
+        self.left = array('i', [NIL])
+        self.right = array('i', [NIL])
+        self.parent = array('i', [NIL])
+        self.size = array('i', [0])
+        self.root = NIL
+        # Head of the free-slot chain (linked through self.right), NIL if empty
+        self.free = NIL
+        self.user_map: Dict[int, int] = {} # user_id -> score
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]]) -> 'ArrayRBTreeLeaderboard':
+        """
+        Builds a balanced tree from (user_id, score) pairs.
+        Sorts once, then links the median of each range as the subtree root,
+        colouring the deepest level red as RBTreeLeaderboard.from_pairs does.
+        Time Complexity: O(n log n) for the sort, O(n) for the build
+        """
+        lb = cls()
+        lb.user_map = dict(pairs)
+        lb._build_balanced(sorted((score, uid) for uid, score in lb.user_map.items()))
+        return lb
+
+    def _build_balanced(self, entries: List[Tuple[int, int]]):
+        """
+        Replaces the tree with a balanced tree over sorted (score, user_id) entries.
+        Entry i is stored in slot i + 1. Does not touch user_map.
+        Time Complexity: O(n)
+        """
+        n = len(entries)
+        self.user_id = array('q', [0])
+        self.score = array('q', [0])
+        self.user_id.extend(uid for _, uid in entries)
+        self.score.extend(score for score, _ in entries)
+        self.color = array('b', [BLACK]) * (n + 1)
+        self.left = array('i', [NIL]) * (n + 1)
+        self.right = array('i', [NIL]) * (n + 1)
+        self.parent = array('i', [NIL]) * (n + 1)
+        self.size = array('i', [0]) * (n + 1)
+        self.free = NIL
+        self.root = NIL
+        if n == 0:
+            return
+        red_depth = n.bit_length() - 1
+        color, left, right, parent, size = self.color, self.left, self.right, self.parent, self.size
+
+        def build(lo: int, hi: int, depth: int, par: int) -> int:
+            if lo >= hi:
+                return NIL
+            mid = (lo + hi) // 2
+            node = mid + 1
+            if depth == red_depth:
+                color[node] = RED
+            parent[node] = par
+            left[node] = build(lo, mid, depth + 1, node)
+            right[node] = build(mid + 1, hi, depth + 1, node)
+            size[node] = hi - lo
+            return node
+
+        self.root = build(0, n, 0, NIL)
+        color[self.root] = BLACK
+
+    def _inorder_entries(self) -> List[Tuple[int, int]]:
+        """
+        Returns all (score, user_id) entries in ascending order.
+        Time Complexity: O(n)
+        """
+        left, right, score, user_id = self.left, self.right, self.score, self.user_id
+        entries = []
+        stack = []
+        node = self.root
+        while stack or node != NIL:
+            while node != NIL:
+                stack.append(node)
+                node = left[node]
+            node = stack.pop()
+            entries.append((score[node], user_id[node]))
+            node = right[node]
+        return entries
+
+    def _alloc(self, user_id: int, score: int) -> int:
+        """
+        Returns a fresh red node slot, reusing a freed slot when available.
+        """
+        node = self.free
+        if node != NIL:
+            self.free = self.right[node]
+            self.user_id[node] = user_id
+            self.score[node] = score
+            self.color[node] = RED
+            self.left[node] = NIL
+            self.right[node] = NIL
+            self.parent[node] = NIL
+            self.size[node] = 1
+            return node
+        self.user_id.append(user_id)
+        self.score.append(score)
+        self.color.append(RED)
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.parent.append(NIL)
+        self.size.append(1)
+        return len(self.size) - 1
+
+    def _release(self, node: int):
+        """
+        Pushes a removed node slot onto the free chain.
+        """
+        self.right[node] = self.free
+        self.free = node
+
+    def _update_size(self, node: int):
+        if node != NIL:
+            self.size[node] = 1 + self.size[self.left[node]] + self.size[self.right[node]]
+
+    def insert(self, user_id: int, score: int):
+        if user_id in self.user_map:
+            self.update(user_id, score)
+            return
+
+        self.user_map[user_id] = score
+        new_node = self._alloc(user_id, score)
+        left, right, size, scores, uids = self.left, self.right, self.size, self.score, self.user_id
+
+        y = NIL
+        x = self.root
+        while x != NIL:
+            y = x
+            size[x] += 1 # Increment size on the way down
+            if (score < scores[x]) or (score == scores[x] and user_id < uids[x]):
+                x = left[x]
+            else:
+                x = right[x]
+
+        self.parent[new_node] = y
+        if y == NIL:
+            self.root = new_node
+        elif (score < scores[y]) or (score == scores[y] and user_id < uids[y]):
+            left[y] = new_node
+        else:
+            right[y] = new_node
+
+        self._insert_fixup(new_node)
+
+    def _left_rotate(self, x: int):
+        left, right, parent, size = self.left, self.right, self.parent, self.size
+        y = right[x]
+        right[x] = left[y]
+        if left[y] != NIL:
+            parent[left[y]] = x
+        parent[y] = parent[x]
+        if parent[x] == NIL:
+            self.root = y
+        elif x == left[parent[x]]:
+            left[parent[x]] = y
+        else:
+            right[parent[x]] = y
+        left[y] = x
+        parent[x] = y
+
+        size[y] = size[x]
+        self._update_size(x)
+
+    def _right_rotate(self, y: int):
+        left, right, parent, size = self.left, self.right, self.parent, self.size
+        x = left[y]
+        left[y] = right[x]
+        if right[x] != NIL:
+            parent[right[x]] = y
+        parent[x] = parent[y]
+        if parent[y] == NIL:
+            self.root = x
+        elif y == right[parent[y]]:
+            right[parent[y]] = x
+        else:
+            left[parent[y]] = x
+        right[x] = y
+        parent[y] = x
+
+        size[x] = size[y]
+        self._update_size(y)
+
+    def _insert_fixup(self, z: int):
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        while color[parent[z]] == RED:
+            zp = parent[z]
+            zpp = parent[zp]
+            if zp == left[zpp]:
+                y = right[zpp]
+                if color[y] == RED:
+                    color[zp] = BLACK
+                    color[y] = BLACK
+                    color[zpp] = RED
+                    z = zpp
+                else:
+                    if z == right[zp]:
+                        z = zp
+                        self._left_rotate(z)
+                    color[parent[z]] = BLACK
+                    color[parent[parent[z]]] = RED
+                    self._right_rotate(parent[parent[z]])
+            else:
+                y = left[zpp]
+                if color[y] == RED:
+                    color[zp] = BLACK
+                    color[y] = BLACK
+                    color[zpp] = RED
+                    z = zpp
+                else:
+                    if z == left[zp]:
+                        z = zp
+                        self._right_rotate(z)
+                    color[parent[z]] = BLACK
+                    color[parent[parent[z]]] = RED
+                    self._left_rotate(parent[parent[z]])
+        color[self.root] = BLACK
+
+    def delete(self, user_id: int, score: Optional[int] = None):
+        if score is None:
+            score = self.user_map.get(user_id)
+            if score is None:
+                return
+
+        if user_id in self.user_map:
+            del self.user_map[user_id]
+
+        z = self._find_node(user_id, score)
+        if z == NIL:
+            return
+
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        y = z
+        y_original_color = color[y]
+
+        if left[z] == NIL:
+            x = right[z]
+            x_parent = parent[z] # Track parent for size update
+            self._transplant(z, right[z])
+        elif right[z] == NIL:
+            x = left[z]
+            x_parent = parent[z] # Track parent for size update
+            self._transplant(z, left[z])
+        else:
+            y = self._minimum(right[z])
+            y_original_color = color[y]
+            x = right[y]
+            if parent[y] == z:
+                parent[x] = y # x could be nil
+                x_parent = y
+            else:
+                x_parent = parent[y]
+                self._transplant(y, right[y])
+                right[y] = right[z]
+                parent[right[y]] = y
+
+            self._transplant(z, y)
+            left[y] = left[z]
+            parent[left[y]] = y
+            color[y] = color[z]
+
+        # Walk up from the splice point to the root, recalculating size
+        curr = x_parent
+        while curr != NIL:
+            self._update_size(curr)
+            curr = parent[curr]
+
+        if y_original_color == BLACK:
+            self._delete_fixup(x)
+        self._release(z)
+
+    def _transplant(self, u: int, v: int):
+        left, right, parent = self.left, self.right, self.parent
+        if parent[u] == NIL:
+            self.root = v
+        elif u == left[parent[u]]:
+            left[parent[u]] = v
+        else:
+            right[parent[u]] = v
+        parent[v] = parent[u]
+
+    def _minimum(self, node: int) -> int:
+        left = self.left
+        while left[node] != NIL:
+            node = left[node]
+        return node
+
+    def _delete_fixup(self, x: int):
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        while x != self.root and color[x] == BLACK:
+            if x == left[parent[x]]:
+                w = right[parent[x]]
+                if color[w] == RED:
+                    color[w] = BLACK
+                    color[parent[x]] = RED
+                    self._left_rotate(parent[x])
+                    w = right[parent[x]]
+                if color[left[w]] == BLACK and color[right[w]] == BLACK:
+                    color[w] = RED
+                    x = parent[x]
+                else:
+                    if color[right[w]] == BLACK:
+                        color[left[w]] = BLACK
+                        color[w] = RED
+                        self._right_rotate(w)
+                        w = right[parent[x]]
+                    color[w] = color[parent[x]]
+                    color[parent[x]] = BLACK
+                    color[right[w]] = BLACK
+                    self._left_rotate(parent[x])
+                    x = self.root
+            else:
+                w = left[parent[x]]
+                if color[w] == RED:
+                    color[w] = BLACK
+                    color[parent[x]] = RED
+                    self._right_rotate(parent[x])
+                    w = left[parent[x]]
+                if color[right[w]] == BLACK and color[left[w]] == BLACK:
+                    color[w] = RED
+                    x = parent[x]
+                else:
+                    if color[left[w]] == BLACK:
+                        color[right[w]] = BLACK
+                        color[w] = RED
+                        self._left_rotate(w)
+                        w = left[parent[x]]
+                    color[w] = color[parent[x]]
+                    color[parent[x]] = BLACK
+                    color[left[w]] = BLACK
+                    self._right_rotate(parent[x])
+                    x = self.root
+        color[x] = BLACK
+
+    def _find_node(self, user_id: int, score: int) -> int:
+        left, right, scores, uids = self.left, self.right, self.score, self.user_id
+        current = self.root
+        while current != NIL:
+            if uids[current] == user_id and scores[current] == score:
+                return current
+            elif (score < scores[current]) or (score == scores[current] and user_id < uids[current]):
+                current = left[current]
+            else:
+                current = right[current]
+        return NIL
+
+    def update(self, user_id: int, new_score: int):
+        """
+        Updates a user's score.
+        """
+        if user_id not in self.user_map:
+            self.insert(user_id, new_score)
+            return
+
+        old_score = self.user_map[user_id]
+        if old_score == new_score:
+            return
+
+        # Remove old
+        self.delete(user_id, old_score)
+        # Insert new
+        self.insert(user_id, new_score)
+
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Applies a batch of (user_id, new_score) pairs; unknown users are inserted.
+        Large batches merge into an in-order walk and rebuild the columns;
+        smaller batches use per-item update.
+        Time Complexity: O(n + b log b) for a rebuild, O(b log n) otherwise
+        """
+        batch = dict(pairs)
+        if len(batch) * REBUILD_RATIO < self.size[self.root]:
+            for uid, score in batch.items():
+                self.update(uid, score)
+            return
+
+        kept = [entry for entry in self._inorder_entries() if entry[1] not in batch]
+        self.user_map.update(batch)
+        # Timsort detects the two sorted runs and merges them in one pass
+        kept.extend(sorted((score, uid) for uid, score in batch.items()))
+        kept.sort()
+        self._build_balanced(kept)
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Inserts a batch of (user_id, score) pairs; existing users are updated.
+        """
+        self.update_many(pairs)
+
+    def search(self, user_id: int, score: Optional[int] = None) -> int:
+        """
+        Finds the rank (0-based index) of the user.
+        """
+        if score is None:
+            score = self.user_map.get(user_id)
+            if score is None:
+                return -1
+
+        left, right, size, scores, uids = self.left, self.right, self.size, self.score, self.user_id
+        current = self.root
+        rank = 0
+        while current != NIL:
+            if uids[current] == user_id and scores[current] == score:
+                return rank + size[left[current]]
+            elif (score < scores[current]) or (score == scores[current] and user_id < uids[current]):
+                current = left[current]
+            else:
+                rank += size[left[current]] + 1
+                current = right[current]
+        return -1
+
+    def search_many(self, user_ids: Iterable[int]) -> List[int]:
+        """
+        Finds the ranks of many users at once (-1 for unknown users).
+        Sorts the query keys and resolves them with the same finger search
+        as RBTreeLeaderboard.search_many.
+        Time Complexity: O(q log q + q log(n / q)) amortized
+        """
+        user_map = self.user_map
+        ids = list(user_ids)
+        result = [-1] * len(ids)
+        queries = []
+        for i, uid in enumerate(ids):
+            score = user_map.get(uid)
+            if score is not None:
+                queries.append((score, uid, i))
+        queries.sort()
+        left, right, parent, size, scores, uids = self.left, self.right, self.parent, self.size, self.score, self.user_id
+        node = NIL
+        rank = 0
+        for score, user_id, qi in queries:
+            if node == NIL:
+                node = self.root
+                base = 0
+            else:
+                # Climb while the next key lies beyond the current subtree
+                while parent[node] != NIL:
+                    p = parent[node]
+                    if node == left[p]:
+                        if (score < scores[p]) or (score == scores[p] and user_id < uids[p]):
+                            break
+                        rank += size[right[node]] + 1
+                    else:
+                        rank -= size[left[node]] + 1
+                    node = p
+                # Rank of the smallest entry in node's subtree
+                base = rank - size[left[node]]
+
+            current = node
+            while current != NIL:
+                if uids[current] == user_id and scores[current] == score:
+                    node = current
+                    rank = base + size[left[current]]
+                    result[qi] = rank
+                    break
+                elif (score < scores[current]) or (score == scores[current] and user_id < uids[current]):
+                    current = left[current]
+                else:
+                    base += size[left[current]] + 1
+                    current = right[current]
+        return result
+
+    def count_above(self, score: int) -> int:
+        """
+        Returns the number of users with a score strictly greater than score.
+        Time Complexity: O(log n)
+        """
+        left, right, size, scores = self.left, self.right, self.size, self.score
+        count = 0
+        node = self.root
+        while node != NIL:
+            if scores[node] > score:
+                count += 1 + size[right[node]]
+                node = left[node]
+            else:
+                node = right[node]
+        return count
+
+    def percentile(self, user_id: int) -> float:
+        """
+        Returns the user's standing as a top percentage ("top 3.2%"):
+        100 * (users with a higher score + 1) / n, or -1.0 for unknown users.
+        Time Complexity: O(log n)
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return -1.0
+        return 100.0 * (self.count_above(score) + 1) / len(self.user_map)
+
+    def score_at_percentile(self, p: float) -> Optional[int]:
+        """
+        Returns the lowest score s with at least p percent of users scoring <= s
+        (nearest-rank method), or None if the board is empty.
+        Time Complexity: O(log n)
+        """
+        if p < 0 or p > 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        n = len(self.user_map)
+        if not n:
+            return None
+        # The ceil(p% of n)-th lowest score, counting from 1
+        rank = max(math.ceil(p * n / 100), 1) - 1
+        return self.score[self._select_node(rank)]
+
+    def _select_node(self, rank: int) -> int:
+        """
+        Returns the node with the given 0-based in-order rank, or NIL.
+        Time Complexity: O(log n)
+        """
+        if rank < 0:
+            return NIL
+        left, right, size = self.left, self.right, self.size
+        node = self.root
+        while node != NIL:
+            left_size = size[left[node]]
+            if rank < left_size:
+                node = left[node]
+            elif rank == left_size:
+                return node
+            else:
+                rank -= left_size + 1
+                node = right[node]
+        return NIL
+
+    def _successor(self, node: int) -> int:
+        """
+        Returns the in-order successor of node, or NIL.
+        """
+        right, parent = self.right, self.parent
+        if right[node] != NIL:
+            return self._minimum(right[node])
+        par = parent[node]
+        while par != NIL and node == right[par]:
+            node = par
+            par = parent[par]
+        return par
+
+    def _predecessor(self, node: int) -> int:
+        """
+        Returns the in-order predecessor of node, or NIL.
+        """
+        left, right, parent = self.left, self.right, self.parent
+        if left[node] != NIL:
+            node = left[node]
+            while right[node] != NIL:
+                node = right[node]
+            return node
+        par = parent[node]
+        while par != NIL and node == left[par]:
+            node = par
+            par = parent[par]
+        return par
+
+    def select(self, rank: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (user_id, score) with the given rank (as returned by search),
+        or None if the rank is out of range.
+        Time Complexity: O(log n)
+        """
+        node = self._select_node(rank)
+        if node == NIL:
+            return None
+        return (self.user_id[node], self.score[node])
+
+    def range_by_rank(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Returns (user_id, score) pairs for ranks start..stop-1, in rank order.
+        Time Complexity: O(log n + (stop - start))
+        """
+        start = max(start, 0)
+        result = []
+        node = self._select_node(start)
+        count = stop - start
+        while node != NIL and len(result) < count:
+            result.append((self.user_id[node], self.score[node]))
+            node = self._successor(node)
+        return result
+
+    def around(self, user_id: int, radius: int) -> List[Tuple[int, int]]:
+        """
+        Returns the user with up to radius users ranked above and below,
+        highest score first, as (user_id, score) tuples; [] for unknown users.
+        Walks in-order neighbours from the user's node.
+        Time Complexity: O(log n + radius)
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return []
+        node = self._find_node(user_id, score)
+        if node == NIL:
+            return []
+        uids, scores = self.user_id, self.score
+        window = []
+        current = self._successor(node)
+        while current != NIL and len(window) < radius:
+            window.append((uids[current], scores[current]))
+            current = self._successor(current)
+        window.reverse()
+        window.append((user_id, score))
+        current = self._predecessor(node)
+        below = 0
+        while current != NIL and below < radius:
+            window.append((uids[current], scores[current]))
+            current = self._predecessor(current)
+            below += 1
+        return window
+
+    def top_k(self, k: int) -> List[Tuple[int, int]]:
+        """
+        Returns the top k users with highest scores.
+        Returns list of (user_id, score) tuples.
+        Walks predecessors from the maximum node.
+        Time Complexity: O(log n + k)
+        """
+        result = []
+        if k <= 0 or self.root == NIL:
+            return result
+        right = self.right
+        node = self.root
+        while right[node] != NIL:
+            node = right[node]
+        while node != NIL and len(result) < k:
+            result.append((self.user_id[node], self.score[node]))
+            node = self._predecessor(node)
+        return result
+
+    def __len__(self):
+        return self.size[self.root]
@@ -2,14 +2,51 @@ import random
 import time
 import math
 import functools
-from typing import List, Tuple, Dict, Any
+import os
+from array import array
+from itertools import accumulate
+from typing import List, Tuple, Dict, Any, Callable, Optional
 
-def generate_data(n: int, max_score: int = 15000) -> List[Tuple[int, int]]:
+# Score distributions for the initial population and the update stream
+SCORE_DISTRIBUTIONS = ("uniform", "normal", "long_tail", "top_heavy", "monotonic")
+# Which users update: everyone equally, Zipf-distributed whales, or a drifting hot set
+USER_DISTRIBUTIONS = ("uniform", "zipf", "hot_set")
+
+def score_sampler(dist: str = "uniform", max_score: int = 15000) -> Callable[[Optional[int]], int]:
+    """
+    Returns a function mapping a user's current score (None for a new user)
+    to a new score in [0, max_score] drawn from dist:
+    uniform   - uniform over [0, max_score]
+    normal    - bell curve around the middle
+    long_tail - most users low, a few very high (exponential)
+    top_heavy - scores bunched just under max_score
+    monotonic - scores only grow by small steps; new users start in the lower half
+    """
+    if dist == "uniform":
+        return lambda old: random.randint(0, max_score)
+    if dist == "normal":
+        return lambda old: min(max(int(random.gauss(max_score * 0.5, max_score * 0.15)), 0), max_score)
+    if dist == "long_tail":
+        return lambda old: min(int(random.expovariate(10.0 / max_score)), max_score)
+    if dist == "top_heavy":
+        return lambda old: max(max_score - int(random.expovariate(30.0 / max_score)), 0)
+    if dist == "monotonic":
+        step = max(max_score // 100, 1)
+        def monotonic(old: Optional[int]) -> int:
+            if old is None:
+                return random.randint(0, max_score // 2)
+            return min(old + random.randint(0, step), max_score)
+        return monotonic
+    raise ValueError(f"Unknown score distribution {dist!r}, expected one of {SCORE_DISTRIBUTIONS}")
+
+def generate_data(n: int, max_score: int = 15000, score_dist: str = "uniform") -> List[Tuple[int, int]]:
     """
     Generates n entries of (userID, totalScore).
     userID is a 6-digit integer.
-    totalScore is a random integer between 0 and max_score.
+    totalScore is an integer between 0 and max_score drawn from score_dist
+    (uniform by default, see score_sampler).
     """
+    sample = score_sampler(score_dist, max_score)
     data = []
     seen_users = set()
     while len(data) < n:
@@ -17,13 +54,70 @@ def generate_data(n: int, max_score: int = 15000) -> List[Tuple[int, int]]:
         if user_id in seen_users:
             continue
         seen_users.add(user_id)
-        score = random.randint(0, max_score)
+        score = sample(None)
         data.append((user_id, score))
     return data
 
-def calculate_stats(times_ns: List[float]) -> Dict[str, float]:
+def user_picker(data: List[Tuple[int, int]], dist: str = "uniform", zipf_s: float = 1.1,
+                hot_fraction: float = 0.01, hot_share: float = 0.8) -> Callable[[int], List[Tuple[int, int]]]:
+    """
+    Returns a function that picks count entries of data to update in one tick:
+    uniform - random.sample, every user at most once per tick
+    zipf    - with replacement, user i (in a random order) weighted 1 / i^zipf_s,
+              so a few whales update many times per tick
+    hot_set - hot_share of picks come from a window of hot_fraction of the users;
+              the window slides a little every tick, so activity is time-correlated
+    """
+    if dist == "uniform":
+        return lambda count: random.sample(data, min(count, len(data)))
+    order = data[:]
+    random.shuffle(order)
+    if dist == "zipf":
+        cum_weights = list(accumulate(1.0 / (i ** zipf_s) for i in range(1, len(order) + 1)))
+        return lambda count: random.choices(order, cum_weights=cum_weights, k=count)
+    if dist == "hot_set":
+        n = len(order)
+        window = max(int(n * hot_fraction), 1)
+        state = {"offset": 0}
+        def hot_set(count: int) -> List[Tuple[int, int]]:
+            offset = state["offset"]
+            picks = []
+            for _ in range(count):
+                if random.random() < hot_share:
+                    picks.append(order[(offset + random.randrange(window)) % n])
+                else:
+                    picks.append(order[random.randrange(n)])
+            # Drift by a tenth of the window: most of the hot set stays hot next tick
+            state["offset"] = (offset + max(window // 10, 1)) % n
+            return picks
+        return hot_set
+    raise ValueError(f"Unknown user distribution {dist!r}, expected one of {USER_DISTRIBUTIONS}")
+
+# Timing modes of the micro benchmark: one timer pair per call, or one per block of calls
+TIMING_MODES = ("per_call", "batched")
+
+@functools.lru_cache(maxsize=None)
+def timer_overhead_ns(samples: int = 100000) -> int:
+    """
+    Measures, once per process, what an empty per-call timing costs: the
+    median of end - start for "start = perf_counter_ns(); end = perf_counter_ns()"
+    with nothing in between, taken the same way the benchmarks time a call.
     """
-    Calculates Average, Stdev, P95, P99 from a list of durations in nanoseconds.
+    times = []
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(samples):
+        start = perf_counter_ns()
+        end = perf_counter_ns()
+        times.append(end - start)
+    times.sort()
+    return times[len(times) // 2]
+
+def calculate_stats(times_ns: List[float], overhead_ns: float = 0) -> Dict[str, float]:
+    """
+    Calculates Average, Stdev, P95, P99 from a list of durations in nanoseconds,
+    after subtracting overhead_ns (e.g. timer_overhead_ns()) from each one,
+    clamped at zero. Also returns CI95, the half-width of the 95% confidence
+    interval of the average.
     Returns values in microseconds (us).
     """
     if not times_ns:
@@ -32,11 +126,12 @@ def calculate_stats(times_ns: List[float]) -> Dict[str, float]:
             "Stdev": 0.0,
             "P95": 0.0,
             "P99": 0.0,
-            "P99.9": 0.0
+            "P99.9": 0.0,
+            "CI95": 0.0
         }
 
     # Convert to microseconds
-    times_us = [t / 1000.0 for t in times_ns]
+    times_us = [max(t - overhead_ns, 0) / 1000.0 for t in times_ns]
     n = len(times_us)
     
     avg = sum(times_us) / n
@@ -54,9 +149,38 @@ def calculate_stats(times_ns: List[float]) -> Dict[str, float]:
         "Stdev": stdev,
         "P95": p95,
         "P99": p99,
-        "P99.9": p999
+        "P99.9": p999,
+        "CI95": 1.96 * stdev / math.sqrt(n)
     }
 
+def time_batched(op: Callable, args_list: List[tuple], block_size: int = 100) -> Dict[str, float]:
+    """
+    Calls op(*args) for every entry of args_list, in order, timing blocks of
+    block_size calls with one timer pair each, so the timer overhead is
+    amortized over the block instead of added to every call.
+    Returns the per-call cost averaged over all calls, the stdev of the
+    per-block amortized cost and the 95% confidence interval half-width of
+    the average (CI95), in microseconds. No per-call percentiles exist in
+    this mode; P95/P99/P99.9 are those of the per-block amortized cost.
+    """
+    perf_counter_ns = time.perf_counter_ns
+    block_costs = [] # amortized ns per call, one per block
+    total_ns = 0
+    for i in range(0, len(args_list), block_size):
+        block = args_list[i:i + block_size]
+        start = perf_counter_ns()
+        for args in block:
+            op(*args)
+        end = perf_counter_ns()
+        total_ns += end - start
+        block_costs.append((end - start) / len(block))
+    if not block_costs:
+        return calculate_stats([])
+    stats = calculate_stats(block_costs)
+    stats["Average"] = total_ns / len(args_list) / 1000.0
+    stats["Blocks"] = len(block_costs)
+    return stats
+
 def print_stats(name: str, operation: str, n: int, stats: Dict[str, float]):
     print(f"{name} {operation} {n} elements:")
     print(f"Average : {stats['Average']:.4f} us")
@@ -66,11 +190,166 @@ def print_stats(name: str, operation: str, n: int, stats: Dict[str, float]):
     print(f"99.9%   : {stats['P99.9']:.4f} us")
     print("-" * 30)
 
+class LatencyHistogram:
+    """
+    HDR-style log-bucketed histogram of durations in nanoseconds.
+
+    Values below 2^sub_bucket_bits are counted exactly. Above that, each
+    power-of-two range is split into 2^(sub_bucket_bits - 1) equal
+    sub-buckets, so every recorded value is kept to a relative error below
+    2^-(sub_bucket_bits - 1) (about 0.1% with the default 11 bits). The
+    bucket of a value is found with a couple of shifts, so record is O(1),
+    and memory is fixed by the configuration, not by the number of samples.
+    Histograms with the same configuration can be merged.
+    Values above 2^max_bits ns are counted in the last bucket; min, max and
+    mean stay exact.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 11, max_bits: int = 40):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_bits = max_bits
+        self.half = 1 << (sub_bucket_bits - 1)
+        self.max_shift = max_bits - sub_bucket_bits
+        self.counts = array('q', bytes(8 * (self.max_shift + 2) * self.half))
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0.0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        if shift > self.max_shift:
+            return len(self.counts) - 1
+        # value >> shift lies in [half, 2 * half): one of the half sub-buckets of this range
+        return shift * self.half + (value >> shift)
+
+    def _highest_equivalent(self, index: int) -> int:
+        """
+        Returns the largest value that lands in bucket index.
+        """
+        shift = index // self.half - 1
+        if shift <= 0:
+            return index
+        return ((index - shift * self.half + 1) << shift) - 1
+
+    def record(self, value: float):
+        """
+        Records one duration in nanoseconds.
+        Time Complexity: O(1)
+        """
+        if type(value) is not int:
+            value = int(value)
+        if value < 0:
+            value = 0
+        # Same as _index, inlined: this is the hot path
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            self.counts[value] += 1
+        elif shift > self.max_shift:
+            self.counts[-1] += 1
+        else:
+            self.counts[shift * self.half + (value >> shift)] += 1
+        if value < self.min or not self.count:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+
+    # Drop-in for the list.append the scenarios used to collect samples with
+    append = record
+
+    def merge(self, other: 'LatencyHistogram'):
+        """
+        Adds the samples of another histogram with the same configuration.
+        """
+        if (other.sub_bucket_bits, other.max_bits) != (self.sub_bucket_bits, self.max_bits):
+            raise ValueError("Histograms must share sub_bucket_bits and max_bits to merge")
+        if not other.count:
+            return
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+
+    def percentiles(self, ps: List[float]) -> List[int]:
+        """
+        Returns the value at each percentile in ps (ascending), in ns, as the
+        highest value equivalent to the bucket holding that sample.
+        Time Complexity: one pass over the buckets
+        """
+        result = []
+        if not self.count:
+            return [0] * len(ps)
+        targets = [max(math.ceil(p / 100.0 * self.count), 1) for p in ps]
+        last = len(self.counts) - 1
+        ti = 0
+        seen = 0
+        for index, c in enumerate(self.counts):
+            if not c:
+                continue
+            seen += c
+            # The last bucket also holds every value above 2^max_bits, so its only bound is max
+            top = self.max if index == last else min(self._highest_equivalent(index), self.max)
+            while ti < len(targets) and seen >= targets[ti]:
+                result.append(top)
+                ti += 1
+            if ti == len(targets):
+                break
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the calculate_stats fields (plus P50, P99.99, Min and Max),
+        in microseconds.
+        """
+        if not self.count:
+            return calculate_stats([])
+        mean = self.total / self.count
+        variance = max(self.total_sq / self.count - mean * mean, 0.0)
+        p50, p95, p99, p999, p9999 = self.percentiles([50, 95, 99, 99.9, 99.99])
+        return {
+            "Average": mean / 1000.0,
+            "Stdev": math.sqrt(variance) / 1000.0,
+            "P95": p95 / 1000.0,
+            "P99": p99 / 1000.0,
+            "P99.9": p999 / 1000.0,
+            "P50": p50 / 1000.0,
+            "P99.99": p9999 / 1000.0,
+            "Min": self.min / 1000.0,
+            "Max": self.max / 1000.0
+        }
+
+    def __len__(self):
+        return self.count
+
+def rss_bytes() -> Optional[int]:
+    """
+    Returns the current resident set size of this process in bytes, or None
+    where it cannot be read (only /proc/self/statm is supported).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
 class BenchmarkTimer:
     """
-    Context manager to measure execution time of a block and append to a list.
+    Context manager to measure execution time of a block and append it to a
+    list, or record it in a LatencyHistogram.
     """
-    def __init__(self, result_list: List[float]):
+    def __init__(self, result_list):
         self.result_list = result_list
         self.start = 0
 
@@ -0,0 +1,413 @@
+import math
+import bisect
+from typing import List, Tuple, Optional, Dict, Iterable
+
+# update_many rebuilds every chunk when batch size * REBUILD_RATIO >= size
+REBUILD_RATIO = 64
+
+class ChunkedSortedArrayLeaderboard:
+    """
+    Leaderboard backed by a list of bounded-size sorted chunks, in the style
+    of sortedcontainers.SortedList.
+
+    Entries are (score, user_id) tuples kept in ascending order across
+    self.chunks. self.maxes holds the last entry of each chunk, so locating
+    an entry is a bisect over maxes plus a bisect inside one chunk, and an
+    insert or delete only shifts the elements of that chunk instead of the
+    whole array. Chunks split above 2 * load entries and merge with a
+    neighbour below load / 2.
+
+    Rank needs the number of entries in the chunks before a given chunk.
+    That comes from a Fenwick tree over chunk lengths, adjusted in
+    O(log chunks) per insert/delete and rebuilt lazily after a split or merge.
+    """
+
+    def __init__(self, load: int = 1000):
+        self.load = load
+        self.chunks: List[List[Tuple[int, int]]] = []
+        # maxes[i] is the last (largest) entry of chunks[i]
+        self.maxes: List[Tuple[int, int]] = []
+        # Fenwick tree over chunk lengths, 1-indexed: index[i + 1] covers chunks[i]
+        self.index: List[int] = [0]
+        # The chunk list changed shape; index must be rebuilt before use
+        self.index_dirty = False
+        self.size = 0
+        self.user_map: Dict[int, int] = {} # user_id -> score
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]], load: int = 1000) -> 'ChunkedSortedArrayLeaderboard':
+        """
+        Builds a leaderboard from (user_id, score) pairs with a single sort.
+        Later pairs for the same user_id win, as with repeated insert.
+        Time Complexity: O(n log n)
+        """
+        lb = cls(load)
+        lb.user_map = dict(pairs)
+        lb._build_from_sorted(sorted((score, uid) for uid, score in lb.user_map.items()))
+        return lb
+
+    def _build_from_sorted(self, entries: List[Tuple[int, int]]):
+        """
+        Replaces the contents with sorted (score, user_id) entries cut into
+        chunks of load entries. Does not touch user_map.
+        Time Complexity: O(n)
+        """
+        load = self.load
+        self.chunks = [entries[i:i + load] for i in range(0, len(entries), load)]
+        self.maxes = [chunk[-1] for chunk in self.chunks]
+        self.size = len(entries)
+        self.index_dirty = True
+
+    def _build_index(self):
+        """
+        Rebuilds the Fenwick tree over chunk lengths.
+        Time Complexity: O(chunks)
+        """
+        tree = [0]
+        tree.extend(len(chunk) for chunk in self.chunks)
+        n = len(tree)
+        for i in range(1, n):
+            j = i + (i & -i)
+            if j < n:
+                tree[j] += tree[i]
+        self.index = tree
+        self.index_dirty = False
+
+    def _index_add(self, chunk_idx: int, delta: int):
+        """
+        Adds delta to the recorded length of chunks[chunk_idx].
+        Time Complexity: O(log chunks)
+        """
+        if self.index_dirty:
+            return
+        tree = self.index
+        n = len(tree)
+        i = chunk_idx + 1
+        while i < n:
+            tree[i] += delta
+            i += i & -i
+
+    def _offset(self, chunk_idx: int) -> int:
+        """
+        Returns the number of entries in the chunks before chunks[chunk_idx].
+        Time Complexity: O(log chunks)
+        """
+        if self.index_dirty:
+            self._build_index()
+        tree = self.index
+        i = chunk_idx
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, rank: int) -> Tuple[int, int]:
+        """
+        Returns (chunk index, index in chunk) of the entry with the given rank.
+        The rank must be in range.
+        Time Complexity: O(log chunks)
+        """
+        if self.index_dirty:
+            self._build_index()
+        tree = self.index
+        n = len(tree)
+        pos = 0
+        step = 1 << (n.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt < n and tree[nxt] <= rank:
+                pos = nxt
+                rank -= tree[nxt]
+            step >>= 1
+        return pos, rank
+
+    def _split(self, i: int):
+        """
+        Splits chunks[i] in two halves.
+        """
+        chunk = self.chunks[i]
+        half = chunk[self.load:]
+        del chunk[self.load:]
+        self.chunks.insert(i + 1, half)
+        self.maxes[i] = chunk[-1]
+        self.maxes.insert(i + 1, half[-1])
+        self.index_dirty = True
+
+    def _merge(self, i: int):
+        """
+        Merges the undersized chunks[i] into a neighbour, splitting again if too large.
+        """
+        j = i - 1 if i > 0 else i
+        self.chunks[j].extend(self.chunks[j + 1])
+        del self.chunks[j + 1]
+        del self.maxes[j + 1]
+        self.maxes[j] = self.chunks[j][-1]
+        self.index_dirty = True
+        if len(self.chunks[j]) > 2 * self.load:
+            self._split(j)
+
+    def insert(self, user_id: int, score: int):
+        """
+        Inserts a new user score.
+        Time Complexity: O(log n) search + O(load) shift
+        """
+        if user_id in self.user_map:
+            # If user already exists, update their score
+            self.update(user_id, score)
+            return
+
+        self.user_map[user_id] = score
+        entry = (score, user_id)
+        self.size += 1
+        if not self.chunks:
+            self.chunks.append([entry])
+            self.maxes.append(entry)
+            self.index_dirty = True
+            return
+
+        i = bisect.bisect_left(self.maxes, entry)
+        if i == len(self.chunks):
+            # Larger than everything: append to the last chunk
+            i -= 1
+            self.chunks[i].append(entry)
+            self.maxes[i] = entry
+        else:
+            bisect.insort(self.chunks[i], entry)
+        self._index_add(i, 1)
+
+        if len(self.chunks[i]) > 2 * self.load:
+            self._split(i)
+
+    def delete(self, user_id: int, score: Optional[int] = None):
+        """
+        Deletes a user score.
+        Time Complexity: O(log n) search + O(load) shift
+        """
+        if score is None:
+            score = self.user_map.get(user_id)
+            if score is None:
+                return
+
+        if user_id in self.user_map:
+            del self.user_map[user_id]
+
+        entry = (score, user_id)
+        i = bisect.bisect_left(self.maxes, entry)
+        if i == len(self.chunks):
+            return
+        chunk = self.chunks[i]
+        j = bisect.bisect_left(chunk, entry)
+        if chunk[j] != entry:
+            return
+
+        del chunk[j]
+        self.size -= 1
+        if not chunk:
+            del self.chunks[i]
+            del self.maxes[i]
+            self.index_dirty = True
+            return
+        self.maxes[i] = chunk[-1]
+        self._index_add(i, -1)
+        if len(chunk) < self.load // 2 and len(self.chunks) > 1:
+            self._merge(i)
+
+    def update(self, user_id: int, new_score: int):
+        """
+        Updates a user's score.
+        """
+        if user_id not in self.user_map:
+            self.insert(user_id, new_score)
+            return
+
+        old_score = self.user_map[user_id]
+        if old_score == new_score:
+            return
+
+        # Remove old
+        self.delete(user_id, old_score)
+        # Insert new
+        self.insert(user_id, new_score)
+
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Applies a batch of (user_id, new_score) pairs; unknown users are inserted.
+        Large batches merge into one flattened list and re-chunk it;
+        small batches use per-item update.
+        Time Complexity: O(n + b log b) for a rebuild
+        """
+        batch = dict(pairs)
+        if len(batch) * REBUILD_RATIO < self.size:
+            for uid, score in batch.items():
+                self.update(uid, score)
+            return
+
+        kept = [entry for chunk in self.chunks for entry in chunk if entry[1] not in batch]
+        self.user_map.update(batch)
+        # Timsort detects the two sorted runs and merges them in one pass
+        kept.extend(sorted((score, uid) for uid, score in batch.items()))
+        kept.sort()
+        self._build_from_sorted(kept)
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Inserts a batch of (user_id, score) pairs; existing users are updated.
+        """
+        self.update_many(pairs)
+
+    def search(self, user_id: int, score: Optional[int] = None) -> int:
+        """
+        Finds the rank (index) of the user.
+        Time Complexity: O(log n)
+        """
+        if score is None:
+            score = self.user_map.get(user_id)
+            if score is None:
+                return -1
+
+        entry = (score, user_id)
+        i = bisect.bisect_left(self.maxes, entry)
+        if i == len(self.chunks):
+            return -1
+        chunk = self.chunks[i]
+        j = bisect.bisect_left(chunk, entry)
+        if chunk[j] == entry:
+            return self._offset(i) + j
+        return -1
+
+    def search_many(self, user_ids: Iterable[int]) -> List[int]:
+        """
+        Finds the ranks of many users at once (-1 for unknown users).
+        Sorts the query keys and sweeps the chunks in order, bisecting
+        maxes and each chunk from the previous hit onward.
+        Time Complexity: O(q log q + q log n)
+        """
+        user_map = self.user_map
+        ids = list(user_ids)
+        result = [-1] * len(ids)
+        queries = []
+        for i, uid in enumerate(ids):
+            score = user_map.get(uid)
+            if score is not None:
+                queries.append((score, uid, i))
+        queries.sort()
+        maxes = self.maxes
+        ci = 0
+        lo = 0
+        offset = self._offset(0)
+        for score, uid, i in queries:
+            entry = (score, uid)
+            nci = bisect.bisect_left(maxes, entry, ci)
+            if nci == len(maxes):
+                break
+            if nci != ci:
+                ci = nci
+                lo = 0
+                offset = self._offset(ci)
+            chunk = self.chunks[ci]
+            lo = bisect.bisect_left(chunk, entry, lo)
+            if chunk[lo] == entry:
+                result[i] = offset + lo
+        return result
+
+    def count_above(self, score: int) -> int:
+        """
+        Returns the number of users with a score strictly greater than score.
+        Time Complexity: O(log n)
+        """
+        # (score + 1,) sorts before every entry with score + 1
+        key = (score + 1,)
+        i = bisect.bisect_left(self.maxes, key)
+        if i == len(self.chunks):
+            return 0
+        j = bisect.bisect_left(self.chunks[i], key)
+        return self.size - self._offset(i) - j
+
+    def percentile(self, user_id: int) -> float:
+        """
+        Returns the user's standing as a top percentage ("top 3.2%"):
+        100 * (users with a higher score + 1) / n, or -1.0 for unknown users.
+        Time Complexity: O(log n)
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return -1.0
+        return 100.0 * (self.count_above(score) + 1) / self.size
+
+    def score_at_percentile(self, p: float) -> Optional[int]:
+        """
+        Returns the lowest score s with at least p percent of users scoring <= s
+        (nearest-rank method), or None if the board is empty.
+        Time Complexity: O(log n)
+        """
+        if p < 0 or p > 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        n = self.size
+        if not n:
+            return None
+        # The ceil(p% of n)-th lowest score, counting from 1
+        rank = max(math.ceil(p * n / 100), 1) - 1
+        i, j = self._locate(rank)
+        return self.chunks[i][j][0]
+
+    def select(self, rank: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (user_id, score) with the given rank (as returned by search),
+        or None if the rank is out of range.
+        Time Complexity: O(log n)
+        """
+        if rank < 0 or rank >= self.size:
+            return None
+        i, j = self._locate(rank)
+        score, uid = self.chunks[i][j]
+        return (uid, score)
+
+    def range_by_rank(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Returns (user_id, score) pairs for ranks start..stop-1, in rank order.
+        Time Complexity: O(log n + (stop - start))
+        """
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        result = []
+        if start >= stop:
+            return result
+        i, j = self._locate(start)
+        count = stop - start
+        while i < len(self.chunks) and len(result) < count:
+            for score, uid in self.chunks[i][j:j + count - len(result)]:
+                result.append((uid, score))
+            i += 1
+            j = 0
+        return result
+
+    def around(self, user_id: int, radius: int) -> List[Tuple[int, int]]:
+        """
+        Returns the user with up to radius users ranked above and below,
+        highest score first, as (user_id, score) tuples; [] for unknown users.
+        Time Complexity: O(log n + radius)
+        """
+        i = self.search(user_id)
+        if i < 0:
+            return []
+        window = self.range_by_rank(i - radius, i + radius + 1)
+        window.reverse()
+        return window
+
+    def top_k(self, k: int) -> List[Tuple[int, int]]:
+        """
+        Returns the top k users with highest scores.
+        Returns list of (user_id, score) tuples.
+        Time Complexity: O(k)
+        """
+        result = []
+        for chunk in reversed(self.chunks):
+            if len(result) >= k:
+                break
+            for score, uid in reversed(chunk[-(k - len(result)):]):
+                result.append((uid, score))
+        return result
+
+    def __len__(self):
+        return self.size
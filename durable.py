@@ -0,0 +1,325 @@
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+# WAL record: opcode, user_id, score (score is 0 for deletes)
+WAL_RECORD = struct.Struct("<Bqq")
+WAL_SET = 1
+WAL_DELETE = 2
+
+# Snapshot header: magic, byte order of the payload, entry count
+SNAPSHOT_HEADER = struct.Struct("<8sBQ")
+SNAPSHOT_MAGIC = b"LBSNAP01"
+BYTE_ORDERS = {"little": 0, "big": 1}
+
+WAL_PREFIX = "wal-"
+SNAPSHOT_PREFIX = "snapshot-"
+
+def _generation(name: str, prefix: str, suffix: str) -> Optional[int]:
+    if name.startswith(prefix) and name.endswith(suffix):
+        digits = name[len(prefix):len(name) - len(suffix)]
+        if digits.isdigit():
+            return int(digits)
+    return None
+
+def fsync_directory(directory: str):
+    """
+    Fsyncs a directory, so files created, renamed or removed in it survive a crash.
+    """
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_snapshot(path: str, user_map: Dict[int, int]):
+    """
+    Writes user_map as (user_id, score) pairs sorted by (score, user_id),
+    so loading it through from_pairs sorts an already-sorted run.
+    The file is written under a temporary name, renamed into place, and
+    the rename is made durable by fsyncing the directory.
+    """
+    entries = sorted((score, uid) for uid, score in user_map.items())
+    flat = array('q')
+    for score, uid in entries:
+        flat.append(uid)
+        flat.append(score)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, BYTE_ORDERS[sys.byteorder], len(entries)))
+        flat.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    fsync_directory(os.path.dirname(path) or ".")
+
+def read_snapshot(path: str) -> List[Tuple[int, int]]:
+    """
+    Reads a snapshot written by write_snapshot into a list of (user_id, score).
+    """
+    with open(path, "rb") as f:
+        magic, order, count = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a leaderboard snapshot")
+        flat = array('q')
+        flat.fromfile(f, 2 * count)
+    if order != BYTE_ORDERS[sys.byteorder]:
+        flat.byteswap()
+    return list(zip(flat[0::2], flat[1::2]))
+
+def read_wal(path: str) -> List[Tuple[int, int, int]]:
+    """
+    Reads (opcode, user_id, score) records from a WAL segment.
+    A torn record at the end (crash mid-write) is ignored.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    usable = len(data) - len(data) % WAL_RECORD.size
+    return list(WAL_RECORD.iter_unpack(data[:usable]))
+
+class DurableLeaderboard:
+    """
+    Wraps any leaderboard with a write-ahead log and periodic snapshots.
+
+    Every insert/update/delete is appended to the current WAL segment as a
+    fixed 17-byte record before it is applied to the board (a write the board
+    rejects is dropped from the log again; of a batch rejected partway
+    through, the records of the items it did apply are kept). Records are
+    buffered and written with one fsync per group (group commit): the group
+    is flushed once it holds group_size records, by a background flusher
+    thread once its oldest record is group_interval_s old (even if no
+    further write arrives), and on sync()/close(). A write is only durable
+    after its group has been flushed.
+
+    Every snapshot_every logged writes, the board's user_map is written as a
+    compacted snapshot and a new WAL segment is started; older files are
+    removed. Generation g's snapshot covers every WAL segment up to g, so
+    recovery loads the newest snapshot with one from_pairs bulk build and
+    replays only the segments after it.
+
+    Reads not defined here are forwarded to the wrapped board.
+    """
+
+    def __init__(self, board, directory: str, group_size: int = 256, group_interval_s: float = 0.005,
+                 snapshot_every: int = 1000000, fsync: bool = True, generation: int = 0):
+        self.board = board
+        self.directory = directory
+        self.group_size = group_size
+        self.group_interval_s = group_interval_s
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        # Current WAL segment; snapshot generation - 1 covers everything before it
+        self.generation = generation
+        self.wal = open(self._wal_path(generation), "ab")
+        if fsync:
+            fsync_directory(directory)
+        self.buffer = bytearray()
+        self.buffered = 0
+        # perf_counter time of the oldest unflushed record
+        self.group_start = 0.0
+        self.since_snapshot = 0
+        # Guards the buffer and the WAL file against the flusher thread
+        self.lock = threading.RLock()
+        self.group_started = threading.Condition(self.lock)
+        self.closed = False
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flusher.start()
+
+    def __getattr__(self, name):
+        # Only reached for attributes the wrapper does not define itself
+        if name == "board":
+            raise AttributeError(name)
+        return getattr(self.board, name)
+
+    def _wal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"{WAL_PREFIX}{generation:012d}.log")
+
+    def _snapshot_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{generation:012d}.bin")
+
+    @classmethod
+    def open(cls, board_cls: Type, directory: str, **kwargs) -> 'DurableLeaderboard':
+        """
+        Recovers a board from directory (empty if there is nothing to recover)
+        and continues logging into a fresh WAL segment.
+        Time Complexity: one from_pairs bulk build + O(WAL tail) replay
+        """
+        os.makedirs(directory, exist_ok=True)
+        names = os.listdir(directory)
+        snapshots = [g for g in (_generation(n, SNAPSHOT_PREFIX, ".bin") for n in names) if g is not None]
+        wals = sorted(g for g in (_generation(n, WAL_PREFIX, ".log") for n in names) if g is not None)
+
+        base = max(snapshots) if snapshots else -1
+        if base >= 0:
+            board = board_cls.from_pairs(read_snapshot(os.path.join(directory, f"{SNAPSHOT_PREFIX}{base:012d}.bin")))
+        else:
+            board = board_cls()
+
+        for g in wals:
+            if g > base:
+                replay(board, read_wal(os.path.join(directory, f"{WAL_PREFIX}{g:012d}.log")))
+        # Log into a fresh segment; the replayed ones stay until the next snapshot
+        generation = max(wals[-1] if wals else -1, base) + 1
+        return cls(board, directory, generation=generation, **kwargs)
+
+    def _flush_loop(self):
+        """
+        Flusher thread: writes each group out once its oldest record is
+        group_interval_s old, so an idle writer does not leave it buffered.
+        """
+        with self.group_started:
+            while not self.closed:
+                if not self.buffered:
+                    self.group_started.wait()
+                    continue
+                remaining = self.group_start + self.group_interval_s - time.perf_counter()
+                if remaining > 0:
+                    self.group_started.wait(remaining)
+                    continue
+                self.sync()
+
+    def _logged(self, records: List[Tuple[int, int, int]], apply, *args, applied=None):
+        """
+        Buffers the WAL records, then applies the write to the board with apply(*args).
+        If the board rejects it, the records are dropped again and the error is raised;
+        applied(), if given, returns the records that took effect anyway (a batch
+        rejected partway through), and those stay in the log.
+        """
+        if not records:
+            return
+        with self.lock:
+            if not self.buffered:
+                self.group_start = time.perf_counter()
+                self.group_started.notify()
+            size = len(self.buffer)
+            for op, user_id, score in records:
+                self.buffer += WAL_RECORD.pack(op, user_id, score)
+            self.buffered += len(records)
+            try:
+                apply(*args)
+            except Exception:
+                # The flusher needs the lock, so the records are still the last ones buffered
+                del self.buffer[size:]
+                self.buffered -= len(records)
+                if applied is not None:
+                    kept = applied()
+                    for op, user_id, score in kept:
+                        self.buffer += WAL_RECORD.pack(op, user_id, score)
+                    self.buffered += len(kept)
+                    self.since_snapshot += len(kept)
+                raise
+            self.since_snapshot += len(records)
+            if self.buffered >= self.group_size:
+                self.sync()
+            if self.since_snapshot >= self.snapshot_every:
+                self.snapshot()
+
+    def sync(self):
+        """
+        Writes the buffered group to the WAL and fsyncs it.
+        """
+        with self.lock:
+            if not self.buffered:
+                return
+            self.wal.write(self.buffer)
+            self.wal.flush()
+            if self.fsync:
+                os.fsync(self.wal.fileno())
+            self.buffer.clear()
+            self.buffered = 0
+
+    def snapshot(self):
+        """
+        Writes a compacted snapshot of the board and rotates the WAL.
+        Files from earlier generations are removed.
+        """
+        with self.lock:
+            self._snapshot()
+
+    def _snapshot(self):
+        self.sync()
+        self.wal.close()
+        write_snapshot(self._snapshot_path(self.generation), self.board.user_map)
+        covered = self.generation
+        self.generation += 1
+        self.wal = open(self._wal_path(self.generation), "ab")
+        self.since_snapshot = 0
+        for name in os.listdir(self.directory):
+            g = _generation(name, WAL_PREFIX, ".log")
+            if g is None:
+                g = _generation(name, SNAPSHOT_PREFIX, ".bin")
+            if g is not None and g <= covered and name != os.path.basename(self._snapshot_path(covered)):
+                os.remove(os.path.join(self.directory, name))
+        if self.fsync:
+            # The new segment's directory entry (and the removals) must survive a crash too
+            fsync_directory(self.directory)
+
+    def insert(self, user_id: int, score: int):
+        self._logged([(WAL_SET, user_id, score)], self.board.insert, user_id, score)
+
+    def update(self, user_id: int, new_score: int):
+        self._logged([(WAL_SET, user_id, new_score)], self.board.update, user_id, new_score)
+
+    def delete(self, user_id: int, score: Optional[int] = None):
+        if user_id not in self.board.user_map:
+            return
+        self._logged([(WAL_DELETE, user_id, 0)], self.board.delete, user_id, score)
+
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        batch = dict(pairs)
+
+        def applied() -> List[Tuple[int, int, int]]:
+            # Boards apply batches item by item, so a rejected batch may be half applied
+            user_map = self.board.user_map
+            return [(WAL_SET, uid, score) for uid, score in batch.items() if user_map.get(uid) == score]
+
+        self._logged([(WAL_SET, uid, score) for uid, score in batch.items()], self.board.update_many, batch.items(),
+                     applied=applied)
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        self.update_many(pairs)
+
+    def search(self, user_id: int, score: Optional[int] = None) -> int:
+        return self.board.search(user_id, score)
+
+    def top_k(self, k: int) -> List[Tuple[int, int]]:
+        return self.board.top_k(k)
+
+    def __len__(self):
+        return len(self.board)
+
+    def close(self):
+        with self.lock:
+            self.sync()
+            self.closed = True
+            self.group_started.notify()
+        self.flusher.join()
+        self.wal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def replay(board, records: Iterable[Tuple[int, int, int]]):
+    """
+    Applies WAL records to board. Runs of score writes are collapsed into
+    one update_many call; the last write per user wins, as in the log.
+    """
+    run: Dict[int, int] = {}
+    for op, uid, score in records:
+        if op == WAL_DELETE:
+            if run:
+                board.update_many(run.items())
+                run = {}
+            board.delete(uid)
+        else:
+            run[uid] = score
+    if run:
+        board.update_many(run.items())
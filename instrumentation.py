@@ -0,0 +1,307 @@
+import bisect
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Type
+from sorted_array import SortedArrayLeaderboard
+from chunked_sorted_array import ChunkedSortedArrayLeaderboard
+from linked_list import LinkedListLeaderboard
+from rb_tree import RBTreeLeaderboard
+from array_rb_tree import ArrayRBTreeLeaderboard
+from skip_list import SkipListLeaderboard
+from score_indexed_array import ScoreIndexedArrayLeaderboard
+
+# Public operations whose events are counted; nested calls (update -> delete + insert)
+# are attributed to the outermost operation
+OPERATIONS = ("insert", "update", "delete", "search", "top_k", "count_above", "update_many", "search_many")
+
+class InstrumentedLeaderboard:
+    """
+    Event counting shared by the classes built by instrumented().
+
+    Each public operation collects the events it caused (rotations, shifted
+    elements, nodes visited, ...) and, when it returns, adds one sample per
+    event to a histogram keyed by (operation, event). The plain classes are
+    never touched: counting only exists in the substituted subclasses, so
+    it costs nothing when disabled. Counting hooks may redo part of the work
+    (e.g. walk a list to find how far an insert had to go), so time the
+    plain classes, not these.
+    """
+
+    def _reset_counters(self):
+        # event -> count for the operation in progress
+        self.events: Counter = Counter()
+        self.op_depth = 0
+        # operation -> number of completed calls
+        self.op_counts: Counter = Counter()
+        # (operation, event) -> {events in one call: calls}
+        self.event_histograms: Dict[tuple, Counter] = defaultdict(Counter)
+
+    def reset_counters(self):
+        """
+        Forgets everything counted so far, e.g. after building the board.
+        """
+        self._reset_counters()
+
+    def _count(self, event: str, n: int = 1):
+        # Events outside a counted operation (e.g. from around or select) are not attributed
+        if self.op_depth:
+            self.events[event] += n
+
+    def _finish(self, op: str):
+        self.op_counts[op] += 1
+        if self.events:
+            for event, n in self.events.items():
+                self.event_histograms[(op, event)][n] += 1
+            self.events.clear()
+
+    def histogram_rows(self) -> List[Dict]:
+        """
+        Returns one row per (operation, event) with the distribution of the
+        event count per call: mean, p50, p99, max, and the histogram itself
+        as "count:calls;..." pairs. Calls without the event count as 0.
+        """
+        rows = []
+        for (op, event), hist in sorted(self.event_histograms.items()):
+            calls = self.op_counts[op]
+            hist = Counter(hist)
+            zeros = calls - sum(hist.values())
+            if zeros:
+                hist[0] += zeros
+            values = sorted(hist.items())
+            total = sum(n * c for n, c in values)
+
+            def percentile(p: float) -> int:
+                target = max(p / 100.0 * calls, 1)
+                seen = 0
+                for n, c in values:
+                    seen += c
+                    if seen >= target:
+                        return n
+                return values[-1][0]
+
+            rows.append({
+                "Operation": op,
+                "Event": event,
+                "Calls": calls,
+                "Mean": total / calls if calls else 0.0,
+                "P50": percentile(50),
+                "P99": percentile(99),
+                "Max": values[-1][0],
+                "Histogram": ";".join(f"{n}:{c}" for n, c in values)
+            })
+        return rows
+
+class _SortedArrayEvents:
+    def insert(self, user_id: int, score: int):
+        if user_id not in self.user_map:
+            # insort shifts every entry after the insertion point
+            self._count("shifted", len(self.data) - bisect.bisect_right(self.data, (score, user_id)))
+        super().insert(user_id, score)
+
+    def delete(self, user_id: int, score: Optional[int] = None):
+        entry = (self.user_map.get(user_id) if score is None else score, user_id)
+        if entry[0] is not None:
+            idx = bisect.bisect_left(self.data, entry)
+            if idx < len(self.data) and self.data[idx] == entry:
+                self._count("shifted", len(self.data) - idx - 1)
+        super().delete(user_id, score)
+
+class _ChunkedSortedArrayEvents:
+    def insert(self, user_id: int, score: int):
+        if user_id not in self.user_map:
+            entry = (score, user_id)
+            i = bisect.bisect_left(self.maxes, entry)
+            if i < len(self.chunks):
+                # Only the tail of one chunk shifts
+                chunk = self.chunks[i]
+                self._count("shifted", len(chunk) - bisect.bisect_right(chunk, entry))
+        super().insert(user_id, score)
+
+    def delete(self, user_id: int, score: Optional[int] = None):
+        entry = (self.user_map.get(user_id) if score is None else score, user_id)
+        if entry[0] is not None:
+            i = bisect.bisect_left(self.maxes, entry)
+            if i < len(self.chunks):
+                chunk = self.chunks[i]
+                j = bisect.bisect_left(chunk, entry)
+                if j < len(chunk) and chunk[j] == entry:
+                    self._count("shifted", len(chunk) - j - 1)
+        super().delete(user_id, score)
+
+    def _split(self, i: int):
+        self._count("splits")
+        super()._split(i)
+
+    def _merge(self, i: int):
+        self._count("merges")
+        super()._merge(i)
+
+    def _build_index(self):
+        self._count("index_rebuilds")
+        super()._build_index()
+
+class _LinkedListEvents:
+    def _position(self, score: int, user_id: int) -> int:
+        """
+        Returns how many nodes sort before (score, user_id).
+        """
+        count = 0
+        current = self.head
+        while current and (current.score, current.user_id) < (score, user_id):
+            count += 1
+            current = current.next
+        return count
+
+    def insert(self, user_id: int, score: int):
+        if user_id not in self.user_map:
+            self._count("nodes_visited", self._position(score, user_id))
+        super().insert(user_id, score)
+
+    def delete(self, user_id: int, score: Optional[int] = None):
+        if score is None:
+            score = self.user_map.get(user_id)
+        if score is not None:
+            self._count("nodes_visited", min(self._position(score, user_id) + 1, self.size))
+        super().delete(user_id, score)
+
+    def search(self, user_id: int, score: Optional[int] = None) -> int:
+        rank = super().search(user_id, score)
+        if rank >= 0:
+            self._count("nodes_visited", rank + 1)
+        elif user_id in self.user_map:
+            self._count("nodes_visited", self.size)
+        return rank
+
+    def count_above(self, score: int) -> int:
+        self._count("nodes_visited", self.size)
+        return super().count_above(score)
+
+    def top_k(self, k: int):
+        self._count("nodes_visited", self.size)
+        return super().top_k(k)
+
+class _RBTreeEvents:
+    def _left_rotate(self, x):
+        self._count("rotations")
+        super()._left_rotate(x)
+
+    def _right_rotate(self, y):
+        self._count("rotations")
+        super()._right_rotate(y)
+
+class _SkipListEvents:
+    def _count_path(self, score: int, user_id: int):
+        """
+        Counts the levels and forward hops of the search path to (score, user_id).
+        """
+        x = self.header
+        hops = 0
+        for i in range(self.level, -1, -1):
+            while x.forward[i] and (x.forward[i].score < score or (x.forward[i].score == score and x.forward[i].user_id < user_id)):
+                hops += 1
+                x = x.forward[i]
+        self._count("levels", self.level + 1)
+        self._count("hops", hops)
+
+    def insert(self, user_id: int, score: int):
+        if user_id not in self.user_map:
+            self._count_path(score, user_id)
+        super().insert(user_id, score)
+
+    def delete(self, user_id: int, score: Optional[int] = None):
+        if score is None:
+            score = self.user_map.get(user_id)
+        if score is not None:
+            self._count_path(score, user_id)
+        super().delete(user_id, score)
+
+    def search(self, user_id: int, score: Optional[int] = None) -> int:
+        if score is None:
+            score = self.user_map.get(user_id)
+        if score is not None:
+            self._count_path(score, user_id)
+        return super().search(user_id, score)
+
+    def _finger_descend(self, score, user_id, finger, finger_rank, path, path_rank):
+        # Same walk as SkipListLeaderboard._finger_descend (update_many, search_many), counting hops
+        x = self.header
+        r = 0
+        hops = 0
+        for i in range(self.level, -1, -1):
+            if finger_rank[i] > r:
+                x = finger[i]
+                r = finger_rank[i]
+            while x.forward[i] and (x.forward[i].score < score or (x.forward[i].score == score and x.forward[i].user_id < user_id)):
+                r += x.span[i]
+                x = x.forward[i]
+                hops += 1
+            path[i] = x
+            path_rank[i] = r
+        self._count("levels", self.level + 1)
+        self._count("hops", hops)
+
+    def _build_from_sorted(self, entries):
+        # update_many rebuilds the whole list for large batches
+        self._count("rebuilt_nodes", len(entries))
+        super()._build_from_sorted(entries)
+
+class _ScoreIndexedArrayEvents:
+    def _count_at_most(self, score: int) -> int:
+        # One Fenwick node per set bit of score + 1
+        self._count("fenwick_nodes", bin(score + 1).count("1"))
+        return super()._count_at_most(score)
+
+    def _fenwick_add(self, score: int, delta: int):
+        i = score + 1
+        n = len(self.fenwick)
+        nodes = 0
+        while i < n:
+            nodes += 1
+            i += i & -i
+        self._count("fenwick_nodes", nodes)
+        super()._fenwick_add(score, delta)
+
+    def _prev_occupied(self, score: int) -> int:
+        self._count("buckets_visited")
+        return super()._prev_occupied(score)
+
+# Board class -> mixin overriding its internals to count events
+EVENT_HOOKS = {
+    SortedArrayLeaderboard: _SortedArrayEvents,
+    ChunkedSortedArrayLeaderboard: _ChunkedSortedArrayEvents,
+    LinkedListLeaderboard: _LinkedListEvents,
+    RBTreeLeaderboard: _RBTreeEvents,
+    ArrayRBTreeLeaderboard: _RBTreeEvents,
+    SkipListLeaderboard: _SkipListEvents,
+    ScoreIndexedArrayLeaderboard: _ScoreIndexedArrayEvents,
+}
+
+def _counted(op: str, base_method):
+    def method(self, *args, **kwargs):
+        self.op_depth += 1
+        try:
+            return base_method(self, *args, **kwargs)
+        finally:
+            self.op_depth -= 1
+            if not self.op_depth:
+                self._finish(op)
+    method.__name__ = op
+    return method
+
+def instrumented(board_cls: Type) -> Type:
+    """
+    Returns a subclass of board_cls that counts per-operation events into
+    histograms (see InstrumentedLeaderboard). Classes without event hooks
+    only count calls.
+    """
+    hooks = EVENT_HOOKS.get(board_cls)
+    base = type(f"_{board_cls.__name__}Events", (hooks, board_cls), {}) if hooks else board_cls
+    namespace = {op: _counted(op, getattr(base, op)) for op in OPERATIONS if hasattr(base, op)}
+
+    def __init__(self, *args, **kwargs):
+        self._reset_counters()
+        base.__init__(self, *args, **kwargs)
+
+    namespace["__init__"] = __init__
+    cls = type(f"Instrumented{board_cls.__name__}", (InstrumentedLeaderboard, base), namespace)
+    cls.board_cls = board_cls
+    return cls
@@ -1,4 +1,6 @@
-from typing import Optional, Tuple, Dict, List
+import math
+from collections import deque
+from typing import Optional, Tuple, Dict, List, Iterable
 
 class ListNode:
     def __init__(self, user_id: int, score: int):
@@ -12,6 +14,26 @@ class LinkedListLeaderboard:
         self.size = 0
         self.user_map: Dict[int, int] = {} # user_id -> score
 
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]]) -> 'LinkedListLeaderboard':
+        """
+        Builds a leaderboard from (user_id, score) pairs.
+        Sorts once, then links the nodes in a single pass.
+        Time Complexity: O(n log n)
+        """
+        lb = cls()
+        lb.user_map = dict(pairs)
+        entries = sorted((score, uid) for uid, score in lb.user_map.items())
+        # Link back to front so each node is created already pointing at its successor
+        head = None
+        for score, uid in reversed(entries):
+            node = ListNode(uid, score)
+            node.next = head
+            head = node
+        lb.head = head
+        lb.size = len(entries)
+        return lb
+
     def insert(self, user_id: int, score: int):
         """
         Inserts a new user score in sorted order (ascending score).
@@ -84,6 +106,60 @@ class LinkedListLeaderboard:
         # Insert new
         self.insert(user_id, new_score)
 
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Applies a batch of (user_id, new_score) pairs; unknown users are inserted.
+        Sorts the batch, then walks the list once with a cursor into the
+        sorted batch, unlinking old entries and splicing in new ones.
+        Time Complexity: O(n + b log b)
+        """
+        batch = dict(pairs)
+        if not batch:
+            return
+        self.user_map.update(batch)
+        new_entries = sorted((score, uid) for uid, score in batch.items())
+        m = len(new_entries)
+        i = 0
+        removed = 0
+
+        # Sentinel in front of head so unlinking and splicing need no special case
+        dummy = ListNode(-1, -1)
+        dummy.next = self.head
+        prev = dummy
+        while prev.next:
+            node = prev.next
+            if node.user_id in batch:
+                # Old entry of a batched user
+                prev.next = node.next
+                removed += 1
+                continue
+            key = (node.score, node.user_id)
+            while i < m and new_entries[i] < key:
+                score, uid = new_entries[i]
+                new_node = ListNode(uid, score)
+                new_node.next = node
+                prev.next = new_node
+                prev = new_node
+                i += 1
+            prev = node
+
+        # Remaining batch entries go after the last node
+        while i < m:
+            score, uid = new_entries[i]
+            new_node = ListNode(uid, score)
+            prev.next = new_node
+            prev = new_node
+            i += 1
+
+        self.head = dummy.next
+        self.size += m - removed
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Inserts a batch of (user_id, score) pairs; existing users are updated.
+        """
+        self.update_many(pairs)
+
     def search(self, user_id: int, score: Optional[int] = None) -> int:
         """
         Finds the rank (0-based index) of the user.
@@ -102,6 +178,126 @@ class LinkedListLeaderboard:
             index += 1
         return -1
 
+    def search_many(self, user_ids: Iterable[int]) -> List[int]:
+        """
+        Finds the ranks of many users at once (-1 for unknown users).
+        Sorts the query keys, then answers the whole batch in one pass
+        over the list instead of one walk per query.
+        Time Complexity: O(n + q log q)
+        """
+        user_map = self.user_map
+        ids = list(user_ids)
+        result = [-1] * len(ids)
+        queries = []
+        for i, uid in enumerate(ids):
+            score = user_map.get(uid)
+            if score is not None:
+                queries.append((score, uid, i))
+        queries.sort()
+        current = self.head
+        index = 0
+        qi = 0
+        while current and qi < len(queries):
+            key = (current.score, current.user_id)
+            while qi < len(queries) and queries[qi][:2] <= key:
+                if queries[qi][:2] == key:
+                    result[queries[qi][2]] = index
+                qi += 1
+            current = current.next
+            index += 1
+        return result
+
+    def count_above(self, score: int) -> int:
+        """
+        Returns the number of users with a score strictly greater than score.
+        Time Complexity: O(n)
+        """
+        count = 0
+        current = self.head
+        while current:
+            if current.score > score:
+                count += 1
+            current = current.next
+        return count
+
+    def percentile(self, user_id: int) -> float:
+        """
+        Returns the user's standing as a top percentage ("top 3.2%"):
+        100 * (users with a higher score + 1) / n, or -1.0 for unknown users.
+        Time Complexity: O(n)
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return -1.0
+        return 100.0 * (self.count_above(score) + 1) / len(self.user_map)
+
+    def score_at_percentile(self, p: float) -> Optional[int]:
+        """
+        Returns the lowest score s with at least p percent of users scoring <= s
+        (nearest-rank method), or None if the board is empty.
+        Time Complexity: O(n)
+        """
+        if p < 0 or p > 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        n = len(self.user_map)
+        if not n:
+            return None
+        # The ceil(p% of n)-th lowest score, counting from 1
+        rank = max(math.ceil(p * n / 100), 1) - 1
+        return self.select(rank)[1]
+
+    def select(self, rank: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (user_id, score) with the given rank (as returned by search),
+        or None if the rank is out of range.
+        Time Complexity: O(rank)
+        """
+        page = self.range_by_rank(rank, rank + 1)
+        return page[0] if page else None
+
+    def range_by_rank(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Returns (user_id, score) pairs for ranks start..stop-1, in rank order.
+        A list has no index, so this walks to start first.
+        Time Complexity: O(stop)
+        """
+        start = max(start, 0)
+        result = []
+        current = self.head
+        index = 0
+        while current and index < stop:
+            if index >= start:
+                result.append((current.user_id, current.score))
+            current = current.next
+            index += 1
+        return result
+
+    def around(self, user_id: int, radius: int) -> List[Tuple[int, int]]:
+        """
+        Returns the user with up to radius users ranked above and below,
+        highest score first, as (user_id, score) tuples; [] for unknown users.
+        Keeps the last radius nodes while walking to the user.
+        Time Complexity: O(rank + radius)
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return []
+        below = deque(maxlen=max(radius, 0))
+        current = self.head
+        while current and not (current.user_id == user_id and current.score == score):
+            below.append((current.user_id, current.score))
+            current = current.next
+        if current is None:
+            return []
+        window = [(current.user_id, current.score)]
+        current = current.next
+        while current and len(window) <= radius:
+            window.append((current.user_id, current.score))
+            current = current.next
+        window.reverse()
+        window.extend(reversed(below))
+        return window
+
     def top_k(self, k: int) -> List[Tuple[int, int]]:
         """
         Returns the top k users with highest scores.
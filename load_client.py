@@ -0,0 +1,147 @@
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from benchmark_utils import generate_data, print_stats, LatencyHistogram
+from server import (
+    BOARD_CLASSES, FRAME_HEADER, OP_INSERT, OP_UPDATE, OP_SEARCH, OP_TOP_K,
+    encode_request, decode_response, run_server
+)
+
+TOP_K = 100
+OP_NAMES = {OP_INSERT: "Insert", OP_UPDATE: "Update", OP_SEARCH: "Search", OP_TOP_K: "TopK"}
+
+async def _open(host: str, port: int, path: Optional[str]):
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+async def _drive(host: str, port: int, path: Optional[str], requests: List[Tuple[int, tuple]],
+                 depth: int, latencies: Dict[int, LatencyHistogram]):
+    """
+    Sends requests over one connection with up to depth requests in flight,
+    recording each one's round-trip time in ns under its opcode.
+    """
+    reader, writer = await _open(host, port, path)
+    window = asyncio.Semaphore(depth)
+    # (opcode, send time) of requests awaiting their response, in send order
+    in_flight = deque()
+    errors = 0
+
+    async def receive():
+        nonlocal errors
+        for _ in range(len(requests)):
+            header = await reader.readexactly(FRAME_HEADER.size)
+            payload = await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+            end = time.perf_counter_ns()
+            op, start = in_flight.popleft()
+            try:
+                decode_response(op, payload)
+            except RuntimeError:
+                errors += 1
+            latencies[op].record(end - start)
+            window.release()
+
+    receiver = asyncio.create_task(receive())
+    for op, args in requests:
+        await window.acquire()
+        in_flight.append((op, time.perf_counter_ns()))
+        writer.write(encode_request(op, *args))
+        await writer.drain()
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+    return errors
+
+async def run_load(host: str = "127.0.0.1", port: int = 7070, path: Optional[str] = None,
+                   n: int = 10000, total_requests: int = 100000, connections: int = 4, depth: int = 32,
+                   search_ratio: float = 0.25, topk_ratio: float = 0.05) -> Dict[str, Dict[str, float]]:
+    """
+    Preloads n users, then runs a mixed update/search/top_k workload spread
+    over several pipelined connections and reports latency stats per operation.
+    """
+    data = generate_data(n)
+    user_ids = [uid for uid, _ in data]
+
+    # Preload, pipelined, without measuring
+    load_latencies = {op: LatencyHistogram() for op in OP_NAMES}
+    chunks = [data[i::connections] for i in range(connections)]
+    await asyncio.gather(*[
+        _drive(host, port, path, [(OP_INSERT, pair) for pair in chunk], depth, load_latencies)
+        for chunk in chunks
+    ])
+
+    workloads = []
+    per_conn = total_requests // connections
+    for _ in range(connections):
+        requests = []
+        for _ in range(per_conn):
+            r = random.random()
+            if r < topk_ratio:
+                requests.append((OP_TOP_K, (TOP_K,)))
+            elif r < topk_ratio + search_ratio:
+                requests.append((OP_SEARCH, (random.choice(user_ids),)))
+            else:
+                # Max score constraint for ScoreIndexedArrayLeaderboard
+                requests.append((OP_UPDATE, (random.choice(user_ids), random.randint(0, 15000))))
+        workloads.append(requests)
+
+    latencies = {op: LatencyHistogram() for op in OP_NAMES}
+    start = time.perf_counter_ns()
+    errors = await asyncio.gather(*[_drive(host, port, path, w, depth, latencies) for w in workloads])
+    elapsed_s = (time.perf_counter_ns() - start) / 1e9
+
+    done = sum(len(w) for w in workloads)
+    print(f"{done} requests over {connections} connections (depth {depth}) in {elapsed_s:.3f} s: "
+          f"{done / elapsed_s:.0f} req/s, {sum(errors)} errors")
+    results = {}
+    for op, name in OP_NAMES.items():
+        if latencies[op]:
+            stats = latencies[op].stats()
+            print_stats("Server", name, len(latencies[op]), stats)
+            results[name] = stats
+    return results
+
+async def _wait_for_server(host: str, port: int, path: Optional[str], timeout_s: float = 10.0):
+    deadline = time.monotonic() + timeout_s
+    while True:
+        try:
+            reader, writer = await _open(host, port, path)
+            writer.close()
+            await writer.wait_closed()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for server.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7070)
+    parser.add_argument("--unix", default=None, help="Unix socket path (overrides --host/--port)")
+    parser.add_argument("--spawn", default=None, choices=sorted(BOARD_CLASSES),
+                        help="Start a server for this board class in a child process first")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=32, help="Pipelined requests in flight per connection")
+    args = parser.parse_args()
+
+    server_proc = None
+    if args.spawn:
+        server_proc = multiprocessing.Process(target=run_server, args=(args.spawn, args.host, args.port, args.unix), daemon=True)
+        server_proc.start()
+    try:
+        asyncio.run(_wait_for_server(args.host, args.port, args.unix))
+        asyncio.run(run_load(args.host, args.port, args.unix, args.users, args.requests, args.connections, args.depth))
+    finally:
+        if server_proc is not None:
+            server_proc.terminate()
+            server_proc.join()
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,32 @@
+import argparse
 import random
 import csv
 import time
-from typing import List, Type, Dict
-from benchmark_utils import generate_data, calculate_stats, print_stats, BenchmarkTimer
+import tracemalloc
+import os
+import tempfile
+import gc
+import multiprocessing
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Type, Dict, Tuple, Optional
+from benchmark_utils import (
+    generate_data, calculate_stats, print_stats, BenchmarkTimer, LatencyHistogram,
+    score_sampler, user_picker, rss_bytes, timer_overhead_ns, time_batched,
+    SCORE_DISTRIBUTIONS, USER_DISTRIBUTIONS, TIMING_MODES
+)
 from sorted_array import SortedArrayLeaderboard
+from chunked_sorted_array import ChunkedSortedArrayLeaderboard
 from linked_list import LinkedListLeaderboard
 from rb_tree import RBTreeLeaderboard
+from array_rb_tree import ArrayRBTreeLeaderboard
 from skip_list import SkipListLeaderboard
 from score_indexed_array import ScoreIndexedArrayLeaderboard
+from topk_view import materialized
+from sharded import ShardedLeaderboard
+from durable import DurableLeaderboard
+from instrumentation import instrumented
+from profiling import profile_call, PROFILE_MODES
 
 # Configuration
 BATCH_SIZES = [5000, 10000, 20000, 50000, 100000]
@@ -15,13 +34,115 @@ OPERATIONS_COUNT = 1000 # Number of operations to measure for stats
 SIMULATION_DURATION_SEC = 3
 CHURN_RATE = 0.3 # 30% of users update per second
 TOP_K = 100 # Number of top elements to retrieve
+BATCHED_UPDATES = False # Realtime sims apply each tick's updates through update_many
+SCORE_DISTRIBUTION = "uniform" # Scores of the initial population and of updates (see score_sampler)
+USER_DISTRIBUTION = "uniform" # Which users the realtime sims update (see user_picker)
+SHARD_COUNTS = [1, 2, 4, 8] # Worker processes for the sharded scaling scenario
+SHARD_DATASET_SIZE = 100000 # The sharded scenario runs at this size only, not at every BATCH_SIZES entry
+WORKERS = 0 # Benchmark cells run in a process pool of this size; 0 runs them serially in this process
+PIN_CPUS = False # Pin each pool worker to its own CPU (Linux only)
+SLO_P99_US = 1000.0 # Open-loop saturation search: highest rate whose update p99 stays under this
+OPEN_LOOP_PROBE_SEC = 1.0 # Duration of each open-loop rate probe
+OPEN_LOOP_START_RATE = 500 # First rate probed, in updates/s; doubled until the SLO breaks
+OPEN_LOOP_MAX_RATE = 2000000
+OPEN_LOOP_MAX_LAG_SEC = 1.0 # A probe this far behind schedule is abandoned as saturated
+OPEN_LOOP_SPIN_NS = 5000000 # Busy-wait instead of sleeping when the next operation is due this soon
+# Per class and size scenarios; durability, memory, saturation and sharded are slow and run only when selected
+ALL_SCENARIOS = ("micro", "realtime", "topk_micro", "topk_realtime", "durability", "memory", "saturation", "sharded")
+SCENARIOS = ("micro", "realtime", "topk_micro", "topk_realtime")
+TIMING_MODE = "per_call" # Micro and top-K micro timing: "per_call" (timer overhead subtracted) or "batched"; realtime sims always time per call
+TIMING_BLOCK_SIZE = 100 # Calls per timed block in batched mode
+PROFILE = None # Profile every cell: None, "cprofile" (deterministic) or "sample" (SIGPROF stack sampling)
+PROFILE_DIR = "profiles" # Per-cell .pstats / .folded files go here
+INSTRUMENT = False # Also run the instrumented event-count pass (instrumentation_benchmark_results.csv)
+SATURATION_SEARCH_STEPS = 6 # Binary search steps between the last passing and first failing rate
 
-def run_benchmark(cls: Type, batch_size: int):
+def time_bulk_init(cls: Type, data) -> float:
+    """
+    Times building a leaderboard through cls.from_pairs, in microseconds.
+    """
+    start = time.perf_counter_ns()
+    cls.from_pairs(data)
+    end = time.perf_counter_ns()
+    return (end - start) / 1000.0
+
+def apply_updates(lb, update_candidates, batched: bool, update_latencies: LatencyHistogram, next_score=None,
+                  overhead_ns: int = 0) -> int:
+    """
+    Applies one tick of random score updates and returns the tick's update time in ns.
+    next_score maps a user's current score to the new one (uniform by default).
+    Single mode records one latency per update, less overhead_ns (the timer
+    overhead); batched mode hands the whole tick to update_many and records
+    that one call's latency, so the histogram then holds batches, not updates
+    (see update_stats).
+    """
+    if next_score is None:
+        # Max score constraint for ScoreIndexedArrayLeaderboard
+        next_score = score_sampler("uniform", 15000)
+    user_map = lb.user_map
+    if batched:
+        pairs = [(uid, next_score(user_map.get(uid))) for uid, _ in update_candidates]
+        op_start = time.perf_counter_ns()
+        lb.update_many(pairs)
+        op_end = time.perf_counter_ns()
+        if pairs:
+            update_latencies.append(op_end - op_start - overhead_ns)
+        return op_end - op_start
+
+    tick_ns = 0
+    for uid, _ in update_candidates:
+        new_score = next_score(user_map.get(uid))
+        op_start = time.perf_counter_ns()
+        lb.update(uid, new_score)
+        op_end = time.perf_counter_ns()
+        update_latencies.append(op_end - op_start - overhead_ns)
+        tick_ns += op_end - op_start
+    return tick_ns
+
+def update_stats(update_latencies: LatencyHistogram, batched: bool, updates: int):
+    """
+    Splits a realtime run's update histogram (see apply_updates) into
+    (per-update stats, per-batch stats) in microseconds. In batched mode the
+    per-update stats keep only the amortized Average, with every percentile
+    left empty, since no single update was timed; in single mode the
+    per-batch stats are all empty.
+    """
+    stats = update_latencies.stats()
+    if not batched:
+        return stats, dict.fromkeys(stats, "")
+    per_update = dict.fromkeys(stats, "")
+    per_update["Average"] = update_latencies.total / updates / 1000.0 if updates else 0.0
+    return per_update, stats
+
+def time_calls(op, args_list: List[tuple], timing: str = TIMING_MODE, block_size: int = TIMING_BLOCK_SIZE) -> Dict[str, float]:
+    """
+    Calls op(*args) for each entry of args_list and returns calculate_stats
+    fields in microseconds. per_call times every call and subtracts the
+    calibrated timer overhead; batched times blocks of block_size calls
+    (see time_batched), for operations too fast to time one by one.
+    """
+    if timing == "batched":
+        return time_batched(op, args_list, block_size)
+    times = []
+    for args in args_list:
+        start = time.perf_counter_ns()
+        op(*args)
+        end = time.perf_counter_ns()
+        times.append(end - start)
+    return calculate_stats(times, timer_overhead_ns())
+
+def timing_label(timing: str) -> str:
+    """
+    Returns the TimingMode column value for a micro benchmark timing mode.
+    """
+    return timing if timing == "per_call" else f"batched x{TIMING_BLOCK_SIZE}"
+
+def run_benchmark(cls: Type, batch_size: int, score_dist: str = SCORE_DISTRIBUTION, timing: str = TIMING_MODE):
     name = cls.__name__
-    print(f"Benchmarking {name} with {batch_size} elements (Micro)...")
+    print(f"Benchmarking {name} with {batch_size} elements (Micro, {score_dist} scores, {timing} timing)...")
     
     # 1. Initialization
-    data = generate_data(batch_size)
+    data = generate_data(batch_size, score_dist=score_dist)
     lb = cls()
     
     # Pre-fill
@@ -31,67 +152,48 @@ def run_benchmark(cls: Type, batch_size: int):
     end_init = time.perf_counter_ns()
     init_time_us = (end_init - start_init) / 1000.0
     print(f"Initialization took {init_time_us:.2f} us (Total)")
+    bulk_init_us = time_bulk_init(cls, data)
+    print(f"Bulk initialization took {bulk_init_us:.2f} us (from_pairs)")
 
     # 2. Insert Benchmark
-    insert_times = []
     # Generate new data for insertion
-    new_data = generate_data(OPERATIONS_COUNT)
-    
-    for uid, score in new_data:
-        start = time.perf_counter_ns()
-        lb.insert(uid, score)
-        end = time.perf_counter_ns()
-        insert_times.append(end - start)
-        
-    insert_stats = calculate_stats(insert_times)
+    new_data = generate_data(OPERATIONS_COUNT, score_dist=score_dist)
+    insert_stats = time_calls(lb.insert, new_data, timing)
     print_stats(name, "Insert", OPERATIONS_COUNT, insert_stats)
 
     # 3. Search Benchmark
-    search_times = []
     # Search for random existing items
     # We use the original data + inserted data
     all_data = data + new_data
     search_targets = random.sample(all_data, OPERATIONS_COUNT)
     
-    for uid, score in search_targets:
-        start = time.perf_counter_ns()
-        lb.search(uid, score) # Search now uses user_map internally if score not provided, but here we provide it? 
-        # Wait, the classes were updated to take optional score.
-        # If we provide score, it might use the optimized path (e.g. bisect with key).
-        # If we don't, it does map lookup then search.
-        # Micro-benchmark usually tests the raw structure performance.
-        # But `search(uid)` is the realistic usage.
-        # Let's check the implementations. 
-        # SortedArray: if score is None, map lookup. Then bisect.
-        # So providing score avoids map lookup.
-        # Realtime sim uses `search(uid)`.
-        # Micro-benchmark should probably also use `search(uid)` to be consistent with "Search by ID" requirement?
-        # Or `search(uid, score)` to test pure structure search?
-        # The prompt said "benchmark operations... find".
-        # Let's stick to `lb.search(uid)` to include the map lookup cost which is part of the "Leaderboard" abstraction cost.
-        # Actually, let's pass `score` as None to force map lookup if that's the intended usage.
-        # But wait, `search` signature in my code: `def search(self, user_id: int, score: Optional[int] = None) -> int:`
-        # So I should call `lb.search(uid)`.
-        end = time.perf_counter_ns()
-        search_times.append(end - start)
-        
-    search_stats = calculate_stats(search_times)
+    # Searches pass the known score, which skips the user_map lookup
+    search_stats = time_calls(lb.search, search_targets, timing)
     print_stats(name, "Search", OPERATIONS_COUNT, search_stats)
 
+    # 3b. Baseline linear-scan search, for structures that keep one
+    scan_stats = None
+    if hasattr(lb, "search_scan"):
+        scan_stats = time_calls(lb.search_scan, [(uid,) for uid, _ in search_targets], timing)
+        print_stats(name, "Search (scan)", OPERATIONS_COUNT, scan_stats)
+
+    # 3c. Percentile Benchmark
+    percentile_stats = time_calls(lb.percentile, [(uid,) for uid, _ in search_targets], timing)
+    print_stats(name, "Percentile", OPERATIONS_COUNT, percentile_stats)
+
+    percentiles = [(random.uniform(0, 100),) for _ in range(OPERATIONS_COUNT)]
+    score_at_stats = time_calls(lb.score_at_percentile, percentiles, timing)
+    print_stats(name, "Score at percentile", OPERATIONS_COUNT, score_at_stats)
+
     # 4. Delete Benchmark
-    delete_times = []
     # Delete random existing items
     delete_targets = random.sample(all_data, OPERATIONS_COUNT)
-    
-    for uid, score in delete_targets:
-        start = time.perf_counter_ns()
-        lb.delete(uid) # Same here, let's rely on map lookup
-        end = time.perf_counter_ns()
-        delete_times.append(end - start)
-        
-    delete_stats = calculate_stats(delete_times)
+    # Same here, let's rely on map lookup
+    delete_stats = time_calls(lb.delete, [(uid,) for uid, _ in delete_targets], timing)
     print_stats(name, "Delete", OPERATIONS_COUNT, delete_stats)
-    
+
+    # Bytes per user are not measured here: see the memory scenario's
+    # InsertTraced_BytesPerUser (per-item inserts) and Traced_BytesPerUser (from_pairs)
     return {
         "Name": name,
         "BatchSize": batch_size,
@@ -101,15 +203,30 @@ def run_benchmark(cls: Type, batch_size: int):
         "Search_Avg_us": search_stats["Average"],
         "Search_P99_us": search_stats["P99"],
         "Delete_Avg_us": delete_stats["Average"],
-        "Delete_P99_us": delete_stats["P99"]
+        "Delete_P99_us": delete_stats["P99"],
+        "SearchScan_Avg_us": scan_stats["Average"] if scan_stats else "",
+        "SearchScan_P99_us": scan_stats["P99"] if scan_stats else "",
+        "InitBulk_us": bulk_init_us,
+        "Percentile_Avg_us": percentile_stats["Average"],
+        "Percentile_P99_us": percentile_stats["P99"],
+        "ScoreAtPercentile_Avg_us": score_at_stats["Average"],
+        "ScoreAtPercentile_P99_us": score_at_stats["P99"],
+        "ScoreDist": score_dist,
+        "TimingMode": timing_label(timing),
+        "TimerOverhead_ns": timer_overhead_ns() if timing == "per_call" else "",
+        "Insert_CI95_us": insert_stats["CI95"],
+        "Search_CI95_us": search_stats["CI95"],
+        "Delete_CI95_us": delete_stats["CI95"]
     }
 
-def run_realtime_simulation(cls: Type, n: int):
+def run_realtime_simulation(cls: Type, n: int, batched: bool = BATCHED_UPDATES,
+                            score_dist: str = SCORE_DISTRIBUTION, user_dist: str = USER_DISTRIBUTION):
     name = cls.__name__
-    print(f"Benchmarking {name} with {n} elements (Realtime Sim)...")
+    mode = "batched" if batched else "single"
+    print(f"Benchmarking {name} with {n} elements (Realtime Sim, {mode} updates, {score_dist} scores, {user_dist} users)...")
     
     # 1. Initialization
-    data = generate_data(n)
+    data = generate_data(n, score_dist=score_dist)
     lb = cls()
     
     start_init = time.perf_counter_ns()
@@ -118,13 +235,23 @@ def run_realtime_simulation(cls: Type, n: int):
     end_init = time.perf_counter_ns()
     init_time_us = (end_init - start_init) / 1000.0
     print(f"Initialization took {init_time_us:.2f} us (Total)")
+    bulk_init_us = time_bulk_init(cls, data)
+    print(f"Bulk initialization took {bulk_init_us:.2f} us (from_pairs)")
 
     # 2. Realtime Simulation
     # Target operations per second
     target_ops_per_sec = int(n * CHURN_RATE)
+    pick_users = user_picker(data, user_dist)
+    next_score = score_sampler(score_dist)
     
-    update_latencies = []
-    search_latencies = []
+    update_latencies = LatencyHistogram()
+    update_throughputs = []
+    total_updates = 0
+    search_latencies = LatencyHistogram()
+    scan_latencies = LatencyHistogram()
+    has_scan = hasattr(lb, "search_scan")
+    # Every operation is timed on its own; subtract the timer overhead as per_call micro timing does
+    overhead_ns = timer_overhead_ns()
     
     start_sim = time.time()
     iterations = 0
@@ -134,30 +261,37 @@ def run_realtime_simulation(cls: Type, n: int):
         batch_searches = target_ops_per_sec
         
         # Prepare data for this batch
-        update_candidates = random.sample(data, batch_updates)
+        update_candidates = pick_users(batch_updates)
         search_candidates = random.sample(data, batch_searches)
         
         batch_start = time.perf_counter_ns()
         
         # Updates
-        for uid, _ in update_candidates:
-            new_score = random.randint(0, 15000)  # Max score constraint for ScoreIndexedArrayLeaderboard
-            op_start = time.perf_counter_ns()
-            lb.update(uid, new_score)
-            op_end = time.perf_counter_ns()
-            update_latencies.append(op_end - op_start)
+        update_ns = apply_updates(lb, update_candidates, batched, update_latencies, next_score, overhead_ns)
+        total_updates += len(update_candidates)
+        update_throughput = batch_updates / (update_ns / 1e9) if update_ns else 0.0
+        update_throughputs.append(update_throughput)
             
         # Searches
         for uid, _ in search_candidates:
             op_start = time.perf_counter_ns()
             lb.search(uid)
             op_end = time.perf_counter_ns()
-            search_latencies.append(op_end - op_start)
+            search_latencies.append(op_end - op_start - overhead_ns)
             
         batch_end = time.perf_counter_ns()
         batch_duration_sec = (batch_end - batch_start) / 1e9
+
+        # Baseline scan searches, timed outside the batch budget on a
+        # sample so the O(max_score) scan does not stretch the run
+        if has_scan:
+            for uid, _ in search_candidates[:OPERATIONS_COUNT]:
+                op_start = time.perf_counter_ns()
+                lb.search_scan(uid)
+                op_end = time.perf_counter_ns()
+                scan_latencies.append(op_end - op_start - overhead_ns)
         
-        print(f"  Sec {iterations+1}: Processed {batch_updates} updates + {batch_searches} searches in {batch_duration_sec:.4f}s")
+        print(f"  Sec {iterations+1}: Processed {batch_updates} updates + {batch_searches} searches in {batch_duration_sec:.4f}s ({update_throughput:.0f} updates/s)")
         
         iterations += 1
         if iterations >= SIMULATION_DURATION_SEC:
@@ -168,28 +302,57 @@ def run_realtime_simulation(cls: Type, n: int):
         else:
             print(f"  WARNING: Falling behind! Batch took {batch_duration_sec:.4f}s")
 
-    update_stats = calculate_stats(update_latencies)
-    search_stats = calculate_stats(search_latencies)
+    update_op_stats, update_batch_stats = update_stats(update_latencies, batched, total_updates)
+    avg_throughput = sum(update_throughputs) / len(update_throughputs) if update_throughputs else 0.0
+    print(f"Average update throughput: {avg_throughput:.0f} updates/s ({mode})")
+    search_stats = search_latencies.stats()
     
-    print_stats(name, "Realtime Update", len(update_latencies), update_stats)
+    if batched:
+        print_stats(name, "Realtime Update (per update_many)", len(update_latencies), update_batch_stats)
+    else:
+        print_stats(name, "Realtime Update", len(update_latencies), update_op_stats)
     print_stats(name, "Realtime Search", len(search_latencies), search_stats)
+    scan_stats = None
+    if has_scan:
+        scan_stats = scan_latencies.stats()
+        print_stats(name, "Realtime Search (scan)", len(scan_latencies), scan_stats)
     
     return {
         "Name": name,
         "BatchSize": n,
         "InitTotal_us": init_time_us,
-        "Update_Avg_us": update_stats["Average"],
-        "Update_P99_us": update_stats["P99"],
+        "Update_Avg_us": update_op_stats["Average"],
+        "Update_P99_us": update_op_stats["P99"],
         "Search_Avg_us": search_stats["Average"],
-        "Search_P99_us": search_stats["P99"]
+        "Search_P99_us": search_stats["P99"],
+        "SearchScan_Avg_us": scan_stats["Average"] if scan_stats else "",
+        "SearchScan_P99_us": scan_stats["P99"] if scan_stats else "",
+        "InitBulk_us": bulk_init_us,
+        "UpdateMode": mode,
+        "UpdateThroughput_ops": avg_throughput,
+        "ScoreDist": score_dist,
+        "UserDist": user_dist,
+        "Update_P50_us": update_op_stats["P50"],
+        "Update_P9999_us": update_op_stats["P99.99"],
+        "Update_Max_us": update_op_stats["Max"],
+        "Search_P50_us": search_stats["P50"],
+        "Search_P9999_us": search_stats["P99.99"],
+        "Search_Max_us": search_stats["Max"],
+        "TimingMode": "per_call",
+        "TimerOverhead_ns": overhead_ns,
+        "UpdateBatch_Avg_us": update_batch_stats["Average"],
+        "UpdateBatch_P50_us": update_batch_stats["P50"],
+        "UpdateBatch_P99_us": update_batch_stats["P99"],
+        "UpdateBatch_Max_us": update_batch_stats["Max"]
     }
 
-def run_topk_benchmark(cls: Type, batch_size: int, k: int = TOP_K):
+def run_topk_benchmark(cls: Type, batch_size: int, k: int = TOP_K, score_dist: str = SCORE_DISTRIBUTION,
+                       timing: str = TIMING_MODE):
     name = cls.__name__
-    print(f"Benchmarking {name} with {batch_size} elements (Top-K Micro, k={k})...")
+    print(f"Benchmarking {name} with {batch_size} elements (Top-K Micro, k={k}, {score_dist} scores, {timing} timing)...")
     
     # 1. Initialization
-    data = generate_data(batch_size)
+    data = generate_data(batch_size, score_dist=score_dist)
     lb = cls()
     
     # Pre-fill
@@ -199,17 +362,11 @@ def run_topk_benchmark(cls: Type, batch_size: int, k: int = TOP_K):
     end_init = time.perf_counter_ns()
     init_time_us = (end_init - start_init) / 1000.0
     print(f"Initialization took {init_time_us:.2f} us (Total)")
+    bulk_init_us = time_bulk_init(cls, data)
+    print(f"Bulk initialization took {bulk_init_us:.2f} us (from_pairs)")
 
     # 2. Top-K Query Benchmark
-    topk_times = []
-    
-    for _ in range(OPERATIONS_COUNT):
-        start = time.perf_counter_ns()
-        lb.top_k(k)
-        end = time.perf_counter_ns()
-        topk_times.append(end - start)
-        
-    topk_stats = calculate_stats(topk_times)
+    topk_stats = time_calls(lb.top_k, [(k,)] * OPERATIONS_COUNT, timing)
     print_stats(name, f"Top-{k}", OPERATIONS_COUNT, topk_stats)
     
     return {
@@ -218,15 +375,22 @@ def run_topk_benchmark(cls: Type, batch_size: int, k: int = TOP_K):
         "K": k,
         "InitTotal_us": init_time_us,
         "TopK_Avg_us": topk_stats["Average"],
-        "TopK_P99_us": topk_stats["P99"]
+        "TopK_P99_us": topk_stats["P99"],
+        "InitBulk_us": bulk_init_us,
+        "ScoreDist": score_dist,
+        "TimingMode": timing_label(timing),
+        "TimerOverhead_ns": timer_overhead_ns() if timing == "per_call" else "",
+        "TopK_CI95_us": topk_stats["CI95"]
     }
 
-def run_topk_realtime_simulation(cls: Type, n: int, k: int = TOP_K):
+def run_topk_realtime_simulation(cls: Type, n: int, k: int = TOP_K, batched: bool = BATCHED_UPDATES,
+                                 score_dist: str = SCORE_DISTRIBUTION, user_dist: str = USER_DISTRIBUTION):
     name = cls.__name__
-    print(f"Benchmarking {name} with {n} elements (Top-K Realtime Sim, k={k})...")
+    mode = "batched" if batched else "single"
+    print(f"Benchmarking {name} with {n} elements (Top-K Realtime Sim, k={k}, {mode} updates, {score_dist} scores, {user_dist} users)...")
     
     # 1. Initialization
-    data = generate_data(n)
+    data = generate_data(n, score_dist=score_dist)
     lb = cls()
     
     start_init = time.perf_counter_ns()
@@ -235,13 +399,20 @@ def run_topk_realtime_simulation(cls: Type, n: int, k: int = TOP_K):
     end_init = time.perf_counter_ns()
     init_time_us = (end_init - start_init) / 1000.0
     print(f"Initialization took {init_time_us:.2f} us (Total)")
+    bulk_init_us = time_bulk_init(cls, data)
+    print(f"Bulk initialization took {bulk_init_us:.2f} us (from_pairs)")
 
     # 2. Realtime Simulation with Top-K queries
     # Target operations per second
     target_ops_per_sec = int(n * CHURN_RATE)
+    pick_users = user_picker(data, user_dist)
+    next_score = score_sampler(score_dist)
     
-    update_latencies = []
-    topk_latencies = []
+    update_latencies = LatencyHistogram()
+    update_throughputs = []
+    total_updates = 0
+    topk_latencies = LatencyHistogram()
+    overhead_ns = timer_overhead_ns()
     
     start_sim = time.time()
     iterations = 0
@@ -251,29 +422,27 @@ def run_topk_realtime_simulation(cls: Type, n: int, k: int = TOP_K):
         batch_topk = target_ops_per_sec
         
         # Prepare data for this batch
-        update_candidates = random.sample(data, batch_updates)
+        update_candidates = pick_users(batch_updates)
         
         batch_start = time.perf_counter_ns()
         
         # Updates
-        for uid, _ in update_candidates:
-            new_score = random.randint(0, 15000)
-            op_start = time.perf_counter_ns()
-            lb.update(uid, new_score)
-            op_end = time.perf_counter_ns()
-            update_latencies.append(op_end - op_start)
+        update_ns = apply_updates(lb, update_candidates, batched, update_latencies, next_score, overhead_ns)
+        total_updates += len(update_candidates)
+        update_throughput = batch_updates / (update_ns / 1e9) if update_ns else 0.0
+        update_throughputs.append(update_throughput)
             
         # Top-K Queries
         for _ in range(batch_topk):
             op_start = time.perf_counter_ns()
             lb.top_k(k)
             op_end = time.perf_counter_ns()
-            topk_latencies.append(op_end - op_start)
+            topk_latencies.append(op_end - op_start - overhead_ns)
             
         batch_end = time.perf_counter_ns()
         batch_duration_sec = (batch_end - batch_start) / 1e9
         
-        print(f"  Sec {iterations+1}: Processed {batch_updates} updates + {batch_topk} top-k queries in {batch_duration_sec:.4f}s")
+        print(f"  Sec {iterations+1}: Processed {batch_updates} updates + {batch_topk} top-k queries in {batch_duration_sec:.4f}s ({update_throughput:.0f} updates/s)")
         
         iterations += 1
         if iterations >= SIMULATION_DURATION_SEC:
@@ -284,10 +453,15 @@ def run_topk_realtime_simulation(cls: Type, n: int, k: int = TOP_K):
         else:
             print(f"  WARNING: Falling behind! Batch took {batch_duration_sec:.4f}s")
 
-    update_stats = calculate_stats(update_latencies)
-    topk_stats = calculate_stats(topk_latencies)
+    update_op_stats, update_batch_stats = update_stats(update_latencies, batched, total_updates)
+    avg_throughput = sum(update_throughputs) / len(update_throughputs) if update_throughputs else 0.0
+    print(f"Average update throughput: {avg_throughput:.0f} updates/s ({mode})")
+    topk_stats = topk_latencies.stats()
     
-    print_stats(name, "Realtime Update", len(update_latencies), update_stats)
+    if batched:
+        print_stats(name, "Realtime Update (per update_many)", len(update_latencies), update_batch_stats)
+    else:
+        print_stats(name, "Realtime Update", len(update_latencies), update_op_stats)
     print_stats(name, f"Realtime Top-{k}", len(topk_latencies), topk_stats)
     
     return {
@@ -295,17 +469,523 @@ def run_topk_realtime_simulation(cls: Type, n: int, k: int = TOP_K):
         "BatchSize": n,
         "K": k,
         "InitTotal_us": init_time_us,
-        "Update_Avg_us": update_stats["Average"],
-        "Update_P99_us": update_stats["P99"],
+        "Update_Avg_us": update_op_stats["Average"],
+        "Update_P99_us": update_op_stats["P99"],
         "TopK_Avg_us": topk_stats["Average"],
-        "TopK_P99_us": topk_stats["P99"]
+        "TopK_P99_us": topk_stats["P99"],
+        "InitBulk_us": bulk_init_us,
+        "UpdateMode": mode,
+        "UpdateThroughput_ops": avg_throughput,
+        "ScoreDist": score_dist,
+        "UserDist": user_dist,
+        "Update_P50_us": update_op_stats["P50"],
+        "Update_P9999_us": update_op_stats["P99.99"],
+        "Update_Max_us": update_op_stats["Max"],
+        "TopK_P50_us": topk_stats["P50"],
+        "TopK_P9999_us": topk_stats["P99.99"],
+        "TopK_Max_us": topk_stats["Max"],
+        "TimingMode": "per_call",
+        "TimerOverhead_ns": overhead_ns,
+        "UpdateBatch_Avg_us": update_batch_stats["Average"],
+        "UpdateBatch_P50_us": update_batch_stats["P50"],
+        "UpdateBatch_P99_us": update_batch_stats["P99"],
+        "UpdateBatch_Max_us": update_batch_stats["Max"]
+    }
+
+def run_sharded_scaling(cls: Type, n: int, shard_counts: List[int] = SHARD_COUNTS,
+                        score_dist: str = SCORE_DISTRIBUTION, user_dist: str = USER_DISTRIBUTION) -> List[Dict]:
+    """
+    Measures how write throughput of a ShardedLeaderboard over cls scales with
+    the number of shards. Single updates are pipelined and only acknowledged at
+    the end; batched updates split one churn tick across the shards.
+    """
+    name = cls.__name__
+    print(f"Running Sharded Scaling for {name} with {n} users ({score_dist} scores, {user_dist} users)...")
+    data = generate_data(n, score_dist=score_dist)
+    pick_users = user_picker(data, user_dist)
+    next_score = score_sampler(score_dist)
+    results = []
+    for shards in shard_counts:
+        lb = ShardedLeaderboard.from_pairs(data, cls, shards)
+        try:
+            lb.sync()
+            user_ids = [uid for uid, _ in data]
+            # The coordinator does not see the shards' user_maps, so track current scores here
+            scores = dict(data)
+
+            # Pipelined single updates
+            ops = OPERATIONS_COUNT * 10
+            pairs = []
+            for uid, _ in pick_users(ops):
+                scores[uid] = next_score(scores[uid])
+                pairs.append((uid, scores[uid]))
+            start = time.perf_counter_ns()
+            for uid, score in pairs:
+                lb.update(uid, score)
+            lb.sync()
+            end = time.perf_counter_ns()
+            update_throughput = len(pairs) / ((end - start) / 1e9)
+
+            # One churn tick through update_many
+            tick = []
+            for uid, _ in pick_users(int(n * CHURN_RATE)):
+                scores[uid] = next_score(scores[uid])
+                tick.append((uid, scores[uid]))
+            start = time.perf_counter_ns()
+            lb.update_many(tick)
+            lb.sync()
+            end = time.perf_counter_ns()
+            batch_throughput = len(tick) / ((end - start) / 1e9)
+
+            # Scatter-gather reads
+            reads = OPERATIONS_COUNT // 10
+            search_latencies = LatencyHistogram()
+            topk_latencies = LatencyHistogram()
+            for _ in range(reads):
+                uid = random.choice(user_ids)
+                with BenchmarkTimer(search_latencies):
+                    lb.search(uid)
+                with BenchmarkTimer(topk_latencies):
+                    lb.top_k(TOP_K)
+        finally:
+            lb.close()
+
+        search_stats = search_latencies.stats()
+        topk_stats = topk_latencies.stats()
+        print(f"  Shards {shards}: {update_throughput:.0f} updates/s, {batch_throughput:.0f} batched updates/s")
+        results.append({
+            "Name": name,
+            "BatchSize": n,
+            "Shards": shards,
+            "UpdateThroughput_ops": update_throughput,
+            "BatchThroughput_ops": batch_throughput,
+            "Search_Avg_us": search_stats["Average"],
+            "Search_P99_us": search_stats["P99"],
+            "TopK_Avg_us": topk_stats["Average"],
+            "TopK_P99_us": topk_stats["P99"],
+            "ScoreDist": score_dist,
+            "UserDist": user_dist
+        })
+    return results
+
+def run_durability_benchmark(cls: Type, n: int) -> Dict:
+    """
+    Measures what the WAL costs per update, how long a snapshot takes, and
+    how fast DurableLeaderboard.open recovers (snapshot bulk build plus a
+    WAL tail) compared with replaying every user through insert.
+    """
+    name = cls.__name__
+    print(f"Running Durability Benchmark for {name} with {n} users...")
+    data = generate_data(n)
+    user_ids = [uid for uid, _ in data]
+    ops = OPERATIONS_COUNT * 10
+    # Max score constraint for ScoreIndexedArrayLeaderboard
+    pairs = [(random.choice(user_ids), random.randint(0, 15000)) for _ in range(ops)]
+
+    plain = cls.from_pairs(data)
+    start = time.perf_counter_ns()
+    for uid, score in pairs:
+        plain.update(uid, score)
+    plain_update_us = (time.perf_counter_ns() - start) / 1000.0 / ops
+    del plain
+
+    with tempfile.TemporaryDirectory() as directory:
+        lb = DurableLeaderboard(cls.from_pairs(data), directory)
+        start = time.perf_counter_ns()
+        lb.snapshot()
+        snapshot_us = (time.perf_counter_ns() - start) / 1000.0
+        snapshot_bytes = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+
+        start = time.perf_counter_ns()
+        for uid, score in pairs:
+            lb.update(uid, score)
+        lb.sync()
+        durable_update_us = (time.perf_counter_ns() - start) / 1000.0 / ops
+        lb.close()
+        expected_len = len(lb)
+        del lb
+
+        start = time.perf_counter_ns()
+        recovered = DurableLeaderboard.open(cls, directory)
+        recovery_us = (time.perf_counter_ns() - start) / 1000.0
+        assert len(recovered) == expected_len
+        recovered.close()
+        del recovered
+
+    start = time.perf_counter_ns()
+    replayed = cls()
+    for uid, score in data:
+        replayed.insert(uid, score)
+    replay_us = (time.perf_counter_ns() - start) / 1000.0
+    del replayed
+
+    overhead_pct = (durable_update_us / plain_update_us - 1.0) * 100.0 if plain_update_us else 0.0
+    print(f"  Update {plain_update_us:.2f} us -> {durable_update_us:.2f} us with WAL ({overhead_pct:+.1f}%)")
+    print(f"  Recovery {recovery_us / 1000.0:.1f} ms vs {replay_us / 1000.0:.1f} ms replaying inserts")
+    return {
+        "Name": name,
+        "BatchSize": n,
+        "Update_Avg_us": plain_update_us,
+        "DurableUpdate_Avg_us": durable_update_us,
+        "WriteOverhead_pct": overhead_pct,
+        "Snapshot_us": snapshot_us,
+        "SnapshotBytes": snapshot_bytes,
+        "WALTail_ops": ops,
+        "Recovery_us": recovery_us,
+        "ReplayInsert_us": replay_us
+    }
+
+def run_memory_benchmark(cls: Type, n: int, score_dist: str = SCORE_DISTRIBUTION) -> Dict:
+    """
+    Measures what a board costs in memory per user: resident bytes (RSS
+    growth of an untraced build, noisy since the allocator keeps arenas)
+    and traced bytes after from_pairs and after per-item inserts, plus the
+    peak transient allocation on top of that while building and while
+    applying one realtime tick of updates, per-item and through update_many.
+    Run with --workers so every cell starts from a fresh heap.
+    """
+    name = cls.__name__
+    print(f"Running Memory Benchmark for {name} with {n} users...")
+    data = generate_data(n, score_dist=score_dist)
+    user_ids = [uid for uid, _ in data]
+    next_score = score_sampler(score_dist)
+    # One realtime tick worth of updates
+    burst = [(uid, next_score(None)) for uid in random.sample(user_ids, max(int(n * CHURN_RATE), 1))]
+
+    # Resident memory, without tracemalloc's own bookkeeping in the way
+    gc.collect()
+    rss_before = rss_bytes()
+    lb = cls.from_pairs(data)
+    gc.collect()
+    rss_after = rss_bytes()
+    del lb
+    rss_per_user = (rss_after - rss_before) / n if rss_before is not None and rss_after is not None else ""
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    lb = cls.from_pairs(data)
+    current, peak = tracemalloc.get_traced_memory()
+    bulk_bytes = current - base
+    bulk_peak = peak - current
+
+    # Transient allocation of one burst on top of the steady-state board
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    for uid, score in burst:
+        lb.update(uid, score)
+    current, peak = tracemalloc.get_traced_memory()
+    update_peak = peak - before
+    update_growth = current - before
+
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    lb.update_many(burst)
+    current, peak = tracemalloc.get_traced_memory()
+    update_many_peak = peak - before
+    del lb
+
+    # Per-item inserts leave a board shaped by growth rather than one bulk build
+    gc.collect()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    lb = cls()
+    for uid, score in data:
+        lb.insert(uid, score)
+    current, peak = tracemalloc.get_traced_memory()
+    insert_bytes = current - base
+    insert_peak = peak - current
+    tracemalloc.stop()
+    del lb
+
+    print(f"  {bulk_bytes / n:.1f} B/user traced ({insert_bytes / n:.1f} via insert)"
+          + (f", {rss_per_user:.1f} B/user resident" if rss_per_user != "" else ""))
+    return {
+        "Name": name,
+        "BatchSize": n,
+        "ScoreDist": score_dist,
+        "RSS_BytesPerUser": rss_per_user,
+        "Traced_BytesPerUser": bulk_bytes / n,
+        "InsertTraced_BytesPerUser": insert_bytes / n,
+        "InitPeakTransient_bytes": bulk_peak,
+        "InsertPeakTransient_bytes": insert_peak,
+        "BurstUpdates": len(burst),
+        "UpdateBurstPeak_bytes": update_peak,
+        "UpdateBurstGrowth_bytes": update_growth,
+        "UpdateManyPeak_bytes": update_many_peak
+    }
+
+def run_open_loop(lb, rate: float, duration_sec: float, pick_users, next_score) -> Tuple[LatencyHistogram, bool]:
+    """
+    Issues updates on a fixed schedule of rate per second for duration_sec,
+    whatever the board's latency, and records each latency from the
+    operation's intended start rather than its actual one, so time spent
+    queued behind a slow operation counts (no coordinated omission).
+    Returns the histogram and whether the probe kept up: a probe that falls
+    more than OPEN_LOOP_MAX_LAG_SEC behind is abandoned.
+    New scores are drawn from each user's current score when the update is
+    issued, so score distributions that depend on it (monotonic) stay valid
+    across probes.
+    """
+    count = max(int(rate * duration_sec), 1)
+    interval_ns = 1e9 / rate
+    max_lag_ns = OPEN_LOOP_MAX_LAG_SEC * 1e9
+    # A uniform pick draws each user at most once, so repeat it until there are count users
+    user_ids = []
+    while len(user_ids) < count:
+        user_ids.extend(uid for uid, _ in pick_users(count - len(user_ids)))
+    latencies = LatencyHistogram()
+    user_map = lb.user_map
+    update = lb.update
+
+    start = time.perf_counter_ns()
+    for i, uid in enumerate(user_ids):
+        score = next_score(user_map.get(uid))
+        intended = start + int(i * interval_ns)
+        now = time.perf_counter_ns()
+        if now < intended:
+            # Sleep through long gaps, spin the last OPEN_LOOP_SPIN_NS: sleep overshoots by up to milliseconds
+            if intended - now > OPEN_LOOP_SPIN_NS:
+                time.sleep((intended - now - OPEN_LOOP_SPIN_NS) / 1e9)
+            while time.perf_counter_ns() < intended:
+                pass
+        elif now - intended > max_lag_ns:
+            return latencies, False
+        update(uid, score)
+        latencies.record(time.perf_counter_ns() - intended)
+    return latencies, True
+
+def run_saturation_search(cls: Type, n: int, slo_p99_us: float = SLO_P99_US,
+                          score_dist: str = SCORE_DISTRIBUTION, user_dist: str = USER_DISTRIBUTION) -> Dict:
+    """
+    Finds the highest open-loop update rate a board sustains with p99
+    latency (from intended start) under slo_p99_us: doubles the rate from
+    OPEN_LOOP_START_RATE until a probe misses the SLO, then binary-searches
+    between the last passing and the first failing rate.
+    """
+    name = cls.__name__
+    print(f"Searching max sustainable update rate for {name} with {n} users (p99 SLO {slo_p99_us:g} us, {score_dist} scores, {user_dist} users)...")
+    data = generate_data(n, score_dist=score_dist)
+    lb = cls.from_pairs(data)
+    pick_users = user_picker(data, user_dist)
+    next_score = score_sampler(score_dist)
+    probes = 0
+    best = None # (rate, stats) of the highest passing probe
+
+    def probe(rate: float) -> bool:
+        nonlocal probes, best
+        probes += 1
+        latencies, kept_up = run_open_loop(lb, rate, OPEN_LOOP_PROBE_SEC, pick_users, next_score)
+        stats = latencies.stats()
+        passed = kept_up and stats["P99"] <= slo_p99_us
+        verdict = "ok" if passed else ("saturated" if not kept_up else "SLO missed")
+        print(f"  {rate:.0f} updates/s: p99 {stats['P99']:.1f} us ({verdict})")
+        if passed and (best is None or rate > best[0]):
+            best = (rate, stats)
+        return passed
+
+    lo, hi = 0.0, None
+    rate = float(OPEN_LOOP_START_RATE)
+    while rate <= OPEN_LOOP_MAX_RATE:
+        if not probe(rate):
+            hi = rate
+            break
+        lo = rate
+        rate *= 2
+    if hi is not None and lo > 0:
+        for _ in range(SATURATION_SEARCH_STEPS):
+            mid = (lo + hi) / 2
+            if probe(mid):
+                lo = mid
+            else:
+                hi = mid
+
+    stats = best[1] if best else None
+    print(f"Max sustainable rate: {lo:.0f} updates/s")
+    return {
+        "Name": name,
+        "BatchSize": n,
+        "ScoreDist": score_dist,
+        "UserDist": user_dist,
+        "SLO_P99_us": slo_p99_us,
+        "MaxSustainable_ops": lo,
+        "Update_P50_us": stats["P50"] if stats else "",
+        "Update_P99_us": stats["P99"] if stats else "",
+        "Update_Max_us": stats["Max"] if stats else "",
+        "Probes": probes
     }
 
+def run_instrumentation(cls: Type, n: int, score_dist: str = SCORE_DISTRIBUTION,
+                        user_dist: str = USER_DISTRIBUTION) -> List[Dict]:
+    """
+    Runs a mixed workload against instrumented(cls) and returns one row per
+    (operation, event) with the per-call event count distribution.
+    Timings are not taken here: the counting hooks add their own work.
+    """
+    name = cls.__name__
+    print(f"Counting operation events for {name} with {n} users...")
+    data = generate_data(n, score_dist=score_dist)
+    lb = instrumented(cls).from_pairs(data)
+    lb.reset_counters()
+    pick_users = user_picker(data, user_dist)
+    next_score = score_sampler(score_dist)
+
+    # pick_users returns the users' initial scores; step from the current one, as apply_updates does
+    for uid, _ in pick_users(OPERATIONS_COUNT):
+        lb.update(uid, next_score(lb.user_map.get(uid)))
+    for uid, _ in random.sample(data, OPERATIONS_COUNT):
+        lb.search(uid)
+    for _ in range(max(OPERATIONS_COUNT // 10, 1)):
+        lb.top_k(TOP_K)
+    # Delete then re-insert the same users, so the size stays n
+    churn = [(uid, lb.user_map[uid]) for uid, _ in random.sample(data, OPERATIONS_COUNT)]
+    for uid, _ in churn:
+        lb.delete(uid)
+    for uid, score in churn:
+        lb.insert(uid, score)
+
+    rows = []
+    for row in lb.histogram_rows():
+        print(f"  {row['Operation']:<8} {row['Event']:<15} mean {row['Mean']:.1f}, p99 {row['P99']}, max {row['Max']}")
+        rows.append({"Name": name, "BatchSize": n, "ScoreDist": score_dist, "UserDist": user_dist, **row})
+    return rows
+
+# A benchmark cell: (scenario, board class, size, wrap in a materialized top-K view, score dist, user dist,
+# p99 SLO in us, micro benchmark timing mode, realtime sims apply updates through update_many)
+Cell = Tuple[str, Type, int, bool, str, str, float, str, bool]
+
+def run_cell(cell: Cell):
+    """
+    Runs one (scenario, class, size) combination and returns its result row
+    (a list of rows for the sharded and instrumentation scenarios).
+    """
+    scenario, cls, n, view, score_dist, user_dist, slo_p99_us, timing, batched = cell
+    if view:
+        # View classes are built on the fly, so cells carry the board class instead
+        cls = materialized(cls, TOP_K)
+    if scenario == "micro":
+        return run_benchmark(cls, n, score_dist, timing)
+    if scenario == "realtime":
+        return run_realtime_simulation(cls, n, batched, score_dist=score_dist, user_dist=user_dist)
+    if scenario == "topk_micro":
+        return run_topk_benchmark(cls, n, score_dist=score_dist, timing=timing)
+    if scenario == "topk_realtime":
+        return run_topk_realtime_simulation(cls, n, batched=batched, score_dist=score_dist, user_dist=user_dist)
+    if scenario == "durability":
+        return run_durability_benchmark(cls, n)
+    if scenario == "memory":
+        return run_memory_benchmark(cls, n, score_dist=score_dist)
+    if scenario == "saturation":
+        return run_saturation_search(cls, n, slo_p99_us, score_dist=score_dist, user_dist=user_dist)
+    if scenario == "sharded":
+        return run_sharded_scaling(cls, n, score_dist=score_dist, user_dist=user_dist)
+    if scenario == "instrumentation":
+        return run_instrumentation(cls, n, score_dist=score_dist, user_dist=user_dist)
+    raise ValueError(f"Unknown scenario {scenario!r}")
+
+def cell_name(cell: Cell) -> str:
+    """
+    Returns a file-name friendly label for a cell, e.g. "realtime-RBTreeLeaderboard-5000".
+    """
+    scenario, cls, n, view, score_dist, user_dist = cell[:6]
+    name = f"{scenario}-{'Materialized' if view else ''}{cls.__name__}-{n}"
+    if score_dist != "uniform" or user_dist != "uniform":
+        name += f"-{score_dist}-{user_dist}"
+    return name
+
+def run_profiled_cell(cell: Cell, profile: Optional[str] = None, profile_dir: str = PROFILE_DIR):
+    """
+    Runs one cell, under the given profiler if any; its output files are
+    named after the cell (see profiling.profile_call).
+    """
+    if not profile:
+        return run_cell(cell)
+    os.makedirs(profile_dir, exist_ok=True)
+    return profile_call(run_cell, profile, os.path.join(profile_dir, cell_name(cell)), cell)
+
+# Queue of free CPU ids shared by the pool workers when pinning
+_cpu_queue = None
+
+def _init_worker(cpu_queue):
+    global _cpu_queue
+    _cpu_queue = cpu_queue
+
+def _run_cell_in_worker(cell: Cell, profile: Optional[str] = None, profile_dir: str = PROFILE_DIR):
+    """
+    Pool entry point: pins the worker to a free CPU for the duration of the cell.
+    """
+    if _cpu_queue is None:
+        return run_profiled_cell(cell, profile, profile_dir)
+    cpu = _cpu_queue.get()
+    try:
+        os.sched_setaffinity(0, {cpu})
+        return run_profiled_cell(cell, profile, profile_dir)
+    finally:
+        _cpu_queue.put(cpu)
+
+def run_cells(cells: List[Cell], workers: int = WORKERS, pin: bool = PIN_CPUS,
+              profile: Optional[str] = PROFILE, profile_dir: str = PROFILE_DIR) -> List:
+    """
+    Runs benchmark cells and returns their results in cell order.
+    With workers > 0 each cell runs in a freshly spawned process from a pool
+    of that size, so no cell inherits heap state, GC pressure or allocator
+    fragmentation from an earlier one. Cells running side by side still
+    compete for caches and memory bandwidth; use few workers (or pinning)
+    when absolute latencies matter.
+    With profile set, each cell is profiled on its own (see run_profiled_cell).
+    """
+    if workers <= 0:
+        return [run_profiled_cell(cell, profile, profile_dir) for cell in cells]
+
+    ctx = multiprocessing.get_context("spawn")
+    cpu_queue = None
+    if pin:
+        if not hasattr(os, "sched_setaffinity"):
+            print("CPU pinning is not supported on this platform, running unpinned")
+        else:
+            cpus = sorted(os.sched_getaffinity(0))
+            workers = min(workers, len(cpus))
+            cpu_queue = ctx.Queue()
+            for cpu in cpus[:workers]:
+                cpu_queue.put(cpu)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, max_tasks_per_child=1,
+                             initializer=_init_worker, initargs=(cpu_queue,)) as pool:
+        return list(pool.map(functools.partial(_run_cell_in_worker, profile=profile, profile_dir=profile_dir), cells))
+
 def main():
+    parser = argparse.ArgumentParser(description="Benchmark the leaderboard data structures.")
+    parser.add_argument("--score-dist", default=SCORE_DISTRIBUTION, choices=SCORE_DISTRIBUTIONS,
+                        help="Score distribution of the initial population and of updates")
+    parser.add_argument("--user-dist", default=USER_DISTRIBUTION, choices=USER_DISTRIBUTIONS,
+                        help="Which users the realtime simulations update")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="Run each benchmark cell in a fresh process from a pool of this size (0: serial, in process)")
+    parser.add_argument("--pin", action="store_true", default=PIN_CPUS,
+                        help="Pin each pool worker to its own CPU")
+    parser.add_argument("--slo-us", type=float, default=SLO_P99_US,
+                        help="p99 update latency SLO for the open-loop saturation search")
+    parser.add_argument("--instrument", action="store_true", default=INSTRUMENT,
+                        help="Also count per-operation events (rotations, shifts, nodes visited, ...) with instrumented classes")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=PROFILE,
+                        help="Profile each benchmark cell separately: deterministic cProfile or low-overhead stack sampling")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR,
+                        help="Directory for the per-cell .pstats and folded-stack .folded files")
+    parser.add_argument("--timing", choices=TIMING_MODES, default=TIMING_MODE,
+                        help="Micro and top-K micro timing: one timer pair per call (overhead subtracted) or per block of calls")
+    parser.add_argument("--scenarios", nargs="+", choices=ALL_SCENARIOS, default=list(SCENARIOS), metavar="SCENARIO",
+                        help=f"Scenarios to run per class and size, out of {', '.join(ALL_SCENARIOS)} (default: {' '.join(SCENARIOS)})")
+    parser.add_argument("--batched-updates", action="store_true", default=BATCHED_UPDATES,
+                        help="Realtime sims apply each tick's updates through update_many instead of one update call each "
+                             "(latencies go to the UpdateBatch_* columns)")
+    args = parser.parse_args()
+    score_dist, user_dist = args.score_dist, args.user_dist
+
     classes = [
         SortedArrayLeaderboard,
+        ChunkedSortedArrayLeaderboard,
         LinkedListLeaderboard,
         RBTreeLeaderboard,
+        ArrayRBTreeLeaderboard,
         SkipListLeaderboard,
         ScoreIndexedArrayLeaderboard
     ]
@@ -314,30 +994,64 @@ def main():
     realtime_results = []
     topk_micro_results = []
     topk_realtime_results = []
+    sharded_results = []
+    durability_results = []
+    memory_results = []
+    saturation_results = []
+    instrumentation_results = []
     
+    print(f"Timer overhead: {timer_overhead_ns()} ns per timed call (subtracted in per_call timing)")
+
+    # Build the benchmark matrix in the order the results are written
+    cells: List[Cell] = []
+    options = (score_dist, user_dist, args.slo_us, args.timing, args.batched_updates)
+    # Keep the usual order whatever order they were given in
+    scenarios = [scenario for scenario in ALL_SCENARIOS if scenario in args.scenarios]
     for n in BATCH_SIZES:
-        print(f"\n{'='*20} DATASET SIZE: {n} {'='*20}\n")
-        
         for cls in classes:
             # Skip LinkedList for > 10k
             if cls == LinkedListLeaderboard and n > 10000:
                 continue
-            
-            # Run Micro-benchmark
-            res_micro = run_benchmark(cls, n)
-            micro_results.append(res_micro)
-            
-            # Run Realtime Simulation
-            res_realtime = run_realtime_simulation(cls, n)
-            realtime_results.append(res_realtime)
-            
-            # Run Top-K Micro-benchmark
-            res_topk_micro = run_topk_benchmark(cls, n)
-            topk_micro_results.append(res_topk_micro)
-            
-            # Run Top-K Realtime Simulation
-            res_topk_realtime = run_topk_realtime_simulation(cls, n)
-            topk_realtime_results.append(res_topk_realtime)
+            for scenario in scenarios:
+                if scenario != "sharded":
+                    cells.append((scenario, cls, n, False) + options)
+            if args.instrument:
+                cells.append(("instrumentation", cls, n, False) + options)
+
+        # Same structures behind a materialized top-K view, for the Top-K scenarios
+        for cls in classes:
+            if cls == LinkedListLeaderboard and n > 10000:
+                continue
+            for scenario in ("topk_micro", "topk_realtime"):
+                if scenario in scenarios:
+                    cells.append((scenario, cls, n, True) + options)
+
+    if "sharded" in scenarios:
+        for cls in classes:
+            if cls == LinkedListLeaderboard and SHARD_DATASET_SIZE > 10000:
+                continue
+            cells.append(("sharded", cls, SHARD_DATASET_SIZE, False) + options)
+
+    mode = f"{args.workers} worker processes{' (pinned)' if args.pin else ''}" if args.workers > 0 else "serial"
+    if args.profile:
+        mode += f", {args.profile} profiles in {args.profile_dir}/"
+    print(f"\n{'='*20} {len(cells)} BENCHMARK CELLS, {mode} {'='*20}\n")
+    results_by_scenario = {
+        "micro": micro_results,
+        "realtime": realtime_results,
+        "topk_micro": topk_micro_results,
+        "topk_realtime": topk_realtime_results,
+        "durability": durability_results,
+        "memory": memory_results,
+        "saturation": saturation_results,
+        "sharded": sharded_results,
+        "instrumentation": instrumentation_results
+    }
+    for cell, result in zip(cells, run_cells(cells, args.workers, args.pin, args.profile, args.profile_dir)):
+        if isinstance(result, list):
+            results_by_scenario[cell[0]].extend(result)
+        else:
+            results_by_scenario[cell[0]].append(result)
             
     # Write Micro-benchmark Results
     csv_file_micro = "benchmark_results.csv"
@@ -379,5 +1093,55 @@ def main():
             dict_writer.writerows(topk_realtime_results)
         print(f"Top-K realtime benchmark results saved to {csv_file_topk_realtime}")
 
+    # Write Sharded Scaling Results
+    csv_file_sharded = "sharded_benchmark_results.csv"
+    if sharded_results:
+        keys = sharded_results[0].keys()
+        with open(csv_file_sharded, 'w', newline='') as f:
+            dict_writer = csv.DictWriter(f, fieldnames=keys)
+            dict_writer.writeheader()
+            dict_writer.writerows(sharded_results)
+        print(f"Sharded scaling results saved to {csv_file_sharded}")
+
+    # Write Durability Results
+    csv_file_durability = "durability_benchmark_results.csv"
+    if durability_results:
+        keys = durability_results[0].keys()
+        with open(csv_file_durability, 'w', newline='') as f:
+            dict_writer = csv.DictWriter(f, fieldnames=keys)
+            dict_writer.writeheader()
+            dict_writer.writerows(durability_results)
+        print(f"Durability benchmark results saved to {csv_file_durability}")
+
+    # Write Memory Footprint Results
+    csv_file_memory = "memory_benchmark_results.csv"
+    if memory_results:
+        keys = memory_results[0].keys()
+        with open(csv_file_memory, 'w', newline='') as f:
+            dict_writer = csv.DictWriter(f, fieldnames=keys)
+            dict_writer.writeheader()
+            dict_writer.writerows(memory_results)
+        print(f"Memory benchmark results saved to {csv_file_memory}")
+
+    # Write Saturation Search Results
+    csv_file_saturation = "saturation_benchmark_results.csv"
+    if saturation_results:
+        keys = saturation_results[0].keys()
+        with open(csv_file_saturation, 'w', newline='') as f:
+            dict_writer = csv.DictWriter(f, fieldnames=keys)
+            dict_writer.writeheader()
+            dict_writer.writerows(saturation_results)
+        print(f"Saturation search results saved to {csv_file_saturation}")
+
+    # Write Instrumentation Results
+    csv_file_instrumentation = "instrumentation_benchmark_results.csv"
+    if instrumentation_results:
+        keys = instrumentation_results[0].keys()
+        with open(csv_file_instrumentation, 'w', newline='') as f:
+            dict_writer = csv.DictWriter(f, fieldnames=keys)
+            dict_writer.writeheader()
+            dict_writer.writerows(instrumentation_results)
+        print(f"Instrumentation results saved to {csv_file_instrumentation}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,193 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import List, Optional, Tuple
+
+# File layout, all little-endian:
+#   header   magic, entry count, index slot count (padded to HEADER_SIZE)
+#   entries  count * (score q, user_id q), ascending by (score, user_id)
+#   index    slots * (user_id q, position q), open addressing with linear
+#            probing; position -1 marks an empty slot
+MAPPED_MAGIC = b"LBMAP001"
+HEADER = struct.Struct("<8sQQ")
+HEADER_SIZE = 64
+EMPTY = -1
+MIX = 0x9E3779B97F4A7C15
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+def _slot(user_id: int, bits: int) -> int:
+    # Fibonacci hashing: the top bits of user_id * MIX
+    return ((user_id * MIX) & MASK64) >> (64 - bits)
+
+def _to_file(values: array, f):
+    if sys.byteorder != "little":
+        values = array('q', values)
+        values.byteswap()
+    values.tofile(f)
+
+def export_mapped(board, path: str):
+    """
+    Writes the board's current ordering and a user_id -> position hash index
+    to path, for MappedLeaderboard. Works for any leaderboard class; a
+    SortedArrayLeaderboard's data is already in order and is copied as is.
+    The file is written under a temporary name and renamed into place.
+    Time Complexity: O(n log n), O(n) for SortedArrayLeaderboard
+    """
+    data = getattr(board, "data", None)
+    if data is None:
+        data = sorted((score, uid) for uid, score in board.user_map.items())
+    count = len(data)
+    bits = max(1, (2 * count).bit_length())
+    slots = 1 << bits
+    mask = slots - 1
+
+    entries = array('q', bytes(16 * count))
+    index = array('q', [0, EMPTY]) * slots
+    for pos, (score, uid) in enumerate(data):
+        entries[2 * pos] = score
+        entries[2 * pos + 1] = uid
+        i = _slot(uid, bits)
+        while index[2 * i + 1] != EMPTY:
+            i = (i + 1) & mask
+        index[2 * i] = uid
+        index[2 * i + 1] = pos
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAPPED_MAGIC, count, slots).ljust(HEADER_SIZE, b"\0"))
+        _to_file(entries, f)
+        _to_file(index, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class MappedLeaderboard:
+    """
+    Read-only leaderboard served straight from a file written by export_mapped.
+
+    The file is mmap'ed and viewed as 64-bit integers, so opening it costs
+    no deserialization and every process mapping the same file shares one
+    copy in the page cache. Ranks are positions in ascending (score, user_id)
+    order, as in the sorted structures.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.slots = HEADER.unpack_from(self.mm, 0)
+        if magic != MAPPED_MAGIC:
+            self.mm.close()
+            raise ValueError(f"{path} is not a mapped leaderboard")
+        self.bits = self.slots.bit_length() - 1
+        index_offset = HEADER_SIZE + 16 * self.count
+        self.buffer = memoryview(self.mm)
+        if sys.byteorder == "little":
+            self.entries = self.buffer[HEADER_SIZE:index_offset].cast('q')
+            self.index = self.buffer[index_offset:index_offset + 16 * self.slots].cast('q')
+        else:
+            # Big-endian hosts cannot view the file directly and pay for a copy
+            self.entries = array('q', self.buffer[HEADER_SIZE:index_offset])
+            self.entries.byteswap()
+            self.index = array('q', self.buffer[index_offset:index_offset + 16 * self.slots])
+            self.index.byteswap()
+
+    def _position(self, user_id: int) -> int:
+        """
+        Looks user_id up in the hash index; -1 if absent.
+        Time Complexity: O(1) expected
+        """
+        index = self.index
+        mask = self.slots - 1
+        i = _slot(user_id, self.bits)
+        while True:
+            pos = index[2 * i + 1]
+            if pos == EMPTY:
+                return -1
+            if index[2 * i] == user_id:
+                return pos
+            i = (i + 1) & mask
+
+    def score_of(self, user_id: int) -> Optional[int]:
+        pos = self._position(user_id)
+        if pos < 0:
+            return None
+        return self.entries[2 * pos]
+
+    def search(self, user_id: int, score: Optional[int] = None) -> int:
+        """
+        Finds the rank (index) of the user.
+        Time Complexity: O(1) expected
+        """
+        pos = self._position(user_id)
+        if pos >= 0 and score is not None and self.entries[2 * pos] != score:
+            return -1
+        return pos
+
+    def count_above(self, score: int) -> int:
+        """
+        Returns the number of users with a score strictly greater than score.
+        Time Complexity: O(log n)
+        """
+        entries = self.entries
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if entries[2 * mid] <= score:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self.count - lo
+
+    def select(self, rank: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (user_id, score) with the given rank (as returned by search),
+        or None if the rank is out of range.
+        Time Complexity: O(1)
+        """
+        if rank < 0 or rank >= self.count:
+            return None
+        return (self.entries[2 * rank + 1], self.entries[2 * rank])
+
+    def range_by_rank(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Returns (user_id, score) pairs for ranks start..stop-1, in rank order.
+        Time Complexity: O(stop - start)
+        """
+        start = max(start, 0)
+        stop = min(stop, self.count)
+        if start >= stop:
+            return []
+        flat = self.entries[2 * start:2 * stop]
+        return list(zip(flat[1::2], flat[0::2]))
+
+    def top_k(self, k: int) -> List[Tuple[int, int]]:
+        """
+        Returns the top k users with highest scores.
+        Returns list of (user_id, score) tuples.
+        Time Complexity: O(k)
+        """
+        k = min(max(k, 0), self.count)
+        if not k:
+            return []
+        flat = self.entries[2 * (self.count - k):2 * self.count]
+        return list(zip(flat[-1::-2], flat[-2::-2]))
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """
+        Releases the views and unmaps the file.
+        """
+        self.entries = self.index = None
+        self.buffer.release()
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
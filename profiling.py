@@ -0,0 +1,108 @@
+import cProfile
+import os
+import pstats
+import signal
+from collections import Counter
+from typing import Callable, Dict, Tuple
+
+PROFILE_MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL_SEC = 0.001 # CPU time between stack samples in sample mode
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _func_label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        # Builtins, e.g. "<method 'sort' of 'list' objects>"
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+def pstats_to_folded(stats: pstats.Stats, scale: float = 1e6) -> Counter:
+    """
+    Converts a cProfile call graph into folded stacks ("a;b;c" -> microseconds
+    of own time). cProfile only records caller -> callee edges, so the time a
+    function spends under each caller is split in proportion to that caller's
+    share of its cumulative time; recursion is cut off at the first repeat.
+    """
+    entries = stats.stats
+    callees: Dict[tuple, list] = {}
+    for func, (_, _, _, ct, callers) in entries.items():
+        for caller, (_, _, _, caller_ct) in callers.items():
+            callees.setdefault(caller, []).append((func, caller_ct / ct if ct else 0.0))
+    folded: Counter = Counter()
+
+    def walk(func, path: tuple, on_path: frozenset, fraction: float):
+        tt = entries[func][2]
+        if tt * fraction * scale >= 1:
+            folded[";".join(path)] += int(tt * fraction * scale)
+        for callee, share in callees.get(func, ()):
+            if callee in on_path or callee not in entries or fraction * share * entries[callee][3] * scale < 1:
+                continue
+            walk(callee, path + (_func_label(callee),), on_path | {callee}, fraction * share)
+
+    for func, (_, _, _, _, callers) in entries.items():
+        if not callers:
+            walk(func, (_func_label(func),), frozenset((func,)), 1.0)
+    return folded
+
+class StackSampler:
+    """
+    Samples the main thread's Python stack every interval_sec of CPU time
+    (SIGPROF via setitimer, Unix only) and counts folded stacks.
+    Costs one signal per sample instead of a hook on every call.
+    """
+
+    def __init__(self, interval_sec: float = SAMPLE_INTERVAL_SEC):
+        self.interval_sec = interval_sec
+        self.folded: Counter = Counter() # "a;b;c" -> samples
+        self.previous_handler = None
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        self.folded[";".join(stack)] += 1
+
+    def __enter__(self):
+        self.previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval_sec, self.interval_sec)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous_handler)
+
+def write_folded(folded: Counter, path: str):
+    """
+    Writes folded stacks, one "frame;frame;frame count" line each, the input
+    format of flamegraph.pl, speedscope and inferno.
+    """
+    with open(path, 'w') as f:
+        for stack, count in sorted(folded.items()):
+            f.write(f"{stack} {count}\n")
+
+def profile_call(fn: Callable, mode: str, path_prefix: str, *args, **kwargs):
+    """
+    Runs fn(*args, **kwargs) under the chosen profiler and returns its result.
+    cprofile writes path_prefix.pstats and path_prefix.folded (microseconds);
+    sample writes path_prefix.folded (samples) only, as a sampler has no
+    call counts or per-call times for pstats to hold.
+    """
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(fn, *args, **kwargs)
+        finally:
+            profiler.dump_stats(f"{path_prefix}.pstats")
+            write_folded(pstats_to_folded(pstats.Stats(profiler)), f"{path_prefix}.folded")
+    if mode == "sample":
+        sampler = StackSampler()
+        try:
+            with sampler:
+                return fn(*args, **kwargs)
+        finally:
+            write_folded(sampler.folded, f"{path_prefix}.folded")
+    raise ValueError(f"Unknown profile mode {mode!r}, expected one of {PROFILE_MODES}")
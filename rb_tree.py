@@ -1,8 +1,12 @@
-from typing import Optional, Tuple, Dict, List
+import math
+from typing import Optional, Tuple, Dict, List, Iterable
 
 RED = True
 BLACK = False
 
+# update_many rebuilds the whole tree when batch size * REBUILD_RATIO >= tree size
+REBUILD_RATIO = 4
+
 class RBNode:
     def __init__(self, user_id: int, score: int, color: bool = RED):
         self.user_id = user_id
@@ -20,6 +24,65 @@ class RBTreeLeaderboard:
         self.root = self.nil
         self.user_map: Dict[int, int] = {} # user_id -> score
 
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]]) -> 'RBTreeLeaderboard':
+        """
+        Builds a balanced tree from (user_id, score) pairs.
+        Sorts once, then links the median of each range as the subtree root.
+        Nodes on the deepest level are coloured red and all others black,
+        which gives every root-to-leaf path the same black height.
+        Time Complexity: O(n log n) for the sort, O(n) for the build
+        """
+        lb = cls()
+        lb.user_map = dict(pairs)
+        lb._build_balanced(sorted((score, uid) for uid, score in lb.user_map.items()))
+        return lb
+
+    def _build_balanced(self, entries: List[Tuple[int, int]]):
+        """
+        Replaces the tree with a balanced tree over sorted (score, user_id) entries.
+        Does not touch user_map.
+        Time Complexity: O(n)
+        """
+        nil = self.nil
+        n = len(entries)
+        if n == 0:
+            self.root = nil
+            return
+        red_depth = n.bit_length() - 1
+
+        def build(lo: int, hi: int, depth: int, parent: RBNode) -> RBNode:
+            if lo >= hi:
+                return nil
+            mid = (lo + hi) // 2
+            score, uid = entries[mid]
+            node = RBNode(uid, score, RED if depth == red_depth else BLACK)
+            node.parent = parent
+            node.left = build(lo, mid, depth + 1, node)
+            node.right = build(mid + 1, hi, depth + 1, node)
+            node.size = hi - lo
+            return node
+
+        self.root = build(0, n, 0, nil)
+        self.root.color = BLACK
+
+    def _inorder_entries(self) -> List[Tuple[int, int]]:
+        """
+        Returns all (score, user_id) entries in ascending order.
+        Time Complexity: O(n)
+        """
+        entries = []
+        stack = []
+        node = self.root
+        while stack or node != self.nil:
+            while node != self.nil:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            entries.append((node.score, node.user_id))
+            node = node.right
+        return entries
+
     def _update_size(self, node: RBNode):
         if node != self.nil:
             node.size = 1 + node.left.size + node.right.size
@@ -290,6 +353,33 @@ class RBTreeLeaderboard:
         # Insert new
         self.insert(user_id, new_score)
 
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Applies a batch of (user_id, new_score) pairs; unknown users are inserted.
+        Batches that touch a large share of the tree are applied by merging
+        the sorted batch into an in-order walk and rebuilding a balanced tree;
+        smaller batches use per-item update.
+        Time Complexity: O(n + b log b) for a rebuild, O(b log n) otherwise
+        """
+        batch = dict(pairs)
+        if len(batch) * REBUILD_RATIO < self.root.size:
+            for uid, score in batch.items():
+                self.update(uid, score)
+            return
+
+        kept = [entry for entry in self._inorder_entries() if entry[1] not in batch]
+        self.user_map.update(batch)
+        # Timsort detects the two sorted runs and merges them in one pass
+        kept.extend(sorted((score, uid) for uid, score in batch.items()))
+        kept.sort()
+        self._build_balanced(kept)
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Inserts a batch of (user_id, score) pairs; existing users are updated.
+        """
+        self.update_many(pairs)
+
     def search(self, user_id: int, score: Optional[int] = None) -> int:
         """
         Finds the rank (0-based index) of the user.
@@ -311,6 +401,200 @@ class RBTreeLeaderboard:
                 current = current.right
         return -1
 
+    def search_many(self, user_ids: Iterable[int]) -> List[int]:
+        """
+        Finds the ranks of many users at once (-1 for unknown users).
+        Sorts the query keys and resolves them with a finger search: from
+        the previous hit, climb only until the subtree can contain the next
+        key, then descend, tracking ranks through subtree sizes.
+        Time Complexity: O(q log q + q log(n / q)) amortized
+        """
+        user_map = self.user_map
+        ids = list(user_ids)
+        result = [-1] * len(ids)
+        queries = []
+        for i, uid in enumerate(ids):
+            score = user_map.get(uid)
+            if score is not None:
+                queries.append((score, uid, i))
+        queries.sort()
+        nil = self.nil
+        node = nil
+        rank = 0
+        for score, user_id, qi in queries:
+            if node == nil:
+                node = self.root
+                base = 0
+            else:
+                # Climb while the next key lies beyond the current subtree
+                while node.parent != nil:
+                    p = node.parent
+                    if node == p.left:
+                        if (score < p.score) or (score == p.score and user_id < p.user_id):
+                            break
+                        rank += node.right.size + 1
+                    else:
+                        rank -= node.left.size + 1
+                    node = p
+                # Rank of the smallest entry in node's subtree
+                base = rank - node.left.size
+
+            current = node
+            while current != nil:
+                if current.user_id == user_id and current.score == score:
+                    node = current
+                    rank = base + current.left.size
+                    result[qi] = rank
+                    break
+                elif (score < current.score) or (score == current.score and user_id < current.user_id):
+                    current = current.left
+                else:
+                    base += current.left.size + 1
+                    current = current.right
+        return result
+
+    def count_above(self, score: int) -> int:
+        """
+        Returns the number of users with a score strictly greater than score.
+        Time Complexity: O(log n)
+        """
+        count = 0
+        node = self.root
+        while node != self.nil:
+            if node.score > score:
+                count += 1 + node.right.size
+                node = node.left
+            else:
+                node = node.right
+        return count
+
+    def percentile(self, user_id: int) -> float:
+        """
+        Returns the user's standing as a top percentage ("top 3.2%"):
+        100 * (users with a higher score + 1) / n, or -1.0 for unknown users.
+        Time Complexity: O(log n)
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return -1.0
+        return 100.0 * (self.count_above(score) + 1) / len(self.user_map)
+
+    def score_at_percentile(self, p: float) -> Optional[int]:
+        """
+        Returns the lowest score s with at least p percent of users scoring <= s
+        (nearest-rank method), or None if the board is empty.
+        Time Complexity: O(log n)
+        """
+        if p < 0 or p > 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        n = len(self.user_map)
+        if not n:
+            return None
+        # The ceil(p% of n)-th lowest score, counting from 1
+        rank = max(math.ceil(p * n / 100), 1) - 1
+        return self._select_node(rank).score
+
+    def _select_node(self, rank: int) -> RBNode:
+        """
+        Returns the node with the given 0-based in-order rank, or nil.
+        Time Complexity: O(log n)
+        """
+        if rank < 0:
+            return self.nil
+        node = self.root
+        while node != self.nil:
+            left_size = node.left.size
+            if rank < left_size:
+                node = node.left
+            elif rank == left_size:
+                return node
+            else:
+                rank -= left_size + 1
+                node = node.right
+        return self.nil
+
+    def _successor(self, node: RBNode) -> RBNode:
+        """
+        Returns the in-order successor of node, or nil.
+        Time Complexity: O(1) amortized over an in-order walk
+        """
+        if node.right != self.nil:
+            return self._minimum(node.right)
+        parent = node.parent
+        while parent != self.nil and node == parent.right:
+            node = parent
+            parent = parent.parent
+        return parent
+
+    def _predecessor(self, node: RBNode) -> RBNode:
+        """
+        Returns the in-order predecessor of node, or nil.
+        """
+        if node.left != self.nil:
+            node = node.left
+            while node.right != self.nil:
+                node = node.right
+            return node
+        parent = node.parent
+        while parent != self.nil and node == parent.left:
+            node = parent
+            parent = parent.parent
+        return parent
+
+    def select(self, rank: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (user_id, score) with the given rank (as returned by search),
+        or None if the rank is out of range.
+        Time Complexity: O(log n)
+        """
+        node = self._select_node(rank)
+        if node == self.nil:
+            return None
+        return (node.user_id, node.score)
+
+    def range_by_rank(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Returns (user_id, score) pairs for ranks start..stop-1, in rank order.
+        Descends to start using subtree sizes, then walks successors.
+        Time Complexity: O(log n + (stop - start))
+        """
+        start = max(start, 0)
+        result = []
+        node = self._select_node(start)
+        count = stop - start
+        while node != self.nil and len(result) < count:
+            result.append((node.user_id, node.score))
+            node = self._successor(node)
+        return result
+
+    def around(self, user_id: int, radius: int) -> List[Tuple[int, int]]:
+        """
+        Returns the user with up to radius users ranked above and below,
+        highest score first, as (user_id, score) tuples; [] for unknown users.
+        Walks in-order neighbours from the user's node.
+        Time Complexity: O(log n + radius)
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return []
+        node = self._find_node(user_id, score)
+        if node == self.nil:
+            return []
+        window = []
+        current = self._successor(node)
+        while current != self.nil and len(window) < radius:
+            window.append((current.user_id, current.score))
+            current = self._successor(current)
+        window.reverse()
+        window.append((node.user_id, node.score))
+        current = self._predecessor(node)
+        below = 0
+        while current != self.nil and below < radius:
+            window.append((current.user_id, current.score))
+            current = self._predecessor(current)
+            below += 1
+        return window
+
     def top_k(self, k: int) -> List[Tuple[int, int]]:
         """
         Returns the top k users with highest scores.
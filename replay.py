@@ -0,0 +1,162 @@
+"""
+Replays a recorded operation trace against the leaderboard classes.
+
+Trace format: JSON Lines, one operation per line, e.g.
+    {"ts": 12.5, "op": "update", "user_id": 123456, "score": 9000}
+    {"ts": 12.6, "op": "top_k", "k": 100}
+op is one of insert, update, delete, search and top_k. ts is in seconds and
+only needs to be non-decreasing; it is required for paced replay. user_id is
+required for insert/update/delete/search, score for insert/update, and k
+defaults to 100 for top_k. Other fields are ignored. sample_trace.jsonl is a
+small trace in this format.
+
+This is an operation log, not the request backlog (requests.jsonl) that
+shares its one-object-per-line layout.
+"""
+import argparse
+import csv
+import json
+import time
+from typing import Dict, Iterator, Optional, Tuple, Type
+from benchmark_utils import LatencyHistogram, print_stats
+from sorted_array import SortedArrayLeaderboard
+from chunked_sorted_array import ChunkedSortedArrayLeaderboard
+from linked_list import LinkedListLeaderboard
+from rb_tree import RBTreeLeaderboard
+from array_rb_tree import ArrayRBTreeLeaderboard
+from skip_list import SkipListLeaderboard
+from score_indexed_array import ScoreIndexedArrayLeaderboard
+
+OPERATIONS = ("insert", "update", "delete", "search", "top_k")
+OP_LABELS = {"insert": "Insert", "update": "Update", "delete": "Delete", "search": "Search", "top_k": "TopK"}
+DEFAULT_K = 100
+SAMPLE_TRACE = "sample_trace.jsonl"
+
+def iter_trace(path: str) -> Iterator[Tuple[Optional[float], str, int, int]]:
+    """
+    Streams (ts, op, user_id, score_or_k) records from a JSONL trace,
+    one line at a time. Blank lines are skipped.
+    """
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            op = record.get("op")
+            if op not in OP_LABELS:
+                raise ValueError(f"{path}:{line_no}: unknown op {op!r}, expected one of {OPERATIONS} "
+                                 f"(see the trace format in replay.py)")
+            if op == "top_k":
+                yield record.get("ts"), op, 0, record.get("k", DEFAULT_K)
+            elif op == "insert" or op == "update":
+                if "score" not in record:
+                    raise ValueError(f"{path}:{line_no}: {op} without a score")
+                yield record.get("ts"), op, record["user_id"], record["score"]
+            else:
+                yield record.get("ts"), op, record["user_id"], 0
+
+def replay_trace(cls: Type, path: str, paced: bool = False, speed: float = 1.0) -> Dict:
+    """
+    Replays a trace against a fresh cls instance and returns one result row.
+    Fast mode issues every operation back to back. Paced mode waits until
+    each record's timestamp (scaled by 1 / speed) and records how late each
+    operation started, like the "Falling behind" check of the realtime sims.
+    """
+    name = cls.__name__
+    mode = f"paced x{speed:g}" if paced else "fast"
+    print(f"Replaying {path} against {name} ({mode})...")
+    lb = cls()
+    # Fixed-size histograms, so memory does not grow with the trace length
+    latencies: Dict[str, LatencyHistogram] = {op: LatencyHistogram() for op in OPERATIONS}
+    lag_ns = LatencyHistogram()
+    ops = {
+        "insert": lb.insert,
+        "update": lb.update,
+        "delete": lb.delete,
+        "search": lb.search,
+        "top_k": lb.top_k,
+    }
+
+    first_ts = None
+    wall_start = time.perf_counter_ns()
+    for ts, op, user_id, value in iter_trace(path):
+        if paced:
+            if ts is None:
+                raise ValueError("Paced replay needs a ts on every record")
+            if first_ts is None:
+                first_ts = ts
+            target = wall_start + int((ts - first_ts) / speed * 1e9)
+            now = time.perf_counter_ns()
+            if now < target:
+                time.sleep((target - now) / 1e9)
+                now = time.perf_counter_ns()
+            lag_ns.record(max(now - target, 0))
+
+        fn = ops[op]
+        start = time.perf_counter_ns()
+        if op == "insert" or op == "update":
+            fn(user_id, value)
+        elif op == "top_k":
+            fn(value)
+        else:
+            fn(user_id)
+        end = time.perf_counter_ns()
+        latencies[op].record(end - start)
+    wall_s = (time.perf_counter_ns() - wall_start) / 1e9
+
+    total = sum(len(times) for times in latencies.values())
+    result = {
+        "Name": name,
+        "Trace": path,
+        "Mode": mode,
+        "Operations": total,
+        "FinalSize": len(lb),
+        "Wall_s": wall_s,
+    }
+    for op in OPERATIONS:
+        label = OP_LABELS[op]
+        stats = latencies[op].stats()
+        if latencies[op]:
+            print_stats(name, label, len(latencies[op]), stats)
+        result[f"{label}_Count"] = len(latencies[op])
+        result[f"{label}_Avg_us"] = stats["Average"]
+        result[f"{label}_P99_us"] = stats["P99"]
+    lag_stats = lag_ns.stats()
+    result["Lag_P99_us"] = lag_stats["P99"] if paced else ""
+    if paced and lag_stats["P99"] > 1e6:
+        print(f"WARNING: {name} fell behind the trace (p99 lag {lag_stats['P99'] / 1000.0:.1f} ms)")
+    return result
+
+def main():
+    classes = [
+        SortedArrayLeaderboard,
+        ChunkedSortedArrayLeaderboard,
+        LinkedListLeaderboard,
+        RBTreeLeaderboard,
+        ArrayRBTreeLeaderboard,
+        SkipListLeaderboard,
+        ScoreIndexedArrayLeaderboard
+    ]
+    parser = argparse.ArgumentParser(description="Replay a recorded JSONL operation trace against the leaderboards.")
+    parser.add_argument("trace", nargs="?", default=SAMPLE_TRACE, help=f"JSONL operation trace (default: {SAMPLE_TRACE})")
+    parser.add_argument("--paced", action="store_true", help="Replay at the recorded pace instead of as fast as possible")
+    parser.add_argument("--speed", type=float, default=1.0, help="Pace multiplier for --paced")
+    parser.add_argument("--classes", nargs="*", default=None, help="Class names to run (default: all)")
+    parser.add_argument("--output", default="replay_benchmark_results.csv")
+    args = parser.parse_args()
+
+    if args.classes:
+        classes = [cls for cls in classes if cls.__name__ in args.classes]
+
+    results = [replay_trace(cls, args.trace, args.paced, args.speed) for cls in classes]
+    if results:
+        keys = results[0].keys()
+        with open(args.output, 'w', newline='') as f:
+            dict_writer = csv.DictWriter(f, fieldnames=keys)
+            dict_writer.writeheader()
+            dict_writer.writerows(results)
+        print(f"\nReplay results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
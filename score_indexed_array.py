@@ -1,4 +1,12 @@
-from typing import List, Optional, Dict
+import math
+from array import array
+from itertools import accumulate
+from typing import List, Optional, Dict, Iterable, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch queries fall back to pure Python
+    np = None
 
 class ScoreIndexedArrayLeaderboard:
     """
@@ -10,6 +18,20 @@ class ScoreIndexedArrayLeaderboard:
     
     Key optimization: pos dict tracks each user's position in their bucket,
     allowing O(1) removal via swap with last element + pop.
+
+    A Fenwick (binary-indexed) tree over the bucket sizes answers
+    "how many users score at most s" in O(log max_score), so rank
+    lookups no longer scan every higher bucket.
+
+    A two-level occupancy bitmap (64-bit words plus a summary of non-zero
+    words) lets top_k jump between non-empty buckets without touching
+    the empty ones.
+
+    A dense count-per-score array.array('q') mirrors the bucket sizes for
+    batch rank queries and histogram export. It stays a plain array on the
+    write path (NumPy scalar indexing is several times slower); the batch
+    queries wrap its buffer in a NumPy view, without copying, when NumPy
+    is installed.
     """
     
     def __init__(self, max_score: int = 15000):
@@ -22,11 +44,118 @@ class ScoreIndexedArrayLeaderboard:
         self.pos_map: Dict[int, int] = {}
         # Track total number of users
         self.total_users = 0
+        # Fenwick tree over bucket sizes, 1-indexed: tree[s + 1] covers score s
+        self.fenwick: List[int] = [0] * (max_score + 2)
+        # Occupancy bitmap: bit (s & 63) of occupied_words[s >> 6] is set
+        # when bucket s is non-empty; bit w of occupied_summary is set when
+        # occupied_words[w] is non-zero
+        self.occupied_words: List[int] = [0] * ((max_score >> 6) + 1)
+        self.occupied_summary = 0
+        # counts[s] == len(score_buckets[s]); never resized, so NumPy views of it stay valid
+        self.counts = array('q', bytes(8 * (max_score + 1)))
+
+    def _mark_occupied(self, score: int):
+        """
+        Records that the bucket for score became non-empty.
+        Time Complexity: O(1)
+        """
+        w = score >> 6
+        if not self.occupied_words[w]:
+            self.occupied_summary |= 1 << w
+        self.occupied_words[w] |= 1 << (score & 63)
+
+    def _mark_empty(self, score: int):
+        """
+        Records that the bucket for score became empty.
+        Time Complexity: O(1)
+        """
+        w = score >> 6
+        self.occupied_words[w] &= ~(1 << (score & 63))
+        if not self.occupied_words[w]:
+            self.occupied_summary &= ~(1 << w)
+
+    def _prev_occupied(self, score: int) -> int:
+        """
+        Returns the highest non-empty score <= the given score, or -1.
+        Time Complexity: O(1) (two bit_length calls on small ints)
+        """
+        if score < 0:
+            return -1
+        w = score >> 6
+        word = self.occupied_words[w] & ((2 << (score & 63)) - 1)
+        if word:
+            return (w << 6) + word.bit_length() - 1
+        summary = self.occupied_summary & ((1 << w) - 1)
+        if not summary:
+            return -1
+        w = summary.bit_length() - 1
+        return (w << 6) + self.occupied_words[w].bit_length() - 1
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]], max_score: int = 15000) -> 'ScoreIndexedArrayLeaderboard':
+        """
+        Builds a leaderboard from (user_id, score) pairs.
+        Buckets are filled directly, then the Fenwick tree and the
+        occupancy bitmap are built in one linear pass over the scores.
+        Time Complexity: O(n + max_score)
+        """
+        lb = cls(max_score)
+        user_map = dict(pairs)
+        buckets = lb.score_buckets
+        pos_map = lb.pos_map
+        for uid, score in user_map.items():
+            if score < 0 or score > max_score:
+                raise ValueError(f"Score must be between 0 and {max_score}")
+            bucket = buckets[score]
+            pos_map[uid] = len(bucket)
+            bucket.append(uid)
+        lb.user_map = user_map
+        lb.total_users = len(user_map)
+
+        tree = lb.fenwick
+        n = len(tree)
+        for score, bucket in enumerate(buckets):
+            if bucket:
+                tree[score + 1] += len(bucket)
+                lb.counts[score] = len(bucket)
+                lb._mark_occupied(score)
+        # Linear Fenwick build: push each partial sum to its parent once
+        for i in range(1, n):
+            j = i + (i & -i)
+            if j < n:
+                tree[j] += tree[i]
+        return lb
+
+    def _fenwick_add(self, score: int, delta: int):
+        """
+        Adds delta to the count of users with the given score.
+        Time Complexity: O(log max_score)
+        """
+        self.counts[score] += delta
+        i = score + 1
+        tree = self.fenwick
+        n = len(tree)
+        while i < n:
+            tree[i] += delta
+            i += i & -i
+
+    def _count_at_most(self, score: int) -> int:
+        """
+        Returns the number of users with score <= the given score.
+        Time Complexity: O(log max_score)
+        """
+        i = score + 1
+        tree = self.fenwick
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
 
     def insert(self, user_id: int, score: int):
         """
         Inserts a new user score.
-        Time Complexity: O(1)
+        Time Complexity: O(1) + O(log max_score) Fenwick update
         """
         if user_id in self.user_map:
             # If user already exists, update their score
@@ -37,16 +166,20 @@ class ScoreIndexedArrayLeaderboard:
             raise ValueError(f"Score must be between 0 and {self.max_score}")
         
         # Add to bucket
-        self.score_buckets[score].append(user_id)
+        bucket = self.score_buckets[score]
+        bucket.append(user_id)
+        if len(bucket) == 1:
+            self._mark_occupied(score)
         # Track position and score
-        self.pos_map[user_id] = len(self.score_buckets[score]) - 1
+        self.pos_map[user_id] = len(bucket) - 1
         self.user_map[user_id] = score
         self.total_users += 1
+        self._fenwick_add(score, 1)
 
     def delete(self, user_id: int, score: Optional[int] = None):
         """
         Deletes a user score using swap+pop technique.
-        Time Complexity: O(1)
+        Time Complexity: O(1) + O(log max_score) Fenwick update
         """
         if user_id not in self.user_map:
             return
@@ -62,6 +195,8 @@ class ScoreIndexedArrayLeaderboard:
         last_user = bucket[-1]
         bucket[idx] = last_user
         bucket.pop()
+        if not bucket:
+            self._mark_empty(score)
         
         # Update position of swapped user (if it's not the same user)
         if last_user != user_id:
@@ -71,11 +206,12 @@ class ScoreIndexedArrayLeaderboard:
         del self.user_map[user_id]
         del self.pos_map[user_id]
         self.total_users -= 1
+        self._fenwick_add(score, -1)
 
     def _move_player(self, user_id: int, old_score: int, new_score: int):
         """
         Internal method to move a player from old_score bucket to new_score bucket.
-        Time Complexity: O(1)
+        Time Complexity: O(log max_score) for the Fenwick update, O(1) otherwise
         """
         # Remove from old bucket using swap+pop
         idx = self.pos_map[user_id]
@@ -83,20 +219,27 @@ class ScoreIndexedArrayLeaderboard:
         last_user = old_bucket[-1]
         old_bucket[idx] = last_user
         old_bucket.pop()
+        if not old_bucket:
+            self._mark_empty(old_score)
         
         # Update position of swapped user
         if last_user != user_id:
             self.pos_map[last_user] = idx
         
         # Add to new bucket
-        self.score_buckets[new_score].append(user_id)
-        self.pos_map[user_id] = len(self.score_buckets[new_score]) - 1
+        new_bucket = self.score_buckets[new_score]
+        new_bucket.append(user_id)
+        if len(new_bucket) == 1:
+            self._mark_occupied(new_score)
+        self.pos_map[user_id] = len(new_bucket) - 1
         self.user_map[user_id] = new_score
+        self._fenwick_add(old_score, -1)
+        self._fenwick_add(new_score, 1)
 
     def update(self, user_id: int, new_score: int):
         """
         Updates a user's score.
-        Time Complexity: O(1)
+        Time Complexity: O(log max_score)
         """
         if new_score < 0 or new_score > self.max_score:
             raise ValueError(f"Score must be between 0 and {self.max_score}")
@@ -112,10 +255,147 @@ class ScoreIndexedArrayLeaderboard:
         # Move player between buckets
         self._move_player(user_id, old_score, new_score)
 
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Applies a batch of (user_id, new_score) pairs; unknown users are inserted.
+        Each move is already O(log max_score), so there is nothing to merge.
+        Time Complexity: O(b log max_score)
+        """
+        for user_id, new_score in pairs:
+            self.update(user_id, new_score)
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Inserts a batch of (user_id, score) pairs; existing users are updated.
+        """
+        self.update_many(pairs)
+
+    def count_above(self, score: int) -> int:
+        """
+        Returns the number of users with a score strictly greater than score.
+        Time Complexity: O(log max_score)
+        """
+        if score < 0:
+            return self.total_users
+        if score >= self.max_score:
+            return 0
+        return self.total_users - self._count_at_most(score)
+
+    def percentile(self, user_id: int) -> float:
+        """
+        Returns the user's standing as a top percentage ("top 3.2%"):
+        100 * (users with a higher score + 1) / n, or -1.0 for unknown users.
+        Time Complexity: O(log max_score)
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return -1.0
+        return 100.0 * (self.count_above(score) + 1) / self.total_users
+
+    def score_at_percentile(self, p: float) -> Optional[int]:
+        """
+        Returns the lowest score s with at least p percent of users scoring <= s
+        (nearest-rank method), or None if the board is empty.
+        Time Complexity: O(log max_score)
+        """
+        if p < 0 or p > 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        n = self.total_users
+        if not n:
+            return None
+        # The ceil(p% of n)-th lowest score, counting from 1
+        rank = max(math.ceil(p * n / 100), 1) - 1
+        return self._lowest_score_covering(rank + 1)
+
+    def _lowest_score_covering(self, count: int) -> int:
+        """
+        Returns the smallest score s with count_at_most(s) >= count (count >= 1).
+        Binary descent over the Fenwick tree.
+        Time Complexity: O(log max_score)
+        """
+        tree = self.fenwick
+        n = len(tree)
+        pos = 0
+        step = 1 << (n.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt < n and tree[nxt] < count:
+                pos = nxt
+                count -= tree[nxt]
+            step >>= 1
+        # pos is the 1-based index of the longest prefix below count; tree[s + 1] covers s
+        return pos
+
+    def _locate_rank(self, rank: int) -> Tuple[int, int]:
+        """
+        Returns (score, position in bucket) of the user with the given rank.
+        The rank must be in range.
+        Time Complexity: O(log max_score)
+        """
+        # Rank r means r users rank higher; they fill the top of the board,
+        # so the user is the (total - r)-th counted from the lowest score
+        score = self._lowest_score_covering(self.total_users - rank)
+        above = self.total_users - self._count_at_most(score)
+        return score, rank - above
+
+    def select(self, rank: int) -> Optional[tuple]:
+        """
+        Returns the (user_id, score) with the given rank (as returned by search),
+        or None if the rank is out of range.
+        Time Complexity: O(log max_score)
+        """
+        if rank < 0 or rank >= self.total_users:
+            return None
+        score, pos = self._locate_rank(rank)
+        return (self.score_buckets[score][pos], score)
+
+    def range_by_rank(self, start: int, stop: int) -> List[tuple]:
+        """
+        Returns (user_id, score) pairs for ranks start..stop-1, in rank order.
+        Locates start through the Fenwick tree, then walks non-empty buckets down.
+        Time Complexity: O(log max_score + (stop - start) + buckets visited)
+        """
+        start = max(start, 0)
+        stop = min(stop, self.total_users)
+        result = []
+        if start >= stop:
+            return result
+        count = stop - start
+        score, pos = self._locate_rank(start)
+        while score >= 0:
+            bucket = self.score_buckets[score]
+            for user_id in bucket[pos:pos + count - len(result)]:
+                result.append((user_id, score))
+            if len(result) >= count:
+                break
+            pos = 0
+            score = self._prev_occupied(score - 1)
+        return result
+
     def search(self, user_id: int, score: Optional[int] = None) -> int:
         """
         Finds the rank (index) of the user.
         Rank is calculated as the number of users with higher scores.
+        Time Complexity: O(log max_score)
+        """
+        if user_id not in self.user_map:
+            return -1
+        
+        if score is None:
+            score = self.user_map[user_id]
+        
+        # Users with higher scores = everyone minus those scoring <= score
+        rank = self.total_users - self._count_at_most(score)
+        
+        # Add position within the same score bucket
+        rank += self.pos_map[user_id]
+        
+        return rank
+
+    def search_scan(self, user_id: int, score: Optional[int] = None) -> int:
+        """
+        Finds the rank by summing every higher bucket (pre-Fenwick behaviour).
+        Kept as a baseline for the benchmarks.
         Time Complexity: O(max_score)
         """
         if user_id not in self.user_map:
@@ -134,21 +414,76 @@ class ScoreIndexedArrayLeaderboard:
         
         return rank
 
+    def search_many(self, user_ids: Iterable[int]):
+        """
+        Finds the ranks of many users at once (-1 for unknown users).
+        Computes the suffix sum of counts once, then resolves every rank
+        as users-above-score + position-in-bucket with vectorized indexing.
+        Returns a NumPy int64 array when NumPy is installed, otherwise a list.
+        Time Complexity: O(max_score + q)
+        """
+        user_map = self.user_map
+        pos_map = self.pos_map
+        if np is None:
+            # at_most[s] = users with score <= s
+            at_most = list(accumulate(self.counts))
+            total = self.total_users
+            return [total - at_most[user_map[uid]] + pos_map[uid] if uid in user_map else -1
+                    for uid in user_ids]
+
+        ids = list(user_ids)
+        scores = np.fromiter((user_map.get(uid, -1) for uid in ids), dtype=np.int64, count=len(ids))
+        positions = np.fromiter((pos_map.get(uid, 0) for uid in ids), dtype=np.int64, count=len(ids))
+        # above[s] = users with score > s
+        above = self.total_users - np.cumsum(np.frombuffer(self.counts, dtype=np.int64))
+        found = scores >= 0
+        return np.where(found, above[np.where(found, scores, 0)] + positions, -1)
+
+    def score_histogram(self):
+        """
+        Returns the number of users at each score, indexed by score.
+        This is a read-only view of the live counts, not a copy: it reflects
+        later writes to the board.
+        Time Complexity: O(1)
+        """
+        if np is None:
+            return memoryview(self.counts).toreadonly()
+        view = np.frombuffer(self.counts, dtype=np.int64)
+        view.flags.writeable = False
+        return view
+
+    def around(self, user_id: int, radius: int) -> List[Tuple[int, int]]:
+        """
+        Returns the user with up to radius users ranked above and below,
+        highest score first, as (user_id, score) tuples; [] for unknown users.
+        Ranks are already highest first, so this is the rank range around the
+        user, walked through the neighbouring buckets.
+        Time Complexity: O(log max_score + radius + buckets visited)
+        """
+        rank = self.search(user_id)
+        if rank < 0:
+            return []
+        return self.range_by_rank(rank - radius, rank + radius + 1)
+
     def top_k(self, k: int) -> List[tuple]:
         """
         Returns the top k users with their scores.
-        Time Complexity: O(max_score + k)
+        Time Complexity: O(k + occupied buckets visited)
         """
         result = []
         count = 0
+        if k <= 0:
+            return result
         
-        # Iterate from highest score to lowest
-        for score in range(self.max_score, -1, -1):
+        # Jump from one non-empty bucket to the next, highest score first
+        score = self._prev_occupied(self.max_score)
+        while score >= 0:
             for user_id in self.score_buckets[score]:
                 result.append((user_id, score))
                 count += 1
                 if count >= k:
                     return result
+            score = self._prev_occupied(score - 1)
         
         return result
 
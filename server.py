@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import struct
+from typing import Dict, List, Optional, Tuple, Type
+from sorted_array import SortedArrayLeaderboard
+from chunked_sorted_array import ChunkedSortedArrayLeaderboard
+from linked_list import LinkedListLeaderboard
+from rb_tree import RBTreeLeaderboard
+from array_rb_tree import ArrayRBTreeLeaderboard
+from skip_list import SkipListLeaderboard
+from score_indexed_array import ScoreIndexedArrayLeaderboard
+
+BOARD_CLASSES: Dict[str, Type] = {
+    cls.__name__: cls for cls in (
+        SortedArrayLeaderboard,
+        ChunkedSortedArrayLeaderboard,
+        LinkedListLeaderboard,
+        RBTreeLeaderboard,
+        ArrayRBTreeLeaderboard,
+        SkipListLeaderboard,
+        ScoreIndexedArrayLeaderboard
+    )
+}
+
+# Wire protocol
+#
+# Every message is a frame: a 4-byte big-endian payload length, then the payload.
+# Request payloads start with an opcode byte:
+#   INSERT / UPDATE  opcode, user_id (q), score (q)
+#   DELETE / SEARCH  opcode, user_id (q)
+#   TOP_K            opcode, k (I)
+# Response payloads start with a status byte:
+#   OK     INSERT/UPDATE/DELETE: nothing more
+#          SEARCH: rank (q)
+#          TOP_K: count (I), then count * (user_id (q), score (q))
+#   ERROR  UTF-8 error message
+# Requests on a connection may be pipelined; responses come back in request order.
+OP_INSERT = 1
+OP_UPDATE = 2
+OP_DELETE = 3
+OP_SEARCH = 4
+OP_TOP_K = 5
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+FRAME_HEADER = struct.Struct("!I")
+REQ_PAIR = struct.Struct("!Bqq")
+REQ_USER = struct.Struct("!Bq")
+REQ_K = struct.Struct("!BI")
+RESP_STATUS = struct.Struct("!B")
+RESP_RANK = struct.Struct("!Bq")
+RESP_COUNT = struct.Struct("!BI")
+ENTRY = struct.Struct("!qq")
+
+MAX_FRAME = 1 << 20
+
+def encode_request(op: int, *args) -> bytes:
+    """
+    Builds a complete request frame.
+    """
+    if op in (OP_INSERT, OP_UPDATE):
+        payload = REQ_PAIR.pack(op, *args)
+    elif op in (OP_DELETE, OP_SEARCH):
+        payload = REQ_USER.pack(op, *args)
+    elif op == OP_TOP_K:
+        payload = REQ_K.pack(op, *args)
+    else:
+        raise ValueError(f"Unknown opcode {op}")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+def decode_response(op: int, payload: bytes):
+    """
+    Decodes a response payload for a request with the given opcode.
+    Returns None for writes, the rank for SEARCH and a list of
+    (user_id, score) for TOP_K. Raises RuntimeError on an error response.
+    """
+    if payload[0] != STATUS_OK:
+        raise RuntimeError(payload[1:].decode("utf-8", "replace"))
+    if op == OP_SEARCH:
+        return RESP_RANK.unpack(payload)[1]
+    if op == OP_TOP_K:
+        count = RESP_COUNT.unpack_from(payload)[1]
+        return [ENTRY.unpack_from(payload, RESP_COUNT.size + i * ENTRY.size) for i in range(count)]
+    return None
+
+def _frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+def _error_frame(exc: Exception) -> bytes:
+    return _frame(RESP_STATUS.pack(STATUS_ERROR) + str(exc).encode("utf-8"))
+
+OK_FRAME = _frame(RESP_STATUS.pack(STATUS_OK))
+
+class LeaderboardConnection(asyncio.Protocol):
+    """
+    One client connection. Splits the byte stream into frames and hands them
+    to the server; replies are buffered and written once per batch of input.
+    """
+
+    def __init__(self, server: 'LeaderboardServer'):
+        self.server = server
+        self.transport = None
+        self.buffer = bytearray()
+        self.out = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+    def data_received(self, data: bytes):
+        buffer = self.buffer
+        buffer += data
+        pos = 0
+        end = len(buffer)
+        header = FRAME_HEADER.size
+        while end - pos >= header:
+            length = FRAME_HEADER.unpack_from(buffer, pos)[0]
+            if length > MAX_FRAME or length == 0:
+                self.transport.close()
+                return
+            if end - pos - header < length:
+                break
+            start = pos + header
+            self.server.handle(self, bytes(buffer[start:start + length]))
+            pos = start + length
+        del buffer[:pos]
+        self.send_pending()
+
+    def reply(self, frame: bytes):
+        self.out += frame
+
+    def send_pending(self):
+        if self.out and self.transport is not None:
+            self.transport.write(bytes(self.out))
+        self.out.clear()
+
+class LeaderboardServer:
+    """
+    Serves one leaderboard over the binary protocol above.
+
+    Reads are answered as soon as they are parsed. Writes are queued and
+    applied together at the end of the event-loop tick: runs of
+    insert/update collapse into one update_many call (the last write per
+    user wins, as with sequential updates), so a burst of pipelined writes
+    from many clients costs one batched call instead of one call each.
+    A read flushes the queue first, so every client reads its own writes.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        # (connection, opcode, user_id, score) writes waiting for the end of the tick
+        self.pending: List[Tuple[LeaderboardConnection, int, int, Optional[int]]] = []
+        self.flush_scheduled = False
+        self.flushes = 0
+        self.writes = 0
+
+    def handle(self, conn: LeaderboardConnection, payload: bytes):
+        """
+        Dispatches one request payload.
+        """
+        op = payload[0]
+        try:
+            if op == OP_INSERT or op == OP_UPDATE:
+                _, uid, score = REQ_PAIR.unpack(payload)
+                self._queue(conn, op, uid, score)
+            elif op == OP_DELETE:
+                _, uid = REQ_USER.unpack(payload)
+                self._queue(conn, op, uid, None)
+            elif op == OP_SEARCH:
+                _, uid = REQ_USER.unpack(payload)
+                self.flush()
+                conn.reply(_frame(RESP_RANK.pack(STATUS_OK, self.board.search(uid))))
+            elif op == OP_TOP_K:
+                _, k = REQ_K.unpack(payload)
+                self.flush()
+                top = self.board.top_k(k)
+                parts = [RESP_COUNT.pack(STATUS_OK, len(top))]
+                parts.extend(ENTRY.pack(uid, score) for uid, score in top)
+                conn.reply(_frame(b"".join(parts)))
+            else:
+                raise ValueError(f"Unknown opcode {op}")
+        except Exception as exc:
+            self.flush()
+            conn.reply(_error_frame(exc))
+
+    def _queue(self, conn: LeaderboardConnection, op: int, uid: int, score: Optional[int]):
+        self.pending.append((conn, op, uid, score))
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def _apply_run(self, run: Dict[int, int], acks: List[Tuple[LeaderboardConnection, int, int]]):
+        """
+        Applies a run of coalesced inserts/updates and acknowledges each request.
+        If the batch fails, the run is replayed one write at a time so only
+        the offending requests get an error.
+        """
+        board = self.board
+        try:
+            if len(run) == 1:
+                for uid, score in run.items():
+                    board.update(uid, score)
+            else:
+                board.update_many(run.items())
+        except Exception:
+            for conn, uid, score in acks:
+                try:
+                    board.update(uid, score)
+                    conn.reply(OK_FRAME)
+                except Exception as exc:
+                    conn.reply(_error_frame(exc))
+            return
+        for conn, _, _ in acks:
+            conn.reply(OK_FRAME)
+
+    def flush(self):
+        """
+        Applies every queued write in arrival order and sends the acknowledgements.
+        """
+        self.flush_scheduled = False
+        pending = self.pending
+        if not pending:
+            return
+        self.pending = []
+        self.flushes += 1
+        self.writes += len(pending)
+        run: Dict[int, int] = {}
+        acks = []
+        for conn, op, uid, score in pending:
+            if op == OP_DELETE:
+                if run:
+                    self._apply_run(run, acks)
+                    run = {}
+                    acks = []
+                try:
+                    self.board.delete(uid)
+                    conn.reply(OK_FRAME)
+                except Exception as exc:
+                    conn.reply(_error_frame(exc))
+            else:
+                # Re-inserting under the same key moves it to the end, keeping
+                # the run in arrival order for the per-item fallback
+                run.pop(uid, None)
+                run[uid] = score
+                acks.append((conn, uid, score))
+        if run:
+            self._apply_run(run, acks)
+        for conn in {conn for conn, _, _, _ in pending}:
+            conn.send_pending()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None) -> asyncio.AbstractServer:
+        """
+        Starts listening on a TCP port, or on a Unix socket if path is given.
+        """
+        loop = asyncio.get_running_loop()
+        if path is not None:
+            return await loop.create_unix_server(lambda: LeaderboardConnection(self), path)
+        return await loop.create_server(lambda: LeaderboardConnection(self), host, port)
+
+async def serve(board_cls: Type, host: str = "127.0.0.1", port: int = 7070, path: Optional[str] = None):
+    """
+    Runs a server for a fresh board_cls instance until cancelled.
+    """
+    server = LeaderboardServer(board_cls())
+    listener = await server.start(host, port, path)
+    async with listener:
+        await listener.serve_forever()
+
+def run_server(board_name: str, host: str = "127.0.0.1", port: int = 7070, path: Optional[str] = None):
+    """
+    Blocking entry point, also used to start the server in a child process.
+    """
+    try:
+        asyncio.run(serve(BOARD_CLASSES[board_name], host, port, path))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a leaderboard over TCP or a Unix socket.")
+    parser.add_argument("--board", default="SkipListLeaderboard", choices=sorted(BOARD_CLASSES))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7070)
+    parser.add_argument("--unix", default=None, help="Unix socket path (overrides --host/--port)")
+    args = parser.parse_args()
+    run_server(args.board, args.host, args.port, args.unix)
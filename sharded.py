@@ -0,0 +1,217 @@
+import heapq
+import multiprocessing
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+# Unacknowledged requests allowed per shard before the coordinator reads replies.
+# Without a bound the replies fill the pipe, the worker blocks on send and
+# stops reading, and both ends deadlock.
+MAX_IN_FLIGHT = 256
+
+def shard_of(user_id: int, num_shards: int) -> int:
+    """
+    Maps a user_id to its owning shard.
+    Python's hash(int) is the identity, so ids with a common stride would
+    pile onto a few shards; multiply by a 64-bit odd constant first
+    (Fibonacci hashing) and use the high bits.
+    """
+    return (((user_id * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % num_shards
+
+def _shard_worker(board_cls: Type, conn):
+    """
+    Worker process loop: owns one board and executes (method, args) requests
+    from the coordinator in order, replying ("ok", result) or ("err", exc).
+    A None request shuts the worker down.
+    """
+    board = board_cls()
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        method, args = request
+        try:
+            if method == "user_score":
+                result = board.user_map.get(args[0])
+            elif method == "len":
+                result = len(board)
+            else:
+                result = getattr(board, method)(*args)
+            conn.send(("ok", result))
+        except Exception as exc:
+            conn.send(("err", exc))
+    conn.close()
+
+class ShardedLeaderboard:
+    """
+    Leaderboard partitioned by user_id hash across worker processes.
+
+    Each shard is a separate process holding an instance of board_cls, so
+    writes to different shards run on different cores. Writes are sent to
+    the owning shard only and are pipelined: the coordinator does not wait
+    for the acknowledgement until it next needs an answer from that shard,
+    at which point any deferred error is raised.
+
+    Reads scatter to every shard and gather the replies:
+    top_k merges the per-shard top k lists with a heap, and search returns
+    the global rank as the sum over shards of count_above(score), i.e. the
+    number of users with a strictly higher score (ties share a rank).
+    """
+
+    def __init__(self, board_cls: Type, num_shards: int = 4, start_method: Optional[str] = None):
+        self.board_cls = board_cls
+        self.num_shards = num_shards
+        ctx = multiprocessing.get_context(start_method)
+        self.conns = []
+        self.workers = []
+        for _ in range(num_shards):
+            parent_conn, child_conn = ctx.Pipe()
+            worker = ctx.Process(target=_shard_worker, args=(board_cls, child_conn), daemon=True)
+            worker.start()
+            child_conn.close()
+            self.conns.append(parent_conn)
+            self.workers.append(worker)
+        # Replies still owed by each shard for pipelined writes
+        self.pending = [0] * num_shards
+        # First error reported by each shard's pipelined writes, raised on the next read
+        self.errors: List[Optional[Exception]] = [None] * num_shards
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]], board_cls: Type, num_shards: int = 4) -> 'ShardedLeaderboard':
+        """
+        Builds a sharded leaderboard, loading each shard with one batch.
+        """
+        lb = cls(board_cls, num_shards)
+        lb.update_many(pairs)
+        return lb
+
+    def _send(self, shard: int, method: str, *args):
+        if self.pending[shard] >= MAX_IN_FLIGHT:
+            self._recv_one(shard)
+        self.conns[shard].send((method, args))
+        self.pending[shard] += 1
+
+    def _recv_one(self, shard: int):
+        """
+        Reads the shard's oldest outstanding reply, recording an error for later.
+        """
+        status, result = self.conns[shard].recv()
+        self.pending[shard] -= 1
+        if status == "err" and self.errors[shard] is None:
+            self.errors[shard] = result
+        return result
+
+    def _recv(self, shard: int):
+        """
+        Drains the shard's outstanding replies and returns the last one.
+        Raises the first error any of them reported.
+        """
+        result = None
+        while self.pending[shard]:
+            result = self._recv_one(shard)
+        error = self.errors[shard]
+        if error is not None:
+            self.errors[shard] = None
+            raise error
+        return result
+
+    def _call(self, shard: int, method: str, *args):
+        self._send(shard, method, *args)
+        return self._recv(shard)
+
+    def _broadcast(self, method: str, *args) -> List:
+        """
+        Sends the same request to every shard, then gathers the replies.
+        The shards work on it in parallel.
+        """
+        for shard in range(self.num_shards):
+            self._send(shard, method, *args)
+        return [self._recv(shard) for shard in range(self.num_shards)]
+
+    def sync(self):
+        """
+        Waits for every pipelined write to be acknowledged.
+        """
+        for shard in range(self.num_shards):
+            self._recv(shard)
+
+    def insert(self, user_id: int, score: int):
+        self._send(shard_of(user_id, self.num_shards), "insert", user_id, score)
+
+    def update(self, user_id: int, new_score: int):
+        self._send(shard_of(user_id, self.num_shards), "update", user_id, new_score)
+
+    def delete(self, user_id: int, score: Optional[int] = None):
+        self._send(shard_of(user_id, self.num_shards), "delete", user_id, score)
+
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Splits the batch by owning shard and sends each shard its part.
+        """
+        parts: Dict[int, List[Tuple[int, int]]] = {}
+        for uid, score in pairs:
+            parts.setdefault(shard_of(uid, self.num_shards), []).append((uid, score))
+        for shard, part in parts.items():
+            self._send(shard, "update_many", part)
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        self.update_many(pairs)
+
+    def count_above(self, score: int) -> int:
+        return sum(self._broadcast("count_above", score))
+
+    def search(self, user_id: int, score: Optional[int] = None) -> int:
+        """
+        Returns the global rank: the number of users with a higher score.
+        One round trip to the owning shard for the score, then one
+        scatter-gather of count_above.
+        """
+        if score is None:
+            score = self._call(shard_of(user_id, self.num_shards), "user_score", user_id)
+            if score is None:
+                return -1
+        return self.count_above(score)
+
+    def top_k(self, k: int) -> List[Tuple[int, int]]:
+        """
+        Gathers each shard's top k and merges them with a heap.
+        Time Complexity: O(shards * k) transfer + O(k log shards) merge
+        """
+        per_shard = self._broadcast("top_k", k)
+        merged = heapq.merge(*per_shard, key=lambda entry: entry[1], reverse=True)
+        return list(islice(merged, max(k, 0)))
+
+    def __len__(self):
+        return sum(self._broadcast("len"))
+
+    def close(self):
+        """
+        Stops the worker processes. Every shard is drained and shut down
+        even if one of them reports a deferred error; the first such error
+        is raised once all workers have exited.
+        """
+        first_error = None
+        for shard in range(len(self.conns)):
+            try:
+                self._recv(shard)
+            except Exception as exc:
+                if first_error is None:
+                    first_error = exc
+        for conn in self.conns:
+            try:
+                conn.send(None)
+            except OSError:
+                # The worker is already gone
+                pass
+            conn.close()
+        for worker in self.workers:
+            worker.join()
+        self.conns = []
+        self.workers = []
+        if first_error is not None:
+            raise first_error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,5 +1,9 @@
+import math
 import random
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator
+
+# update_many rebuilds the whole list when batch size * REBUILD_RATIO >= list size
+REBUILD_RATIO = 4
 
 class SkipNode:
     def __init__(self, user_id: int, score: int, level: int):
@@ -9,6 +13,8 @@ class SkipNode:
         self.forward: List[Optional['SkipNode']] = [None] * (level + 1)
         # span[i] is the distance to the next node at level i
         self.span: List[int] = [0] * (level + 1)
+        # Previous node at level 0 (None for the first node), as in Redis zsets
+        self.backward: Optional['SkipNode'] = None
 
 class SkipListLeaderboard:
     def __init__(self, max_level: int = 16, p: float = 0.5):
@@ -17,8 +23,67 @@ class SkipListLeaderboard:
         self.header = SkipNode(-1, -1, max_level)
         self.level = 0
         self.size = 0
+        # Last node at level 0, so top_k can walk backwards from the highest score
+        self.tail: Optional[SkipNode] = None
         self.user_map: Dict[int, int] = {} # user_id -> score
 
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]], max_level: int = 16, p: float = 0.5) -> 'SkipListLeaderboard':
+        """
+        Builds a skip list from (user_id, score) pairs.
+        Sorts once, draws a level per node, then links each level bottom-up
+        in a single left-to-right pass, computing spans from node positions.
+        Time Complexity: O(n log n) for the sort, O(n) expected for the build
+        """
+        lb = cls(max_level, p)
+        lb.user_map = dict(pairs)
+        lb._build_from_sorted(sorted((score, uid) for uid, score in lb.user_map.items()))
+        return lb
+
+    def _build_from_sorted(self, entries: List[Tuple[int, int]]):
+        """
+        Replaces the list contents with sorted (score, user_id) entries.
+        Does not touch user_map.
+        Time Complexity: O(n) expected
+        """
+        self.header = SkipNode(-1, -1, self.max_level)
+        self.level = 0
+        self.tail = None
+        n = len(entries)
+
+        # last[i] is the most recent node linked at level i, pos[i] its 1-based position
+        last: List[SkipNode] = [self.header] * (self.max_level + 1)
+        last_pos = [0] * (self.max_level + 1)
+        for pos, (score, uid) in enumerate(entries, 1):
+            lvl = self._random_level()
+            node = SkipNode(uid, score, lvl)
+            node.backward = self.tail
+            self.tail = node
+            for i in range(lvl + 1):
+                last[i].forward[i] = node
+                last[i].span[i] = pos - last_pos[i]
+                last[i] = node
+                last_pos[i] = pos
+            if lvl > self.level:
+                self.level = lvl
+
+        # Tail spans run to the end of the list, as insert leaves them
+        for i in range(self.level + 1):
+            last[i].span[i] = n - last_pos[i]
+        self.size = n
+
+    def _entries(self) -> List[Tuple[int, int]]:
+        """
+        Returns all (score, user_id) entries in ascending order.
+        Time Complexity: O(n)
+        """
+        entries = []
+        x = self.header.forward[0]
+        while x:
+            entries.append((x.score, x.user_id))
+            x = x.forward[0]
+        return entries
+
     def _random_level(self) -> int:
         lvl = 0
         while random.random() < self.p and lvl < self.max_level:
@@ -64,8 +129,19 @@ class SkipListLeaderboard:
         for i in range(lvl + 1, self.level + 1):
             update[i].span[i] += 1
 
+        self._link_backward(x, update[0])
         self.size += 1
 
+    def _link_backward(self, x: SkipNode, prev: SkipNode):
+        """
+        Sets the backward links around a node just linked after prev at level 0.
+        """
+        x.backward = prev if prev is not self.header else None
+        if x.forward[0]:
+            x.forward[0].backward = x
+        else:
+            self.tail = x
+
     def delete(self, user_id: int, score: Optional[int] = None):
         if score is None:
             score = self.user_map.get(user_id)
@@ -85,15 +161,16 @@ class SkipListLeaderboard:
         x = x.forward[0]
         if x and x.score == score and x.user_id == user_id:
             for i in range(self.level + 1):
-                if update[i].forward[i] != x:
-                    break
-                update[i].forward[i] = x.forward[i]
-                update[i].span[i] += x.span[i] - 1
-            
-            # Correct loop for higher levels
-            for i in range(self.level + 1):
-                if update[i].forward[i] != x:
-                     update[i].span[i] -= 1
+                if update[i].forward[i] == x:
+                    update[i].forward[i] = x.forward[i]
+                    update[i].span[i] += x.span[i] - 1
+                else:
+                    # Levels above x only lose one node from their span
+                    update[i].span[i] -= 1
+            if x.forward[0]:
+                x.forward[0].backward = x.backward
+            else:
+                self.tail = x.backward
 
             while self.level > 0 and self.header.forward[self.level] is None:
                 self.level -= 1
@@ -116,6 +193,94 @@ class SkipListLeaderboard:
         # Insert new
         self.insert(user_id, new_score)
 
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Applies a batch of (user_id, new_score) pairs; unknown users are inserted.
+        Old entries are deleted first, then the sorted batch is inserted with
+        a finger: each insert resumes from the previous insert's update path
+        instead of descending from the header again. Batches that touch a
+        large share of the list merge into a level-0 walk and rebuild instead.
+        Time Complexity: O(b log n) deletes + O(b log(n / b)) expected inserts,
+        O(n + b log b) for a rebuild
+        """
+        batch = dict(pairs)
+        if not batch:
+            return
+        if len(batch) * REBUILD_RATIO >= self.size:
+            kept = [entry for entry in self._entries() if entry[1] not in batch]
+            self.user_map.update(batch)
+            # Timsort detects the two sorted runs and merges them in one pass
+            kept.extend(sorted((score, uid) for uid, score in batch.items()))
+            kept.sort()
+            self._build_from_sorted(kept)
+            return
+        for uid in batch:
+            if uid in self.user_map:
+                self.delete(uid)
+        self.user_map.update(batch)
+        new_entries = sorted((score, uid) for uid, score in batch.items())
+
+        # finger[i] is the last node at level i known to precede the next key,
+        # finger_rank[i] its 1-based position (0 for the header)
+        finger: List[SkipNode] = [self.header] * (self.max_level + 1)
+        finger_rank = [0] * (self.max_level + 1)
+        update: List[SkipNode] = [self.header] * (self.max_level + 1)
+        rank = [0] * (self.max_level + 1)
+
+        for score, user_id in new_entries:
+            self._finger_descend(score, user_id, finger, finger_rank, update, rank)
+
+            lvl = self._random_level()
+            if lvl > self.level:
+                for i in range(self.level + 1, lvl + 1):
+                    rank[i] = 0
+                    update[i] = self.header
+                    update[i].span[i] = self.size
+                self.level = lvl
+
+            x = SkipNode(user_id, score, lvl)
+            for i in range(lvl + 1):
+                x.forward[i] = update[i].forward[i]
+                update[i].forward[i] = x
+                x.span[i] = update[i].span[i] - (rank[0] - rank[i])
+                update[i].span[i] = (rank[0] - rank[i]) + 1
+                finger[i] = x
+                finger_rank[i] = rank[0] + 1
+            for i in range(lvl + 1, self.level + 1):
+                update[i].span[i] += 1
+                finger[i] = update[i]
+                finger_rank[i] = rank[i]
+
+            self._link_backward(x, update[0])
+            self.size += 1
+
+    def _finger_descend(self, score: int, user_id: int, finger: List[SkipNode], finger_rank: List[int],
+                        path: List[SkipNode], path_rank: List[int]):
+        """
+        Finds the last node before (score, user_id) at every level, resuming
+        from finger[i] wherever it is further along than the descent, and
+        stores it in path[i] with its 1-based position (0 for the header) in
+        path_rank[i]. path may be the finger itself.
+        """
+        x = self.header
+        r = 0
+        for i in range(self.level, -1, -1):
+            # Start from the finger if it is further along than the descent
+            if finger_rank[i] > r:
+                x = finger[i]
+                r = finger_rank[i]
+            while x.forward[i] and (x.forward[i].score < score or (x.forward[i].score == score and x.forward[i].user_id < user_id)):
+                r += x.span[i]
+                x = x.forward[i]
+            path[i] = x
+            path_rank[i] = r
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Inserts a batch of (user_id, score) pairs; existing users are updated.
+        """
+        self.update_many(pairs)
+
     def search(self, user_id: int, score: Optional[int] = None) -> int:
         """
         Finds the rank (0-based index) of the user.
@@ -137,22 +302,169 @@ class SkipListLeaderboard:
             return rank
         return -1
 
+    def count_above(self, score: int) -> int:
+        """
+        Returns the number of users with a score strictly greater than score.
+        Time Complexity: O(log n) expected
+        """
+        x = self.header
+        at_most = 0
+        for i in range(self.level, -1, -1):
+            while x.forward[i] and x.forward[i].score <= score:
+                at_most += x.span[i]
+                x = x.forward[i]
+        return self.size - at_most
+
+    def percentile(self, user_id: int) -> float:
+        """
+        Returns the user's standing as a top percentage ("top 3.2%"):
+        100 * (users with a higher score + 1) / n, or -1.0 for unknown users.
+        Time Complexity: O(log n) expected
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return -1.0
+        return 100.0 * (self.count_above(score) + 1) / self.size
+
+    def score_at_percentile(self, p: float) -> Optional[int]:
+        """
+        Returns the lowest score s with at least p percent of users scoring <= s
+        (nearest-rank method), or None if the board is empty.
+        Time Complexity: O(log n) expected
+        """
+        if p < 0 or p > 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        n = self.size
+        if not n:
+            return None
+        # The ceil(p% of n)-th lowest score, counting from 1
+        rank = max(math.ceil(p * n / 100), 1) - 1
+        return self._select_node(rank).score
+
+    def _select_node(self, rank: int) -> Optional[SkipNode]:
+        """
+        Returns the node with the given 0-based rank, or None.
+        Descends using spans, as Redis does for ZRANGE.
+        Time Complexity: O(log n) expected
+        """
+        if rank < 0 or rank >= self.size:
+            return None
+        target = rank + 1  # 1-based position
+        x = self.header
+        traversed = 0
+        for i in range(self.level, -1, -1):
+            while x.forward[i] and traversed + x.span[i] <= target:
+                traversed += x.span[i]
+                x = x.forward[i]
+            if traversed == target:
+                return x
+        return None
+
+    def search_many(self, user_ids: Iterable[int]) -> List[int]:
+        """
+        Finds the ranks of many users at once (-1 for unknown users).
+        Sorts the query keys and resolves them with a finger: each search
+        resumes from the previous search's path at every level instead of
+        descending from the header again.
+        Time Complexity: O(q log q + q log(n / q)) expected
+        """
+        user_map = self.user_map
+        ids = list(user_ids)
+        result = [-1] * len(ids)
+        queries = []
+        for i, uid in enumerate(ids):
+            score = user_map.get(uid)
+            if score is not None:
+                queries.append((score, uid, i))
+        queries.sort()
+        finger: List[SkipNode] = [self.header] * (self.max_level + 1)
+        finger_rank = [0] * (self.max_level + 1)
+        for score, user_id, qi in queries:
+            self._finger_descend(score, user_id, finger, finger_rank, finger, finger_rank)
+            x = finger[0]
+            if x.forward[0] and x.forward[0].score == score and x.forward[0].user_id == user_id:
+                result[qi] = finger_rank[0]
+        return result
+
+    def select(self, rank: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (user_id, score) with the given rank (as returned by search),
+        or None if the rank is out of range.
+        Time Complexity: O(log n) expected
+        """
+        x = self._select_node(rank)
+        if x is None:
+            return None
+        return (x.user_id, x.score)
+
+    def range_by_rank(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Returns (user_id, score) pairs for ranks start..stop-1, in rank order.
+        Time Complexity: O(log n + (stop - start)) expected
+        """
+        start = max(start, 0)
+        result = []
+        x = self._select_node(start)
+        count = stop - start
+        while x and len(result) < count:
+            result.append((x.user_id, x.score))
+            x = x.forward[0]
+        return result
+
+    def around(self, user_id: int, radius: int) -> List[Tuple[int, int]]:
+        """
+        Returns the user with up to radius users ranked above and below,
+        highest score first, as (user_id, score) tuples; [] for unknown users.
+        Locates the node, then walks forward and backward pointers.
+        Time Complexity: O(log n + radius) expected
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return []
+        x = self.header
+        for i in range(self.level, -1, -1):
+            while x.forward[i] and (x.forward[i].score < score or (x.forward[i].score == score and x.forward[i].user_id < user_id)):
+                x = x.forward[i]
+        node = x.forward[0]
+        if not node or node.user_id != user_id or node.score != score:
+            return []
+        window = []
+        current = node.forward[0]
+        while current and len(window) < radius:
+            window.append((current.user_id, current.score))
+            current = current.forward[0]
+        window.reverse()
+        window.append((user_id, score))
+        current = node.backward
+        below = 0
+        while current and below < radius:
+            window.append((current.user_id, current.score))
+            current = current.backward
+            below += 1
+        return window
+
     def top_k(self, k: int) -> List[Tuple[int, int]]:
         """
         Returns the top k users with highest scores.
         Returns list of (user_id, score) tuples.
+        Walks backward from the tail and stops after k nodes.
+        Time Complexity: O(k)
         """
-        # Traverse the skip list at level 0 to collect all elements
-        elements = []
-        current = self.header.forward[0]
+        result = []
+        current = self.tail
+        while current and len(result) < k:
+            result.append((current.user_id, current.score))
+            current = current.backward
+        return result
+
+    def __reversed__(self) -> Iterator[Tuple[int, int]]:
+        """
+        Iterates (user_id, score) pairs from the highest score down.
+        """
+        current = self.tail
         while current:
-            elements.append((current.user_id, current.score))
-            current = current.forward[0]
-        
-        # Return last k in descending order (list is sorted ascending)
-        if k >= len(elements):
-            return [(uid, score) for uid, score in reversed(elements)]
-        return [(uid, score) for uid, score in reversed(elements[-k:])]
+            yield (current.user_id, current.score)
+            current = current.backward
 
     def __len__(self):
         return self.size
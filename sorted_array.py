@@ -1,5 +1,9 @@
+import math
 import bisect
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Iterable
+
+# update_many rebuilds the list when batch size * REBUILD_RATIO >= len(data)
+REBUILD_RATIO = 64
 
 class SortedArrayLeaderboard:
     def __init__(self):
@@ -7,6 +11,18 @@ class SortedArrayLeaderboard:
         self.data: List[Tuple[int, int]] = []
         self.user_map: Dict[int, int] = {} # user_id -> score
 
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]]) -> 'SortedArrayLeaderboard':
+        """
+        Builds a leaderboard from (user_id, score) pairs with a single sort.
+        Later pairs for the same user_id win, as with repeated insert.
+        Time Complexity: O(n log n)
+        """
+        lb = cls()
+        lb.user_map = dict(pairs)
+        lb.data = sorted((score, uid) for uid, score in lb.user_map.items())
+        return lb
+
     def insert(self, user_id: int, score: int):
         """
         Inserts a new user score.
@@ -54,6 +70,33 @@ class SortedArrayLeaderboard:
         # Insert new
         self.insert(user_id, new_score)
 
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Applies a batch of (user_id, new_score) pairs; unknown users are inserted.
+        Large batches rebuild the list once: entries of batched users are
+        filtered out and the sorted batch is merged back in. Small batches
+        fall back to per-item update, whose memmove is cheaper than a rebuild.
+        Time Complexity: O(n + b log b) for a rebuild
+        """
+        batch = dict(pairs)
+        if len(batch) * REBUILD_RATIO < len(self.data):
+            for uid, score in batch.items():
+                self.update(uid, score)
+            return
+
+        kept = [entry for entry in self.data if entry[1] not in batch]
+        self.user_map.update(batch)
+        # Timsort detects the two sorted runs and merges them in one pass
+        kept.extend(sorted((score, uid) for uid, score in batch.items()))
+        kept.sort()
+        self.data = kept
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        """
+        Inserts a batch of (user_id, score) pairs; existing users are updated.
+        """
+        self.update_many(pairs)
+
     def search(self, user_id: int, score: Optional[int] = None) -> int:
         """
         Finds the rank (index) of the user.
@@ -69,6 +112,94 @@ class SortedArrayLeaderboard:
             return idx
         return -1
 
+    def search_many(self, user_ids: Iterable[int]) -> List[int]:
+        """
+        Finds the ranks of many users at once (-1 for unknown users).
+        Sorts the query keys, then bisects each one starting from the
+        previous hit, so the search window shrinks as the sweep advances.
+        Time Complexity: O(q log q + q log n)
+        """
+        user_map = self.user_map
+        ids = list(user_ids)
+        result = [-1] * len(ids)
+        queries = []
+        for i, uid in enumerate(ids):
+            score = user_map.get(uid)
+            if score is not None:
+                queries.append((score, uid, i))
+        queries.sort()
+        data = self.data
+        lo = 0
+        for score, uid, i in queries:
+            lo = bisect.bisect_left(data, (score, uid), lo)
+            if lo < len(data) and data[lo] == (score, uid):
+                result[i] = lo
+        return result
+
+    def count_above(self, score: int) -> int:
+        """
+        Returns the number of users with a score strictly greater than score.
+        Time Complexity: O(log n)
+        """
+        # (score + 1,) sorts before every entry with score + 1
+        return len(self.data) - bisect.bisect_left(self.data, (score + 1,))
+
+    def percentile(self, user_id: int) -> float:
+        """
+        Returns the user's standing as a top percentage ("top 3.2%"):
+        100 * (users with a higher score + 1) / n, or -1.0 for unknown users.
+        Time Complexity: O(log n)
+        """
+        score = self.user_map.get(user_id)
+        if score is None:
+            return -1.0
+        return 100.0 * (self.count_above(score) + 1) / len(self.data)
+
+    def score_at_percentile(self, p: float) -> Optional[int]:
+        """
+        Returns the lowest score s with at least p percent of users scoring <= s
+        (nearest-rank method), or None if the board is empty.
+        Time Complexity: O(1)
+        """
+        if p < 0 or p > 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        n = len(self.data)
+        if not n:
+            return None
+        # The ceil(p% of n)-th lowest score, counting from 1
+        rank = max(math.ceil(p * n / 100), 1) - 1
+        return self.data[rank][0]
+
+    def select(self, rank: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (user_id, score) with the given rank (as returned by search),
+        or None if the rank is out of range.
+        Time Complexity: O(1)
+        """
+        if rank < 0 or rank >= len(self.data):
+            return None
+        score, uid = self.data[rank]
+        return (uid, score)
+
+    def range_by_rank(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Returns (user_id, score) pairs for ranks start..stop-1, in rank order.
+        Time Complexity: O(stop - start)
+        """
+        return [(uid, score) for score, uid in self.data[max(start, 0):max(stop, 0)]]
+
+    def around(self, user_id: int, radius: int) -> List[Tuple[int, int]]:
+        """
+        Returns the user with up to radius users ranked above and below,
+        highest score first, as (user_id, score) tuples; [] for unknown users.
+        Time Complexity: O(log n + radius)
+        """
+        i = self.search(user_id)
+        if i < 0:
+            return []
+        window = self.data[max(i - radius, 0):i + radius + 1]
+        return [(uid, score) for score, uid in reversed(window)]
+
     def top_k(self, k: int) -> List[Tuple[int, int]]:
         """
         Returns the top k users with highest scores.
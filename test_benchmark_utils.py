@@ -0,0 +1,75 @@
+"""
+LatencyHistogram against exact percentiles of the recorded samples.
+
+Run with: python -m pytest -q
+"""
+import math
+import random
+import pytest
+from benchmark_utils import LatencyHistogram
+
+PERCENTILES = [1, 50, 90, 99, 99.9, 99.99, 100]
+
+def exact_percentiles(values, ps):
+    # Nearest rank, as LatencyHistogram.percentiles
+    ordered = sorted(values)
+    return [ordered[max(math.ceil(p / 100.0 * len(ordered)), 1) - 1] for p in ps]
+
+def test_small_values_are_exact():
+    rng = random.Random(0)
+    values = [rng.randrange(2048) for _ in range(5000)]
+    hist = LatencyHistogram()
+    for value in values:
+        hist.record(value)
+    assert hist.percentiles(PERCENTILES) == exact_percentiles(values, PERCENTILES)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_large_values_within_relative_error(seed):
+    rng = random.Random(seed)
+    # Latencies spread over several orders of magnitude
+    values = [int(rng.lognormvariate(10, 2)) for _ in range(20000)]
+    hist = LatencyHistogram()
+    for value in values:
+        hist.append(value)
+    bound = 2.0 ** -(hist.sub_bucket_bits - 1)
+    for got, want in zip(hist.percentiles(PERCENTILES), exact_percentiles(values, PERCENTILES)):
+        # Reported as the top of the bucket holding the sample, so never below it
+        assert want <= got <= want * (1 + bound)
+    stats = hist.stats()
+    assert len(hist) == len(values)
+    assert stats["Min"] == min(values) / 1000.0 and stats["Max"] == max(values) / 1000.0
+    assert stats["Average"] == pytest.approx(sum(values) / len(values) / 1000.0)
+    assert stats["P50"] <= stats["P95"] <= stats["P99"] <= stats["P99.9"] <= stats["P99.99"] <= stats["Max"]
+
+def test_merge_matches_recording_everything():
+    rng = random.Random(1)
+    parts = [[int(rng.expovariate(1e-5)) for _ in range(3000)] for _ in range(3)]
+    merged = LatencyHistogram()
+    whole = LatencyHistogram()
+    for part in parts:
+        hist = LatencyHistogram()
+        for value in part:
+            hist.record(value)
+            whole.record(value)
+        merged.merge(hist)
+    merged.merge(LatencyHistogram())
+    assert merged.counts == whole.counts
+    assert merged.stats() == whole.stats()
+    with pytest.raises(ValueError):
+        merged.merge(LatencyHistogram(sub_bucket_bits=8))
+
+def test_out_of_range_values():
+    hist = LatencyHistogram(max_bits=20)
+    hist.record(-5)
+    hist.record(1.7)
+    hist.record(1 << 30)
+    assert hist.min == 0 and hist.max == 1 << 30
+    # Values past 2^max_bits share the last bucket but max stays exact
+    assert hist.counts[-1] == 1
+    assert hist.percentiles([100]) == [1 << 30]
+
+def test_empty_histogram():
+    hist = LatencyHistogram()
+    assert len(hist) == 0
+    assert hist.percentiles([50, 99]) == [0, 0]
+    assert hist.stats()["P99"] == 0.0
@@ -0,0 +1,115 @@
+"""
+DurableLeaderboard recovery: whatever was flushed before a crash comes back
+from the newest snapshot plus the WAL segments after it.
+
+Run with: python -m pytest -q
+"""
+import os
+import random
+import struct
+import sys
+import time
+import pytest
+import durable
+from durable import DurableLeaderboard, read_snapshot, read_wal, write_snapshot, WAL_RECORD
+from sorted_array import SortedArrayLeaderboard
+from skip_list import SkipListLeaderboard
+from score_indexed_array import ScoreIndexedArrayLeaderboard
+
+def random_writes(lb, ref, rng: random.Random, count: int):
+    for _ in range(count):
+        uid = rng.randrange(200)
+        r = rng.random()
+        if r < 0.7:
+            score = rng.randint(0, 1000)
+            lb.update(uid, score)
+            ref.update(uid, score)
+        elif r < 0.9:
+            lb.delete(uid)
+            ref.delete(uid)
+        else:
+            batch = [(rng.randrange(200), rng.randint(0, 1000)) for _ in range(10)]
+            lb.update_many(batch)
+            ref.update_many(batch)
+
+@pytest.mark.parametrize("board_cls", [SortedArrayLeaderboard, SkipListLeaderboard])
+def test_recovers_snapshot_and_wal_tail(tmp_path, board_cls):
+    rng = random.Random(0)
+    ref = SortedArrayLeaderboard()
+    # Small groups and frequent snapshots, so the directory holds a snapshot and a WAL tail
+    lb = DurableLeaderboard(board_cls(), str(tmp_path), group_size=16, snapshot_every=300)
+    random_writes(lb, ref, rng, 1000)
+    lb.close()
+    names = sorted(os.listdir(tmp_path))
+    assert sum(name.startswith(durable.SNAPSHOT_PREFIX) for name in names) == 1
+    assert any(name.startswith(durable.WAL_PREFIX) for name in names)
+    assert not any(name.endswith(".tmp") for name in names)
+
+    recovered = DurableLeaderboard.open(board_cls, str(tmp_path))
+    assert recovered.user_map == ref.user_map
+    assert recovered.top_k(20) == ref.top_k(20)
+    # Recovery keeps logging into a new segment, and a second recovery sees both
+    random_writes(recovered, ref, rng, 200)
+    recovered.close()
+    again = DurableLeaderboard.open(board_cls, str(tmp_path))
+    assert again.user_map == ref.user_map
+    again.close()
+
+def test_crash_loses_only_unflushed_writes(tmp_path):
+    lb = DurableLeaderboard(SortedArrayLeaderboard(), str(tmp_path), group_size=1000, group_interval_s=60)
+    for uid in range(10):
+        lb.insert(uid, uid)
+    lb.sync()
+    flushed = dict(lb.user_map)
+    lb.insert(99, 99)
+    # Simulate a crash: reopen without closing, and tear the last record of the segment
+    with open(lb._wal_path(lb.generation), "ab") as f:
+        f.write(WAL_RECORD.pack(durable.WAL_SET, 98, 98)[:5])
+    recovered = DurableLeaderboard.open(SortedArrayLeaderboard, str(tmp_path), fsync=False)
+    assert recovered.user_map == flushed
+    recovered.close()
+    lb.close()
+
+def test_idle_group_is_flushed_by_deadline(tmp_path):
+    lb = DurableLeaderboard(SortedArrayLeaderboard(), str(tmp_path), group_size=1000, group_interval_s=0.01)
+    lb.insert(1, 5)
+    path = lb._wal_path(lb.generation)
+    deadline = time.monotonic() + 5
+    while os.path.getsize(path) < WAL_RECORD.size and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert read_wal(path) == [(durable.WAL_SET, 1, 5)]
+    lb.close()
+
+def test_rejected_writes_are_not_logged(tmp_path):
+    board = ScoreIndexedArrayLeaderboard(100)
+    lb = DurableLeaderboard(board, str(tmp_path))
+    lb.insert(1, 10)
+    with pytest.raises(ValueError):
+        lb.insert(2, 1000)
+    with pytest.raises(ValueError):
+        lb.update(1, -5)
+    # Rejected partway through: the items before the bad one were applied and must be logged
+    with pytest.raises(ValueError):
+        lb.update_many([(3, 30), (4, 40), (1, 500), (5, 50)])
+    assert lb.user_map == {1: 10, 3: 30, 4: 40}
+    lb.close()
+    recovered = DurableLeaderboard.open(ScoreIndexedArrayLeaderboard, str(tmp_path))
+    assert recovered.user_map == {1: 10, 3: 30, 4: 40}
+    recovered.close()
+
+def test_snapshot_round_trip_and_byte_order(tmp_path):
+    user_map = {uid: (uid * 37) % 500 for uid in range(300)}
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, user_map)
+    pairs = read_snapshot(path)
+    assert dict(pairs) == user_map
+    assert [(score, uid) for uid, score in pairs] == sorted((score, uid) for uid, score in user_map.items())
+
+    # A snapshot written on a machine with the other byte order
+    other = "big" if sys.byteorder == "little" else "little"
+    fmt = ">" if other == "big" else "<"
+    with open(path, "wb") as f:
+        f.write(durable.SNAPSHOT_HEADER.pack(durable.SNAPSHOT_MAGIC, durable.BYTE_ORDERS[other], len(pairs)))
+        for uid, score in pairs:
+            f.write(struct.pack(f"{fmt}qq", uid, score))
+    assert read_snapshot(path) == pairs
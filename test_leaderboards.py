@@ -0,0 +1,422 @@
+"""
+Differential tests: every structure runs the same random operation stream
+as SortedArrayLeaderboard, the simplest implementation, and must agree with
+it on every read. Structure invariants are checked along the way.
+
+Run with: python -m pytest -q
+"""
+import random
+import pytest
+from sorted_array import SortedArrayLeaderboard
+from chunked_sorted_array import ChunkedSortedArrayLeaderboard
+from linked_list import LinkedListLeaderboard
+from rb_tree import RBTreeLeaderboard
+import array_rb_tree
+from array_rb_tree import ArrayRBTreeLeaderboard
+from skip_list import SkipListLeaderboard
+import score_indexed_array
+from score_indexed_array import ScoreIndexedArrayLeaderboard
+from topk_view import MaterializedTopKLeaderboard, materialized
+
+# Narrow score range, so ties between users are common
+MAX_SCORE = 50
+USER_POOL = 300
+
+def assert_same_reads(board, ref):
+    """
+    Compares every read the ascending-rank structures share with the reference.
+    """
+    assert len(board) == len(ref)
+    assert board.user_map == ref.user_map
+    n = len(ref)
+    assert board.top_k(n + 5) == ref.top_k(n + 5)
+    assert board.top_k(7) == ref.top_k(7)
+    for uid in list(ref.user_map)[:50] + [-1]:
+        assert board.search(uid) == ref.search(uid)
+    queries = list(ref.user_map)[::3] + [-1]
+    assert board.search_many(queries) == ref.search_many(queries)
+    for uid in list(ref.user_map)[::11] + [-1]:
+        for radius in (0, 2, 7):
+            assert board.around(uid, radius) == ref.around(uid, radius)
+    for rank in (0, n // 3, n // 2, n - 1, n):
+        assert board.select(rank) == ref.select(rank)
+    assert board.range_by_rank(n // 4, n // 4 + 20) == ref.range_by_rank(n // 4, n // 4 + 20)
+    for score in (-1, 0, MAX_SCORE // 2, MAX_SCORE):
+        assert board.count_above(score) == ref.count_above(score)
+
+def run_differential(board, ref, seed: int, steps: int = 1500, check=None, check_every: int = 50,
+                     max_score: int = MAX_SCORE, reads=assert_same_reads):
+    """
+    Applies the same random inserts, updates, deletes and update_many
+    batches to board and ref, comparing reads(board, ref) (and calling
+    check(board), if given) every check_every steps.
+    """
+    rng = random.Random(seed)
+    for step in range(steps):
+        uid = rng.randrange(USER_POOL)
+        r = rng.random()
+        if r < 0.35:
+            score = rng.randint(0, max_score)
+            board.insert(uid, score)
+            ref.insert(uid, score)
+        elif r < 0.7:
+            score = rng.randint(0, max_score)
+            board.update(uid, score)
+            ref.update(uid, score)
+        elif r < 0.95:
+            board.delete(uid)
+            ref.delete(uid)
+        else:
+            # Small batches take the incremental path, large ones the rebuild
+            size = rng.choice((3, 20, USER_POOL))
+            batch = [(rng.randrange(USER_POOL), rng.randint(0, max_score)) for _ in range(size)]
+            board.update_many(batch)
+            ref.update_many(batch)
+        if step % check_every == 0:
+            if check:
+                check(board)
+            reads(board, ref)
+    if check:
+        check(board)
+    reads(board, ref)
+
+def initial_pairs(seed: int, n: int = 150, max_score: int = MAX_SCORE):
+    rng = random.Random(seed)
+    return [(rng.randrange(USER_POOL), rng.randint(0, max_score)) for _ in range(n)]
+
+def check_chunked(lb: ChunkedSortedArrayLeaderboard):
+    entries = [entry for chunk in lb.chunks for entry in chunk]
+    assert entries == sorted(entries)
+    assert len(entries) == lb.size == len(lb.user_map)
+    assert sorted((score, uid) for uid, score in lb.user_map.items()) == entries
+    assert lb.maxes == [chunk[-1] for chunk in lb.chunks]
+    for chunk in lb.chunks:
+        assert 0 < len(chunk) <= 2 * lb.load
+    if not lb.index_dirty:
+        # Prefix sums of the Fenwick index match the chunk lengths
+        for i in range(len(lb.chunks) + 1):
+            assert lb._offset(i) == sum(len(chunk) for chunk in lb.chunks[:i])
+
+@pytest.mark.parametrize("seed", range(4))
+def test_chunked_sorted_array_matches_reference(seed):
+    # A small load makes splits and merges frequent
+    board = ChunkedSortedArrayLeaderboard(load=4)
+    run_differential(board, SortedArrayLeaderboard(), seed, check=check_chunked)
+
+@pytest.mark.parametrize("seed", range(2))
+def test_chunked_sorted_array_from_pairs(seed):
+    pairs = initial_pairs(seed)
+    board = ChunkedSortedArrayLeaderboard.from_pairs(pairs, load=4)
+    ref = SortedArrayLeaderboard.from_pairs(pairs)
+    check_chunked(board)
+    run_differential(board, ref, seed + 100, steps=500, check=check_chunked)
+
+def check_array_rb_tree(lb: ArrayRBTreeLeaderboard):
+    NIL, RED = array_rb_tree.NIL, array_rb_tree.RED
+    color, left, right, parent, size = lb.color, lb.left, lb.right, lb.parent, lb.size
+    assert color[NIL] != RED and size[NIL] == 0
+    reachable = set()
+
+    def walk(node: int, lo, hi) -> int:
+        """
+        Checks the subtree and returns its black height.
+        """
+        if node == NIL:
+            return 1
+        assert node not in reachable
+        reachable.add(node)
+        key = (lb.score[node], lb.user_id[node])
+        assert (lo is None or lo < key) and (hi is None or key < hi)
+        for child in (left[node], right[node]):
+            if child != NIL:
+                assert parent[child] == node
+                if color[node] == RED:
+                    assert color[child] != RED, "red node with a red child"
+        assert size[node] == 1 + size[left[node]] + size[right[node]]
+        black_left = walk(left[node], lo, key)
+        black_right = walk(right[node], key, hi)
+        assert black_left == black_right, "unequal black height"
+        return black_left + (color[node] != RED)
+
+    if lb.root != NIL:
+        assert color[lb.root] != RED and parent[lb.root] == NIL
+    walk(lb.root, None, None)
+    assert len(reachable) == len(lb.user_map)
+
+    # Every slot but the sentinel is either in the tree or on the free chain, once
+    free = set()
+    node = lb.free
+    while node != NIL:
+        assert node not in free and node not in reachable
+        free.add(node)
+        node = right[node]
+    assert len(reachable) + len(free) == len(size) - 1
+
+def check_rb_tree(lb: RBTreeLeaderboard):
+    nil = lb.nil
+    assert nil.color is False and nil.size == 0
+    count = 0
+
+    def walk(node, lo, hi) -> int:
+        nonlocal count
+        if node is nil:
+            return 1
+        count += 1
+        key = (node.score, node.user_id)
+        assert (lo is None or lo < key) and (hi is None or key < hi)
+        for child in (node.left, node.right):
+            if child is not nil:
+                assert child.parent is node
+                if node.color:
+                    assert not child.color, "red node with a red child"
+        assert node.size == 1 + node.left.size + node.right.size
+        black_left = walk(node.left, lo, key)
+        black_right = walk(node.right, key, hi)
+        assert black_left == black_right, "unequal black height"
+        return black_left + (not node.color)
+
+    assert not lb.root.color
+    walk(lb.root, None, None)
+    assert count == len(lb.user_map)
+
+@pytest.mark.parametrize("seed", range(4))
+def test_array_rb_tree_matches_reference(seed):
+    run_differential(ArrayRBTreeLeaderboard(), SortedArrayLeaderboard(), seed, check=check_array_rb_tree)
+
+@pytest.mark.parametrize("seed", range(2))
+def test_array_rb_tree_from_pairs(seed):
+    pairs = initial_pairs(seed)
+    board = ArrayRBTreeLeaderboard.from_pairs(pairs)
+    check_array_rb_tree(board)
+    run_differential(board, SortedArrayLeaderboard.from_pairs(pairs), seed + 100, steps=500, check=check_array_rb_tree)
+
+@pytest.mark.parametrize("seed", range(2))
+def test_rb_tree_matches_reference(seed):
+    pairs = initial_pairs(seed)
+    board = RBTreeLeaderboard.from_pairs(pairs)
+    check_rb_tree(board)
+    run_differential(board, SortedArrayLeaderboard.from_pairs(pairs), seed, check=check_rb_tree)
+
+def check_skip_list(lb: SkipListLeaderboard):
+    nodes = []
+    x = lb.header.forward[0]
+    while x:
+        nodes.append(x)
+        x = x.forward[0]
+    n = len(nodes)
+    assert n == lb.size == len(lb.user_map)
+    keys = [(node.score, node.user_id) for node in nodes]
+    assert keys == sorted(keys) and len(set(keys)) == n
+
+    # Backward links mirror level 0, and tail is the last node
+    for i, node in enumerate(nodes):
+        assert node.backward is (nodes[i - 1] if i else None)
+    assert lb.tail is (nodes[-1] if nodes else None)
+
+    # span[i] is the level-0 distance to forward[i], or to the end of the list for the last node
+    position = {id(node): p for p, node in enumerate(nodes, 1)}
+    position[id(lb.header)] = 0
+    for level in range(lb.level + 1):
+        x = lb.header
+        while True:
+            nxt = x.forward[level]
+            if nxt is None:
+                assert x.span[level] == n - position[id(x)], f"tail span at level {level}"
+                break
+            assert id(nxt) in position and len(nxt.forward) > level
+            assert x.span[level] == position[id(nxt)] - position[id(x)], f"span at level {level}"
+            x = nxt
+    for level in range(lb.level + 1, lb.max_level + 1):
+        assert lb.header.forward[level] is None
+    if lb.level > 0:
+        assert lb.header.forward[lb.level] is not None
+
+@pytest.mark.parametrize("seed", range(4))
+def test_skip_list_matches_reference(seed):
+    run_differential(SkipListLeaderboard(), SortedArrayLeaderboard(), seed, check=check_skip_list)
+
+@pytest.mark.parametrize("seed", range(2))
+def test_skip_list_from_pairs(seed):
+    pairs = initial_pairs(seed)
+    board = SkipListLeaderboard.from_pairs(pairs)
+    check_skip_list(board)
+    run_differential(board, SortedArrayLeaderboard.from_pairs(pairs), seed + 100, steps=500, check=check_skip_list)
+
+def ranked_from_buckets(lb: ScoreIndexedArrayLeaderboard):
+    """
+    Returns every (user_id, score) in rank order, read straight off the buckets:
+    highest score first, bucket order within a score.
+    """
+    return [(uid, score) for score in range(lb.max_score, -1, -1) for uid in lb.score_buckets[score]]
+
+def assert_same_scores(board, ref):
+    """
+    Compares the reads whose answer does not depend on how ties are ordered.
+    """
+    assert len(board) == len(ref)
+    assert board.user_map == ref.user_map
+    for score in (-1, 0, MAX_SCORE // 2, MAX_SCORE, board.max_score):
+        assert board.count_above(score) == ref.count_above(score)
+    for p in (0, 0.1, 25, 50, 99.9, 100):
+        assert board.score_at_percentile(p) == ref.score_at_percentile(p)
+
+def check_score_indexed(lb: ScoreIndexedArrayLeaderboard):
+    ranked = ranked_from_buckets(lb)
+    n = len(ranked)
+    assert n == lb.total_users == len(lb.user_map) == len(lb.pos_map)
+    for score, bucket in enumerate(lb.score_buckets):
+        for pos, uid in enumerate(bucket):
+            assert lb.user_map[uid] == score and lb.pos_map[uid] == pos
+
+    # Fenwick prefix sums and the occupancy bitmap, against the buckets
+    at_most = 0
+    highest = -1
+    for score, bucket in enumerate(lb.score_buckets):
+        at_most += len(bucket)
+        assert lb._count_at_most(score) == at_most
+        assert ((lb.occupied_words[score >> 6] >> (score & 63)) & 1) == bool(bucket)
+        if bucket:
+            highest = score
+        assert lb._prev_occupied(score) == highest
+    assert lb._prev_occupied(-1) == -1
+    for w, word in enumerate(lb.occupied_words):
+        assert ((lb.occupied_summary >> w) & 1) == bool(word)
+
+    # Rank reads resolve to positions in the bucket order
+    assert lb.top_k(n + 5) == ranked
+    assert lb.top_k(7) == ranked[:7]
+    for rank in (-1, 0, n // 3, n // 2, n - 1, n):
+        assert lb.select(rank) == (ranked[rank] if 0 <= rank < n else None)
+    for start, stop in ((0, 10), (n // 4, n // 4 + 20), (n - 3, n + 3), (-2, 2)):
+        assert lb.range_by_rank(start, stop) == ranked[max(start, 0):stop]
+    for rank, (uid, _) in list(enumerate(ranked))[::7]:
+        assert lb.search(uid) == rank
+        assert lb.around(uid, 3) == ranked[max(rank - 3, 0):rank + 4]
+        assert lb.percentile(uid) == 100.0 * (lb.count_above(lb.user_map[uid]) + 1) / n
+    assert lb.search(-1) == -1 and lb.around(-1, 3) == []
+
+@pytest.mark.parametrize("seed, max_score", [(0, MAX_SCORE), (1, MAX_SCORE), (2, 1000), (3, 1000)])
+def test_score_indexed_array_matches_reference(seed, max_score):
+    # A wide score range spreads users over several bitmap words
+    board = ScoreIndexedArrayLeaderboard(max_score)
+    run_differential(board, SortedArrayLeaderboard(), seed, check=check_score_indexed,
+                     max_score=max_score, reads=assert_same_scores)
+
+@pytest.mark.parametrize("seed", range(2))
+def test_score_indexed_array_from_pairs(seed):
+    pairs = initial_pairs(seed, max_score=1000)
+    board = ScoreIndexedArrayLeaderboard.from_pairs(pairs, max_score=1000)
+    check_score_indexed(board)
+    run_differential(board, SortedArrayLeaderboard.from_pairs(pairs), seed + 100, steps=500,
+                     check=check_score_indexed, max_score=1000, reads=assert_same_scores)
+
+def test_score_indexed_array_rejects_out_of_range_scores():
+    lb = ScoreIndexedArrayLeaderboard(100)
+    lb.insert(1, 50)
+    for score in (-1, 101):
+        with pytest.raises(ValueError):
+            lb.insert(2, score)
+        with pytest.raises(ValueError):
+            lb.update(1, score)
+    assert lb.user_map == {1: 50}
+    check_score_indexed(lb)
+
+@pytest.mark.parametrize("seed, use_numpy", [(0, True), (1, True), (0, False)])
+def test_score_indexed_array_batch_reads(seed, use_numpy, monkeypatch):
+    if not use_numpy:
+        # Take the pure-Python fallback even when NumPy is installed
+        monkeypatch.setattr(score_indexed_array, "np", None)
+    rng = random.Random(seed)
+    lb = ScoreIndexedArrayLeaderboard.from_pairs(initial_pairs(seed, n=250, max_score=1000), max_score=1000)
+    histogram = lb.score_histogram()
+    for _ in range(300):
+        lb.update(rng.randrange(USER_POOL), rng.randint(0, 1000))
+        if rng.random() < 0.2:
+            lb.delete(rng.randrange(USER_POOL))
+    # The histogram is a live view of the counts
+    assert list(histogram) == [len(bucket) for bucket in lb.score_buckets]
+    with pytest.raises((TypeError, ValueError)):
+        histogram[0] = 1
+    queries = list(lb.user_map) + [-1, USER_POOL + 1]
+    rng.shuffle(queries)
+    assert list(lb.search_many(queries)) == [lb.search(uid) for uid in queries]
+    assert list(lb.search_many([])) == []
+
+def check_linked_list(lb: LinkedListLeaderboard):
+    keys = []
+    node = lb.head
+    while node:
+        keys.append((node.score, node.user_id))
+        node = node.next
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    assert len(keys) == lb.size == len(lb.user_map)
+    assert sorted((score, uid) for uid, score in lb.user_map.items()) == keys
+
+@pytest.mark.parametrize("seed", range(2))
+def test_linked_list_matches_reference(seed):
+    run_differential(LinkedListLeaderboard(), SortedArrayLeaderboard(), seed, steps=800, check=check_linked_list)
+
+def test_linked_list_from_pairs():
+    pairs = initial_pairs(0)
+    board = LinkedListLeaderboard.from_pairs(pairs)
+    check_linked_list(board)
+    run_differential(board, SortedArrayLeaderboard.from_pairs(pairs), 100, steps=500, check=check_linked_list)
+
+VIEW_K = 8
+
+def check_view(view):
+    """
+    Reads the view's top_k at every size, which also rebuilds it if it was dirty,
+    and compares it with the wrapped board.
+    """
+    for k in range(1, VIEW_K + 1):
+        assert list(view.top_k(k)) == view.board.top_k(k)
+    assert not view.dirty
+    assert view.entries == sorted((score, uid) for uid, score in view.members.items())
+    assert len(view.entries) == min(VIEW_K, len(view.board))
+
+def assert_same_view_reads(view, ref):
+    # The view answers top_k with tuples and forwards the other reads to its board
+    for k in (1, 3, VIEW_K, len(ref) + 5):
+        assert list(view.top_k(k)) == ref.top_k(k)
+    assert len(view) == len(ref) and view.search(-1) == -1
+    assert_same_reads(view.board, ref)
+
+@pytest.mark.parametrize("seed, board_cls", [(0, SortedArrayLeaderboard), (1, SortedArrayLeaderboard), (2, SkipListLeaderboard)])
+def test_materialized_view_matches_reference(seed, board_cls, monkeypatch):
+    rescans = 0
+    rescan = MaterializedTopKLeaderboard._rescan
+
+    def counting_rescan(self):
+        nonlocal rescans
+        rescans += 1
+        rescan(self)
+
+    monkeypatch.setattr(MaterializedTopKLeaderboard, "_rescan", counting_rescan)
+    view = materialized(board_cls, VIEW_K)()
+    # Reading after every write keeps the view clean, so each write goes through
+    # _on_write: inserts that evict, members moving inside or falling off the boundary, deletes
+    run_differential(view, SortedArrayLeaderboard(), seed, steps=1500, check=check_view, check_every=1,
+                     reads=assert_same_view_reads)
+    # Most writes are absorbed without going back to the board
+    assert 0 < rescans < 1500 // 4
+
+def test_materialized_view_cached_slices():
+    view = materialized(SortedArrayLeaderboard, VIEW_K).from_pairs([(uid, uid % 20) for uid in range(50)])
+    top3 = view.top_k(3)
+    assert view.top_k(3) is top3 and view.top_k(VIEW_K)[:3] == top3
+    # A write below the boundary keeps the cached tuples
+    view.update(0, 1)
+    assert view.top_k(3) is top3
+    # A write into the view replaces them
+    view.update(1, 100)
+    assert view.top_k(3) is not top3 and view.top_k(3)[0] == (1, 100)
+    assert list(view.top_k(60)) == view.board.top_k(60)
+
+def test_sorted_array_around():
+    # The reference itself, against the (score, user_id) order written out by hand
+    lb = SortedArrayLeaderboard.from_pairs([(1, 10), (2, 20), (3, 20), (4, 30), (5, 40)])
+    assert lb.around(3, 1) == [(4, 30), (3, 20), (2, 20)]
+    assert lb.around(5, 2) == [(5, 40), (4, 30), (3, 20)]
+    assert lb.around(1, 0) == [(1, 10)]
+    assert lb.around(9, 2) == []
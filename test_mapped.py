@@ -0,0 +1,70 @@
+"""
+MappedLeaderboard round trips: a board exported with export_mapped must
+answer every read like the board it was exported from.
+
+Run with: python -m pytest -q
+"""
+import random
+import pytest
+from mapped import MappedLeaderboard, export_mapped
+from sorted_array import SortedArrayLeaderboard
+from skip_list import SkipListLeaderboard
+from score_indexed_array import ScoreIndexedArrayLeaderboard
+
+def random_pairs(seed: int, n: int):
+    rng = random.Random(seed)
+    # Few distinct scores, so ties are common; ids are sparse and large
+    return [(rng.randrange(10 ** 12), rng.randint(0, 100)) for _ in range(n)]
+
+@pytest.mark.parametrize("board_cls, n", [
+    (SortedArrayLeaderboard, 1000),
+    (SkipListLeaderboard, 333),
+    (ScoreIndexedArrayLeaderboard, 500),
+    (SortedArrayLeaderboard, 1),
+])
+def test_mapped_matches_exported_board(tmp_path, board_cls, n):
+    pairs = random_pairs(n, n)
+    ref = SortedArrayLeaderboard.from_pairs(pairs)
+    path = str(tmp_path / "board.map")
+    export_mapped(board_cls.from_pairs(pairs), path)
+    with MappedLeaderboard(path) as lb:
+        assert len(lb) == len(ref)
+        for uid, score in ref.user_map.items():
+            assert lb.score_of(uid) == score
+            assert lb.search(uid) == ref.search(uid)
+            assert lb.search(uid, score) == ref.search(uid)
+            assert lb.search(uid, score + 1) == -1
+        assert lb.search(-1) == -1 and lb.score_of(10 ** 12 + 1) is None
+        for score in (-1, 0, 50, 100):
+            assert lb.count_above(score) == ref.count_above(score)
+        m = len(ref)
+        for rank in (-1, 0, m // 2, m - 1, m):
+            assert lb.select(rank) == ref.select(rank)
+        for start, stop in ((0, 10), (m // 3, m // 3 + 50), (m - 5, m + 5), (5, 2)):
+            assert lb.range_by_rank(start, stop) == ref.range_by_rank(start, stop)
+        for k in (1, 10, m, m + 10):
+            assert lb.top_k(k) == ref.top_k(k)
+        assert lb.top_k(0) == []
+
+def test_mapped_empty_board(tmp_path):
+    path = str(tmp_path / "empty.map")
+    export_mapped(SortedArrayLeaderboard(), path)
+    with MappedLeaderboard(path) as lb:
+        assert len(lb) == 0
+        assert lb.search(1) == -1 and lb.count_above(0) == 0
+        assert lb.select(0) is None and lb.top_k(5) == [] and lb.range_by_rank(0, 5) == []
+
+def test_reexport_leaves_open_readers_on_the_old_file(tmp_path):
+    path = str(tmp_path / "board.map")
+    export_mapped(SortedArrayLeaderboard.from_pairs([(1, 10), (2, 20)]), path)
+    with MappedLeaderboard(path) as old:
+        export_mapped(SortedArrayLeaderboard.from_pairs([(3, 30)]), path)
+        assert old.top_k(5) == [(2, 20), (1, 10)]
+        with MappedLeaderboard(path) as new:
+            assert new.top_k(5) == [(3, 30)]
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "junk.map"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        MappedLeaderboard(str(path))
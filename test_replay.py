@@ -0,0 +1,67 @@
+"""
+Trace replay: parsing, streaming and the per-operation counts of a replayed trace.
+
+Run with: python -m pytest -q
+"""
+import json
+import os
+from collections import Counter
+import pytest
+from replay import iter_trace, replay_trace, OPERATIONS, OP_LABELS, SAMPLE_TRACE
+from sorted_array import SortedArrayLeaderboard
+from skip_list import SkipListLeaderboard
+
+def write_trace(path, records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write((json.dumps(record) if isinstance(record, dict) else record) + "\n")
+    return str(path)
+
+TRACE = [
+    {"ts": 0.0, "op": "insert", "user_id": 1, "score": 10},
+    {"ts": 0.001, "op": "insert", "user_id": 2, "score": 20},
+    "",
+    {"ts": 0.002, "op": "update", "user_id": 1, "score": 30},
+    {"ts": 0.002, "op": "search", "user_id": 2},
+    {"ts": 0.003, "op": "top_k"},
+    {"ts": 0.004, "op": "top_k", "k": 1, "note": "ignored"},
+    {"ts": 0.005, "op": "insert", "user_id": 3, "score": 5},
+    {"ts": 0.006, "op": "delete", "user_id": 2},
+]
+
+def test_iter_trace_records(tmp_path):
+    path = write_trace(tmp_path / "trace.jsonl", TRACE)
+    assert list(iter_trace(path)) == [
+        (0.0, "insert", 1, 10), (0.001, "insert", 2, 20), (0.002, "update", 1, 30),
+        (0.002, "search", 2, 0), (0.003, "top_k", 0, 100), (0.004, "top_k", 0, 1),
+        (0.005, "insert", 3, 5), (0.006, "delete", 2, 0),
+    ]
+
+@pytest.mark.parametrize("paced", [False, True])
+def test_replay_counts_every_operation(tmp_path, paced):
+    path = write_trace(tmp_path / "trace.jsonl", TRACE)
+    row = replay_trace(SkipListLeaderboard, path, paced=paced, speed=100.0)
+    assert row["Operations"] == 8 and row["FinalSize"] == 2
+    assert {label: row[f"{label}_Count"] for label in OP_LABELS.values()} == {
+        "Insert": 3, "Update": 1, "Delete": 1, "Search": 1, "TopK": 2}
+    assert (row["Lag_P99_us"] != "") == paced
+
+def test_sample_trace_replays():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), SAMPLE_TRACE)
+    expected = Counter(op for _, op, _, _ in iter_trace(path))
+    assert set(expected) == set(OPERATIONS)
+    row = replay_trace(SortedArrayLeaderboard, path)
+    assert row["Operations"] == sum(expected.values())
+    for op in OPERATIONS:
+        assert row[f"{OP_LABELS[op]}_Count"] == expected[op]
+
+def test_bad_records_name_the_line(tmp_path):
+    path = write_trace(tmp_path / "missing.jsonl", [TRACE[0], {"ts": 1, "op": "update", "user_id": 1}])
+    records = iter_trace(path)
+    # Streaming: the good first line is yielded before the bad one is read
+    assert next(records)[1] == "insert"
+    with pytest.raises(ValueError, match=r"missing\.jsonl:2: update without a score"):
+        next(records)
+    path = write_trace(tmp_path / "backlog.jsonl", [{"request_id": "x", "title": "not an operation"}])
+    with pytest.raises(ValueError, match=r"backlog\.jsonl:1: unknown op None"):
+        list(iter_trace(path))
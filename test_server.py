@@ -0,0 +1,118 @@
+"""
+The leaderboard server over a real socket: pipelined requests, coalesced
+writes, per-request errors, and the load generator against it.
+
+Run with: python -m pytest -q
+"""
+import asyncio
+import random
+import pytest
+from server import (
+    LeaderboardServer, FRAME_HEADER, OP_INSERT, OP_UPDATE, OP_DELETE, OP_SEARCH, OP_TOP_K,
+    encode_request, decode_response
+)
+from load_client import run_load
+from sorted_array import SortedArrayLeaderboard
+from score_indexed_array import ScoreIndexedArrayLeaderboard
+
+async def pipeline(port: int, requests):
+    """
+    Sends every request before reading any response, and returns the decoded
+    responses in order (the RuntimeError instance for error responses).
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"".join(encode_request(op, *args) for op, args in requests))
+    await writer.drain()
+    results = []
+    for op, _ in requests:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        payload = await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+        try:
+            results.append(decode_response(op, payload))
+        except RuntimeError as exc:
+            results.append(exc)
+    writer.close()
+    await writer.wait_closed()
+    return results
+
+def serve_and_run(board, client):
+    """
+    Starts a LeaderboardServer for board on a free port, awaits client(port)
+    and returns (server, its result).
+    """
+    async def run():
+        server = LeaderboardServer(board)
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return server, await client(port)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+    return asyncio.run(run())
+
+def test_pipelined_requests_match_local_board():
+    rng = random.Random(0)
+    ref = SortedArrayLeaderboard()
+    # Two connections write disjoint users, so their interleaving does not matter
+    streams = []
+    for conn in range(2):
+        requests = []
+        for _ in range(400):
+            uid = conn * 1000 + rng.randrange(100)
+            r = rng.random()
+            if r < 0.75:
+                op = OP_INSERT if r < 0.2 else OP_UPDATE
+                requests.append((op, (uid, rng.randint(0, 50))))
+            else:
+                requests.append((OP_DELETE, (uid,)))
+        streams.append(requests)
+    for requests in streams:
+        for op, args in requests:
+            if op == OP_DELETE:
+                ref.delete(*args)
+            else:
+                ref.update(*args)
+    reads = [(OP_TOP_K, (10,)), (OP_TOP_K, (1000,))] + [(OP_SEARCH, (uid,)) for uid in list(ref.user_map)[:30] + [-1]]
+
+    async def client(port):
+        writes = await asyncio.gather(*[pipeline(port, requests) for requests in streams])
+        return writes, await pipeline(port, reads)
+
+    server, (writes, results) = serve_and_run(SortedArrayLeaderboard(), client)
+    assert all(result is None for stream in writes for result in stream)
+    assert results[0] == ref.top_k(10) and results[1] == ref.top_k(1000)
+    assert results[2:] == [ref.search(uid) for _, (uid,) in reads[2:]]
+    # Pipelined writes are applied in batches, not one flush per write
+    assert server.writes == 800 and server.flushes < server.writes
+
+def test_reads_see_earlier_writes_on_the_same_connection():
+    requests = [(OP_UPDATE, (1, 10)), (OP_UPDATE, (2, 20)), (OP_SEARCH, (2,)),
+                (OP_UPDATE, (2, 5)), (OP_SEARCH, (2,)), (OP_DELETE, (1,)), (OP_TOP_K, (5,))]
+    _, results = serve_and_run(SortedArrayLeaderboard(), lambda port: pipeline(port, requests))
+    assert results == [None, None, 1, None, 0, None, [(2, 5)]]
+
+def test_rejected_write_fails_alone():
+    # 999 is out of range for the board; the batch falls back to one write at a time
+    requests = [(OP_UPDATE, (1, 10)), (OP_UPDATE, (2, 999)), (OP_UPDATE, (3, 30)), (OP_TOP_K, (5,))]
+    _, results = serve_and_run(ScoreIndexedArrayLeaderboard(100), lambda port: pipeline(port, requests))
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], RuntimeError) and "between 0 and 100" in str(results[1])
+    assert results[3] == [(3, 30), (1, 10)]
+
+def test_request_frames():
+    assert encode_request(OP_UPDATE, 7, 9)[:FRAME_HEADER.size] == FRAME_HEADER.pack(17)
+    assert encode_request(OP_SEARCH, 7)[:FRAME_HEADER.size] == FRAME_HEADER.pack(9)
+    assert encode_request(OP_TOP_K, 3)[:FRAME_HEADER.size] == FRAME_HEADER.pack(5)
+    with pytest.raises(ValueError):
+        encode_request(99, 1)
+
+def test_load_client_reports_every_operation():
+    async def client(port):
+        return await run_load("127.0.0.1", port, n=200, total_requests=2000, connections=2, depth=8)
+
+    _, results = serve_and_run(SortedArrayLeaderboard(), client)
+    # The preload inserts are not measured
+    assert set(results) == {"Update", "Search", "TopK"}
+    for stats in results.values():
+        assert 0 < stats["P50"] <= stats["P99"] <= stats["Max"]
@@ -0,0 +1,82 @@
+"""
+ShardedLeaderboard against a single local board fed the same writes.
+
+Run with: python -m pytest -q
+"""
+import random
+import pytest
+from sharded import ShardedLeaderboard, MAX_IN_FLIGHT
+from sorted_array import SortedArrayLeaderboard
+from score_indexed_array import ScoreIndexedArrayLeaderboard
+
+MAX_SCORE = 1000
+
+def assert_same_reads(board: ShardedLeaderboard, local):
+    assert len(board) == len(local)
+    for score in (-1, 0, MAX_SCORE // 3, MAX_SCORE // 2, MAX_SCORE):
+        assert board.count_above(score) == local.count_above(score)
+    for k in (1, 10, len(local) + 5):
+        top = board.top_k(k)
+        # Shards merge ties in shard order, so only the scores have a fixed order
+        assert [score for _, score in top] == [score for _, score in local.top_k(k)]
+        assert all(local.user_map[uid] == score for uid, score in top)
+    for uid in list(local.user_map)[:20] + [-1]:
+        expected = local.count_above(local.user_map[uid]) if uid in local.user_map else -1
+        assert board.search(uid) == expected
+
+@pytest.mark.parametrize("num_shards", [1, 3])
+def test_sharded_matches_local_board(num_shards):
+    rng = random.Random(num_shards)
+    pairs = [(uid, rng.randint(0, MAX_SCORE)) for uid in rng.sample(range(100000), 400)]
+    local = SortedArrayLeaderboard.from_pairs(pairs)
+    with ShardedLeaderboard.from_pairs(pairs, SortedArrayLeaderboard, num_shards) as board:
+        assert_same_reads(board, local)
+        # More pipelined writes than MAX_IN_FLIGHT, so the coordinator drains replies mid-stream
+        for _ in range(MAX_IN_FLIGHT * 3):
+            uid = rng.choice(pairs)[0]
+            r = rng.random()
+            if r < 0.6:
+                score = rng.randint(0, MAX_SCORE)
+                board.update(uid, score)
+                local.update(uid, score)
+            elif r < 0.8:
+                board.delete(uid)
+                local.delete(uid)
+            else:
+                uid = rng.randrange(100000, 200000)
+                score = rng.randint(0, MAX_SCORE)
+                board.insert(uid, score)
+                local.insert(uid, score)
+        batch = [(rng.choice(pairs)[0], rng.randint(0, MAX_SCORE)) for _ in range(100)]
+        board.update_many(batch)
+        local.update_many(batch)
+        assert_same_reads(board, local)
+
+def test_rejected_pipelined_write_raises_on_next_read():
+    local = ScoreIndexedArrayLeaderboard(MAX_SCORE)
+    with ShardedLeaderboard(ScoreIndexedArrayLeaderboard, 2) as board:
+        for uid in range(50):
+            board.insert(uid, uid * 10)
+            local.insert(uid, uid * 10)
+        # Out of range for the shard's board: rejected in the worker, reported later
+        board.insert(1000, MAX_SCORE * 100)
+        board.insert(1001, 5)
+        local.insert(1001, 5)
+        with pytest.raises(ValueError):
+            board.count_above(0)
+        # The error is raised once; the writes around it were applied
+        assert board.count_above(0) == local.count_above(0)
+        assert len(board) == len(local)
+        assert board.search(1000) == -1
+        assert board.search(1001) == local.count_above(5)
+
+def test_close_raises_deferred_error_after_stopping_every_shard():
+    board = ShardedLeaderboard(ScoreIndexedArrayLeaderboard, 3)
+    workers = list(board.workers)
+    board.insert(1, MAX_SCORE * 100)
+    for uid in range(2, 30):
+        board.insert(uid, uid)
+    with pytest.raises(ValueError):
+        board.close()
+    assert not any(worker.is_alive() for worker in workers)
+    assert board.conns == [] and board.workers == []
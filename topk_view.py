@@ -0,0 +1,159 @@
+import bisect
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+class MaterializedTopKLeaderboard:
+    """
+    Wraps any leaderboard and keeps its top k entries materialized.
+
+    The view holds the current top k as a sorted list of (score, user_id) and
+    adjusts it on every insert/update/delete that goes through the wrapper:
+    a write below the boundary leaves it untouched, a write above the boundary
+    is inserted and evicts the lowest entry. Only when a member drops out of
+    the view (its score falls below the boundary, or it is deleted) is the
+    next entry unknown, and the view is rescanned from the board on the next read.
+
+    top_k(k) returns a cached tuple that is reused until the view changes.
+    Ties are ordered by (score, user_id), as in the sorted structures.
+
+    All writes must go through the wrapper; reads not defined here
+    (e.g. user_map) are forwarded to the wrapped board.
+    """
+
+    def __init__(self, board, k: int = 100):
+        self.board = board
+        self.k = k
+        # Ascending (score, user_id) entries of the current top k
+        self.entries: List[Tuple[int, int]] = []
+        # Map: user_id -> score, for users currently in the view
+        self.members: Dict[int, int] = {}
+        # The view must be rebuilt from the board before the next read
+        self.dirty = True
+        # Cached top_k(self.k) result, None when stale
+        self.cached: Optional[Tuple[Tuple[int, int], ...]] = None
+        # Cached top_k(k) results for k < self.k, slices of cached; emptied when cached is rebuilt
+        self.slices: Dict[int, Tuple[Tuple[int, int], ...]] = {}
+
+    def __getattr__(self, name):
+        # Only reached for attributes the view does not define itself
+        if name == "board":
+            raise AttributeError(name)
+        return getattr(self.board, name)
+
+    def _rescan(self):
+        """
+        Rebuilds the view from the board.
+        Time Complexity: one board.top_k(k) call + O(k log k)
+        """
+        top = self.board.top_k(self.k)
+        self.entries = sorted((score, uid) for uid, score in top)
+        self.members = dict(top)
+        self.dirty = False
+        self.cached = None
+
+    def _on_write(self, user_id: int, score: Optional[int]):
+        """
+        Adjusts the view after user_id moved to score (None if deleted).
+        Time Complexity: O(k) for the list shift, O(1) if the write is below the boundary
+        """
+        if self.dirty:
+            return
+        entries = self.entries
+        old_score = self.members.pop(user_id, None)
+        if old_score is not None:
+            # A member moved or left: drop its old entry
+            del entries[bisect.bisect_left(entries, (old_score, user_id))]
+            self.cached = None
+            if score is None:
+                # The next entry below the boundary is unknown
+                if len(self.board) > len(entries):
+                    self.dirty = True
+                return
+            if len(entries) + 1 < self.k or len(self.board) <= self.k or (entries and (score, user_id) > entries[0]):
+                bisect.insort(entries, (score, user_id))
+                self.members[user_id] = score
+            else:
+                # Fell off the boundary: someone outside the view may now rank higher
+                self.dirty = True
+            return
+
+        if score is None:
+            return
+        entry = (score, user_id)
+        if len(entries) < self.k:
+            # Fewer than k users on the board, everyone is in the view
+            bisect.insort(entries, entry)
+            self.members[user_id] = score
+            self.cached = None
+        elif entry > entries[0]:
+            evicted_score, evicted_uid = entries.pop(0)
+            del self.members[evicted_uid]
+            bisect.insort(entries, entry)
+            self.members[user_id] = score
+            self.cached = None
+
+    def insert(self, user_id: int, score: int):
+        self.board.insert(user_id, score)
+        self._on_write(user_id, score)
+
+    def update(self, user_id: int, new_score: int):
+        self.board.update(user_id, new_score)
+        self._on_write(user_id, new_score)
+
+    def delete(self, user_id: int, score: Optional[int] = None):
+        if user_id not in self.board.user_map:
+            return
+        self.board.delete(user_id, score)
+        self._on_write(user_id, None)
+
+    def update_many(self, pairs: Iterable[Tuple[int, int]]):
+        batch = dict(pairs)
+        self.board.update_many(batch.items())
+        for uid, score in batch.items():
+            self._on_write(uid, score)
+
+    def insert_many(self, pairs: Iterable[Tuple[int, int]]):
+        self.update_many(pairs)
+
+    def search(self, user_id: int, score: Optional[int] = None) -> int:
+        return self.board.search(user_id, score)
+
+    def top_k(self, k: int) -> Tuple[Tuple[int, int], ...]:
+        """
+        Returns the top k users as an immutable tuple of (user_id, score).
+        O(1) when nothing relevant changed since the last read of the same
+        k (the first read of a smaller k after a change slices the view,
+        O(k)); requests larger than the view are answered by the board.
+        """
+        if k > self.k:
+            return tuple(self.board.top_k(k))
+        if self.dirty:
+            self._rescan()
+        if self.cached is None:
+            self.cached = tuple((uid, score) for score, uid in reversed(self.entries))
+            self.slices = {}
+        if k == self.k:
+            return self.cached
+        result = self.slices.get(k)
+        if result is None:
+            result = self.slices[k] = self.cached[:max(k, 0)]
+        return result
+
+    def __len__(self):
+        return len(self.board)
+
+def materialized(board_cls: Type, k: int = 100) -> Type:
+    """
+    Returns a leaderboard class whose instances wrap board_cls in a
+    MaterializedTopKLeaderboard, so it can be benchmarked like the others.
+    """
+    class View(MaterializedTopKLeaderboard):
+        def __init__(self, board=None, k: int = k):
+            super().__init__(board if board is not None else board_cls(), k)
+
+        @classmethod
+        def from_pairs(cls, pairs: Iterable[Tuple[int, int]]) -> 'MaterializedTopKLeaderboard':
+            return cls(board_cls.from_pairs(pairs))
+
+    View.board_cls = board_cls
+    View.__name__ = View.__qualname__ = f"Materialized{board_cls.__name__}"
+    return View